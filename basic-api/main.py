@@ -1,5 +1,6 @@
 from typing import Annotated, Optional
 from fastapi import FastAPI, Path, Query, status, HTTPException
+from metrics import instrument
 
 #simulasi database
 fake_db = {
@@ -130,4 +131,8 @@ async def search_product(
     for item_id, item in fake_db["items"].items():
         if query in item["name"]:
             search_results[item_id] = item
-    return {"query": query, "limit": limit, "skip": skip, "exact_match": exact_match, "results": search_results}
\ No newline at end of file
+    return {"query": query, "limit": limit, "skip": skip, "exact_match": exact_match, "results": search_results}
+
+
+# Metrik Prometheus di GET /metrics; dipanggil terakhir agar semua route ikut terbungkus
+instrument(app)
@@ -0,0 +1,150 @@
+"""Measure FastAPI dependency-injection overhead per request for the provider styles used in the repo.
+
+Every route returns the same tiny response, so the difference to the ``none`` route is the cost
+of resolving its dependencies. Requests are sent straight to the ASGI app (no HTTP client or
+server) one after another:
+
+- ``none``: no dependency.
+- ``sync-per-request``: old task_management style, a plain ``def`` provider building
+  ``TodoService(TodoRepository())`` per request (FastAPI runs ``def`` dependencies in its threadpool).
+- ``async-chain``: old task-management-app-db style, session -> repository -> service as three
+  ``async`` providers, each logging at debug level.
+- ``async-flat``: current task-management-app-db style, one provider on top of the session.
+- ``singleton`` / ``ttl``: ``ProviderContainer`` dependencies from task_management/providers.py.
+
+Usage:
+    python benchmarks/di_overhead.py --requests 20000
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+import time
+from pathlib import Path
+from typing import Annotated, Any, AsyncIterator, Callable, Dict
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "task_management"))
+
+from fastapi import Depends, FastAPI  # noqa: E402
+
+from providers import Lifetime, ProviderContainer  # noqa: E402
+from repositories import TodoRepository  # noqa: E402
+from services import TodoService  # noqa: E402
+
+logger = logging.getLogger("benchmarks.di")
+
+
+class Session:
+    """Stands in for an AsyncSession: the one resource that really is per request."""
+
+    async def close(self) -> None:
+        pass
+
+
+class Repository:
+    def __init__(self, session: Session):
+        self.session = session
+
+
+class Service:
+    def __init__(self, repository: Repository):
+        self.repository = repository
+
+
+async def get_session() -> AsyncIterator[Session]:
+    session = Session()
+    try:
+        yield session
+    finally:
+        await session.close()
+
+
+async def get_chained_repository(session: Annotated[Session, Depends(get_session)]) -> Repository:
+    logger.debug("Providing Repository instance")
+    return Repository(session)
+
+
+async def get_chained_service(repository: Annotated[Repository, Depends(get_chained_repository)]) -> Service:
+    logger.debug("Providing Service instance")
+    return Service(repository)
+
+
+async def get_flat_service(session: Annotated[Session, Depends(get_session)]) -> Service:
+    return Service(Repository(session))
+
+
+def get_todo_service_per_request() -> TodoService:
+    return TodoService(TodoRepository())
+
+
+def build_app() -> FastAPI:
+    container = ProviderContainer()
+    container.register(TodoRepository, lambda c: TodoRepository())
+    container.register(TodoService, lambda c: TodoService(c.resolve(TodoRepository)))
+    container.register("settings", lambda c: {"page_size": 50}, Lifetime.TTL, ttl=60)
+    container.startup()
+
+    app = FastAPI()
+    dependencies: Dict[str, Callable[..., Any]] = {
+        "sync-per-request": get_todo_service_per_request,
+        "async-chain": get_chained_service,
+        "async-flat": get_flat_service,
+        "singleton": container.dependency(TodoService),
+        "ttl": container.dependency("settings"),
+    }
+
+    @app.get("/none")
+    async def no_dependency() -> Dict[str, bool]:
+        return {"ok": True}
+
+    for name, dependency in dependencies.items():
+
+        async def endpoint(provided: Annotated[Any, Depends(dependency)]) -> Dict[str, bool]:
+            return {"ok": True}
+
+        app.add_api_route(f"/{name}", endpoint, methods=["GET"])
+    return app
+
+
+async def measure(app: FastAPI, path: str, requests: int) -> float:
+    """Seconds per request for ``requests`` sequential GETs of ``path``."""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+        "path": path, "raw_path": path.encode(), "root_path": "", "query_string": b"", "headers": [],
+        "client": ("127.0.0.1", 1234), "server": ("127.0.0.1", 80),
+    }
+
+    async def receive() -> Dict[str, Any]:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: Dict[str, Any]) -> None:
+        if message["type"] == "http.response.start":
+            assert message["status"] == 200, message
+
+    for _ in range(min(requests, 500)):  # Warm-up
+        await app(dict(scope), receive, send)
+    started = time.perf_counter()
+    for _ in range(requests):
+        await app(dict(scope), receive, send)
+    return (time.perf_counter() - started) / requests
+
+
+async def run(requests: int) -> None:
+    app = build_app()
+    names = ["none", "sync-per-request", "async-chain", "async-flat", "singleton", "ttl"]
+    results = {name: await measure(app, f"/{name}", requests) for name in names}
+    print(f"{'provider':<18} {'us/request':>10} {'DI overhead us':>15}")
+    for name in names:
+        print(f"{name:<18} {results[name] * 1e6:>10.1f} {(results[name] - results['none']) * 1e6:>15.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20_000, help="requests per provider style")
+    args = parser.parse_args()
+    asyncio.run(run(args.requests))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,456 @@
+"""Load-test the lab apps and report throughput and latency percentiles.
+
+Each app is driven by a scripted, weighted mix of its endpoints at a fixed concurrency,
+either in-process through ``httpx.ASGITransport`` (no network, measures the app itself)
+or over HTTP against a real ``uvicorn`` server started in a subprocess.
+
+Results are reported per operation as requests/sec and p50/p95/p99 latency. With
+``--save-baseline`` they are written to a baseline JSON file; later runs compare against
+it and exit with status 1 when throughput drops or p99 grows by more than
+``--max-regression``.
+
+Usage:
+    python benchmarks/load.py                                  # every app, both transports
+    python benchmarks/load.py --app task-management-app-db --transport asgi -c 32 -d 10
+    python benchmarks/load.py --save-baseline                  # record benchmarks/baseline.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+TRANSPORTS = ("asgi", "uvicorn")
+
+
+@dataclass
+class WorkerState:
+    """Per-worker state: a seeded RNG and the IDs this worker created (and may delete)."""
+
+    rng: random.Random
+    seed_ids: List[Any]
+    created: List[Any] = field(default_factory=list)
+
+    def any_id(self) -> Any:
+        return self.rng.choice(self.created or self.seed_ids)
+
+
+Send = Callable[[httpx.AsyncClient, WorkerState], Awaitable[httpx.Response]]
+
+
+@dataclass(frozen=True)
+class Operation:
+    name: str
+    weight: int
+    send: Send
+    needs_own: bool = False  # Only runs when the worker has created something itself (e.g. delete)
+
+
+@dataclass(frozen=True)
+class Scenario:
+    directory: str
+    operations: List[Operation]
+    setup: Callable[[httpx.AsyncClient], Awaitable[List[Any]]]
+    env: Dict[str, str] = field(default_factory=dict)
+
+
+# --- Scenarios -------------------------------------------------------------------------
+
+
+async def _no_setup(client: httpx.AsyncClient) -> List[Any]:
+    return []
+
+
+def _get(path: str) -> Send:
+    async def send(client: httpx.AsyncClient, state: WorkerState) -> httpx.Response:
+        return await client.get(path)
+
+    return send
+
+
+BASIC_API = Scenario(
+    directory="basic-api",
+    setup=_no_setup,
+    operations=[
+        Operation("root", 1, _get("/")),
+        Operation("status", 2, _get("/status")),
+        Operation("data", 2, _get("/data")),
+        Operation("user", 2, _get("/users/101")),
+        Operation("item", 1, _get("/items/1")),
+        Operation("product", 1, _get("/products/2")),
+        Operation("search", 1, _get("/search-products/?query=o&limit=5")),
+    ],
+)
+
+
+def _product(state: WorkerState) -> Dict[str, Any]:
+    return {"name": f"Product {state.rng.randrange(10_000)}", "price": 9.5, "tax": 10, "tags": ["bench"]}
+
+
+async def _setup_products(client: httpx.AsyncClient) -> List[Any]:
+    return [1, 2]  # Pre-filled in the app's in-memory database
+
+
+async def _create_product(client: httpx.AsyncClient, state: WorkerState) -> httpx.Response:
+    response = await client.post("/products/", json=_product(state))
+    state.created.append(response.json()["id"])
+    return response
+
+
+REQUEST_VALIDATION = Scenario(
+    directory="request-validation-response",
+    setup=_setup_products,
+    operations=[
+        Operation("create", 2, _create_product),
+        Operation("get", 5, lambda client, state: client.get(f"/products/{state.any_id()}")),
+        Operation("update", 2, lambda client, state: client.put(f"/products/{state.any_id()}", json=_product(state))),
+    ],
+)
+
+
+def _todo(state: WorkerState) -> Dict[str, Any]:
+    return {"title": f"Todo {state.rng.randrange(10_000)}", "priority": state.rng.choice([1, 2, 3])}
+
+
+async def _setup_todos(client: httpx.AsyncClient) -> List[Any]:
+    rng = random.Random(0)
+    state = WorkerState(rng=rng, seed_ids=[])
+    return [(await client.post("/todos/", json=_todo(state))).json()["id"] for _ in range(50)]
+
+
+async def _create_todo(client: httpx.AsyncClient, state: WorkerState) -> httpx.Response:
+    response = await client.post("/todos/", json=_todo(state))
+    state.created.append(response.json()["id"])
+    return response
+
+
+async def _delete_todo(client: httpx.AsyncClient, state: WorkerState) -> httpx.Response:
+    return await client.delete(f"/todos/{state.created.pop()}")
+
+
+TASK_MANAGEMENT = Scenario(
+    directory="task_management",
+    setup=_setup_todos,
+    operations=[
+        Operation("list", 3, _get("/todos/")),
+        Operation("create", 2, _create_todo),
+        Operation(
+            "update", 2, lambda client, state: client.put(f"/todos/{state.any_id()}", json={"completed": True})
+        ),
+        Operation("delete", 2, _delete_todo, needs_own=True),
+    ],
+)
+
+
+_WORDS = ["report", "groceries", "deploy", "review", "invoice", "meeting", "backup", "release"]
+
+
+def _task(state: WorkerState) -> Dict[str, Any]:
+    words = state.rng.sample(_WORDS, 2)
+    return {"title": f"{words[0].title()} {words[1]}", "description": " ".join(state.rng.sample(_WORDS, 4))}
+
+
+async def _setup_tasks(client: httpx.AsyncClient) -> List[Any]:
+    state = WorkerState(rng=random.Random(0), seed_ids=[])
+    return [(await client.post("/tasks/", json=_task(state))).json()["id"] for _ in range(200)]
+
+
+async def _create_task(client: httpx.AsyncClient, state: WorkerState) -> httpx.Response:
+    response = await client.post("/tasks/", json=_task(state))
+    state.created.append(response.json()["id"])
+    return response
+
+
+async def _delete_task(client: httpx.AsyncClient, state: WorkerState) -> httpx.Response:
+    return await client.delete(f"/tasks/{state.created.pop()}")
+
+
+TASK_MANAGEMENT_DB = Scenario(
+    directory="task-management-app-db",
+    setup=_setup_tasks,
+    # Logging per request is left to the app's LOG_LEVEL; WARNING keeps the queue listener quiet
+    env={"LOG_LEVEL": "WARNING"},
+    operations=[
+        Operation("list", 3, _get("/tasks/?limit=20")),
+        Operation("get", 4, lambda client, state: client.get(f"/tasks/{state.any_id()}")),
+        Operation("search", 2, lambda client, state: client.get(f"/tasks/search?q={state.rng.choice(_WORDS)[:3]}")),
+        Operation("stats", 1, _get("/tasks/stats")),
+        Operation("create", 2, _create_task),
+        Operation(
+            "update", 2, lambda client, state: client.put(f"/tasks/{state.any_id()}", json={"completed": True})
+        ),
+        Operation("delete", 2, _delete_task, needs_own=True),
+    ],
+)
+
+SCENARIOS: Dict[str, Scenario] = {
+    "basic-api": BASIC_API,
+    "request-validation-response": REQUEST_VALIDATION,
+    "task_management": TASK_MANAGEMENT,
+    "task-management-app-db": TASK_MANAGEMENT_DB,
+}
+
+
+# --- Running ---------------------------------------------------------------------------
+
+
+def _scenario_env(scenario: Scenario, tmp_dir: str) -> Dict[str, str]:
+    # Explicit environment variables win over the scenario defaults; the database never does,
+    # so a benchmark can't write into a real tasks.db
+    env = {key: os.environ.get(key, value) for key, value in scenario.env.items()}
+    return {**env, "DATABASE_URL": f"sqlite+aiosqlite:///{tmp_dir}/bench.db"}
+
+
+@asynccontextmanager
+async def asgi_client(scenario: Scenario, concurrency: int, workers: int) -> AsyncIterator[httpx.AsyncClient]:
+    """Imports the app in this process and runs its lifespan around an ASGI-transport client."""
+    app_dir = ROOT / scenario.directory
+    sys.path.insert(0, str(app_dir))
+    os.chdir(app_dir)
+    from main import app  # type: ignore[import-not-found]
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            yield client
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return int(sock.getsockname()[1])
+
+
+@asynccontextmanager
+async def uvicorn_client(scenario: Scenario, concurrency: int, workers: int) -> AsyncIterator[httpx.AsyncClient]:
+    """Starts `uvicorn main:app` in a subprocess and yields a pooled HTTP client for it."""
+    port = _free_port()
+    command = [
+        sys.executable, "-m", "uvicorn", "main:app",
+        "--host", "127.0.0.1", "--port", str(port),
+        "--workers", str(workers), "--log-level", "warning", "--no-access-log",
+    ]
+    server = subprocess.Popen(command, cwd=ROOT / scenario.directory, env=os.environ.copy())
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits) as client:
+            deadline = time.monotonic() + 30
+            while True:
+                if server.poll() is not None:
+                    raise RuntimeError(f"uvicorn exited with status {server.returncode}")
+                try:
+                    await client.get("/")  # Any response, even 404, means the server is up
+                    break
+                except httpx.TransportError:
+                    if time.monotonic() > deadline:
+                        raise RuntimeError("uvicorn did not start within 30s")
+                    await asyncio.sleep(0.1)
+            yield client
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            server.kill()
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values) + 0.5) - 1))
+    return sorted_values[rank]
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> Dict[str, float]:
+    latencies = sorted(latencies)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 3) if latencies else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+    }
+
+
+async def drive(
+    client: httpx.AsyncClient, scenario: Scenario, concurrency: int, duration: float, warmup: float, seed: int
+) -> Dict[str, Any]:
+    """Runs `concurrency` closed-loop workers over the weighted mix and returns the summary."""
+    seed_ids = await scenario.setup(client)
+    operations = scenario.operations
+    weights = [operation.weight for operation in operations]
+    fallback = next(operation for operation in operations if not operation.needs_own)
+    latencies: Dict[str, List[float]] = {operation.name: [] for operation in operations}
+    errors: Dict[str, int] = {operation.name: 0 for operation in operations}
+    loop = asyncio.get_running_loop()
+    measure_from = loop.time() + warmup
+    stop_at = measure_from + duration
+
+    async def worker(index: int) -> None:
+        state = WorkerState(rng=random.Random(seed + index), seed_ids=seed_ids)
+        while True:
+            operation = state.rng.choices(operations, weights)[0]
+            if operation.needs_own and not state.created:
+                operation = fallback
+            started = loop.time()
+            if started >= stop_at:
+                return
+            try:
+                response = await operation.send(client, state)
+                failed = response.status_code >= 400
+            except (httpx.HTTPError, KeyError, ValueError):
+                failed = True
+            if started >= measure_from:
+                latencies[operation.name].append(loop.time() - started)
+                errors[operation.name] += failed
+
+    await asyncio.gather(*(worker(index) for index in range(concurrency)))
+    total = [value for values in latencies.values() for value in values]
+    return {
+        "total": summarize(total, sum(errors.values()), duration),
+        "operations": {
+            name: summarize(values, errors[name], duration) for name, values in latencies.items() if values
+        },
+    }
+
+
+async def run_one(app_name: str, transport: str, args: argparse.Namespace) -> Dict[str, Any]:
+    scenario = SCENARIOS[app_name]
+    tmp_dir = tempfile.mkdtemp(prefix="bench-")
+    os.environ.update(_scenario_env(scenario, tmp_dir))
+    client_factory = asgi_client if transport == "asgi" else uvicorn_client
+    async with client_factory(scenario, args.concurrency, args.workers) as client:
+        result = await drive(client, scenario, args.concurrency, args.duration, args.warmup, args.seed)
+    result["config"] = {
+        "concurrency": args.concurrency,
+        "duration": args.duration,
+        "workers": args.workers if transport == "uvicorn" else None,
+    }
+    return result
+
+
+def run_isolated(app_name: str, transport: str, args: argparse.Namespace) -> Dict[str, Any]:
+    """Runs one app/transport in a fresh interpreter.
+
+    The apps share module names (main, models, routers, ...), so only one of them can be
+    imported per process.
+    """
+    with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as handle:
+        output = handle.name
+    command = [
+        sys.executable, __file__, "--app", app_name, "--transport", transport,
+        "--concurrency", str(args.concurrency), "--duration", str(args.duration),
+        "--warmup", str(args.warmup), "--workers", str(args.workers), "--seed", str(args.seed),
+        "--results-file", output, "--quiet",
+    ]
+    subprocess.run(command, check=True)
+    try:
+        return dict(json.loads(Path(output).read_text())[f"{app_name}/{transport}"])
+    finally:
+        os.unlink(output)
+
+
+# --- Reporting and baseline --------------------------------------------------------------
+
+
+def print_report(key: str, result: Dict[str, Any]) -> None:
+    print(f"\n{key}  (concurrency={result['config']['concurrency']}, {result['config']['duration']}s)")
+    print(f"  {'operation':<10} {'requests':>9} {'errors':>7} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    rows = [*result["operations"].items(), ("TOTAL", result["total"])]
+    for name, stats in rows:
+        print(
+            f"  {name:<10} {stats['requests']:>9} {stats['errors']:>7} {stats['rps']:>9.1f} "
+            f"{stats['p50_ms']:>8.2f} {stats['p95_ms']:>8.2f} {stats['p99_ms']:>8.2f}"
+        )
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Any], max_regression: float) -> List[str]:
+    """Returns a message per run whose total rps or p99 regressed beyond `max_regression`."""
+    regressions = []
+    for key, result in results.items():
+        base = baseline.get("results", {}).get(key)
+        if base is None:
+            continue
+        current, previous = result["total"], base["total"]
+        if current["rps"] < previous["rps"] * (1 - max_regression):
+            regressions.append(f"{key}: req/s {previous['rps']} -> {current['rps']}")
+        if current["p99_ms"] > previous["p99_ms"] * (1 + max_regression):
+            regressions.append(f"{key}: p99 {previous['p99_ms']}ms -> {current['p99_ms']}ms")
+    return regressions
+
+
+def machine_info() -> Dict[str, Any]:
+    return {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--app", choices=[*SCENARIOS, "all"], default="all")
+    parser.add_argument("--transport", choices=[*TRANSPORTS, "both"], default="both")
+    parser.add_argument("-c", "--concurrency", type=int, default=16, help="concurrent closed-loop clients")
+    parser.add_argument("-d", "--duration", type=float, default=5.0, help="measured seconds per run")
+    parser.add_argument("--warmup", type=float, default=1.0, help="seconds discarded before measuring")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="write results to --baseline")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="allowed relative rps/p99 change")
+    parser.add_argument("--results-file", type=Path, help="also write raw results as JSON")
+    parser.add_argument("--quiet", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    apps = list(SCENARIOS) if args.app == "all" else [args.app]
+    transports = list(TRANSPORTS) if args.transport == "both" else [args.transport]
+    results: Dict[str, Dict[str, Any]] = {}
+    for app_name in apps:
+        for transport in transports:
+            key = f"{app_name}/{transport}"
+            if len(apps) * len(transports) == 1:
+                results[key] = asyncio.run(run_one(app_name, transport, args))
+            else:
+                results[key] = run_isolated(app_name, transport, args)
+            if not args.quiet:
+                print_report(key, results[key])
+
+    if args.results_file:
+        args.results_file.write_text(json.dumps(results, indent=2))
+    if args.quiet:
+        return
+
+    baseline: Optional[Dict[str, Any]] = None
+    if args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text())
+    if args.save_baseline:
+        merged = {**(baseline or {}).get("results", {}), **results}
+        args.baseline.write_text(json.dumps({"machine": machine_info(), "results": merged}, indent=2) + "\n")
+        print(f"\nBaseline written to {args.baseline}")
+        return
+    if baseline is not None:
+        regressions = compare(results, baseline, args.max_regression)
+        for message in regressions:
+            print(f"REGRESSION {message}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+        print(f"\nNo regressions beyond {args.max_regression:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
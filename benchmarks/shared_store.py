@@ -0,0 +1,153 @@
+"""Measure requests/sec of task_management under uvicorn with several worker processes sharing one store.
+
+For every worker count a fresh server is started (``uvicorn --workers N``) with a fresh
+memory-mapped store file (TODO_SHARED_FILE) and seeded with ``--items`` todos. Then
+``--clients`` client processes send requests over keep-alive connections for ``--duration``
+seconds: ``GET /todos/?priority=<random>&limit=20``, and ``PUT /todos/{id}`` of a random todo
+(toggling ``completed``) for a ``--write-ratio`` share of them. Afterwards the todos are fetched over fresh connections,
+which the kernel spreads over the workers, and must be the same every time.
+
+The first row is one worker without a shared store (the old module-level dict) as a baseline.
+Throughput can only grow with the number of CPU cores, which the clients use as well; on a
+single core the rows mostly show the cost of the extra processes.
+
+Usage:
+    python benchmarks/shared_store.py --workers 1 2 4 8 --duration 10
+"""
+
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+APP_DIR = Path(__file__).resolve().parent.parent / "task_management"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def request(connection: http.client.HTTPConnection, method: str, path: str, body: Optional[Dict] = None) -> bytes:
+    headers = {"Content-Type": "application/json"} if body is not None else {}
+    connection.request(method, path, None if body is None else json.dumps(body), headers)
+    response = connection.getresponse()
+    data = response.read()
+    assert response.status < 300, (method, path, response.status, data)
+    return data
+
+
+def start_server(port: int, workers: int, shared_file: Optional[str]) -> subprocess.Popen:
+    env = dict(os.environ, PYTHONPATH=str(APP_DIR))
+    env.pop("TODO_DATA_DIR", None)
+    env.pop("TODO_SHARED_FILE", None)
+    if shared_file is not None:
+        env["TODO_SHARED_FILE"] = shared_file
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--workers", str(workers),
+         "--log-level", "warning", "--no-access-log"],
+        cwd=APP_DIR, env=env,
+    )
+    deadline = time.monotonic() + 60
+    while True:
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+            request(connection, "GET", "/health")
+            connection.close()
+            break
+        except (OSError, http.client.HTTPException):
+            if time.monotonic() > deadline or server.poll() is not None:
+                server.kill()
+                raise RuntimeError("uvicorn did not start")
+            time.sleep(0.2)
+    time.sleep(1 + workers * 0.5)  # The other workers start after the first one answers
+    return server
+
+
+def client(port: int, ids: List[str], duration: float, write_ratio: float, seed: int, results) -> None:
+    rng = random.Random(seed)
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    requests = 0
+    deadline = time.perf_counter() + duration
+    try:
+        while time.perf_counter() < deadline:
+            if rng.random() < write_ratio:
+                request(connection, "PUT", f"/todos/{rng.choice(ids)}", {"completed": rng.random() < 0.5})
+            else:
+                request(connection, "GET", f"/todos/?priority={rng.randint(1, 3)}&limit=20")
+            requests += 1
+    finally:
+        connection.close()
+        results.put(requests)
+
+
+def snapshot(port: int) -> List[Tuple[str, bool]]:
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    todos = json.loads(request(connection, "GET", "/todos/?limit=1000"))
+    connection.close()
+    return sorted((todo["id"], todo["completed"]) for todo in todos)
+
+
+def run(workers: int, shared: bool, args: argparse.Namespace) -> float:
+    """Requests per second with ``workers`` uvicorn workers."""
+    port = free_port()
+    with tempfile.TemporaryDirectory() as directory:
+        server = start_server(port, workers, os.path.join(directory, "todos.shm") if shared else None)
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+            ids = [
+                json.loads(request(connection, "POST", "/todos/", {"title": f"Benchmark todo {i}", "priority": i % 3 + 1}))["id"]
+                for i in range(args.items)
+            ]
+            connection.close()
+
+            results = multiprocessing.Queue()
+            clients = [
+                multiprocessing.Process(target=client, args=(port, ids, args.duration, args.write_ratio, seed, results))
+                for seed in range(args.clients)
+            ]
+            for process in clients:
+                process.start()
+            total = sum(results.get() for _ in clients)
+            for process in clients:
+                process.join()
+
+            if shared:
+                views = {tuple(snapshot(port)) for _ in range(workers * 4)}
+                assert len(views) == 1, f"workers disagree: {len(views)} different views of the todos"
+        finally:
+            server.terminate()
+            server.wait()
+    return total / args.duration
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8], help="uvicorn worker counts")
+    parser.add_argument("--clients", type=int, default=16, help="client processes (one connection each)")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds of load per worker count")
+    parser.add_argument("--items", type=int, default=1000, help="todos created before the load")
+    parser.add_argument("--write-ratio", type=float, default=0.1, help="share of requests that are updates")
+    args = parser.parse_args()
+
+    print(f"CPU cores: {os.cpu_count()}, clients: {args.clients}, write ratio: {args.write_ratio:.0%}")
+    baseline = run(1, False, args)
+    print(f"{'store':<8} {'workers':>7} {'requests/s':>11} {'vs baseline':>12}")
+    print(f"{'dict':<8} {1:>7} {baseline:>11.0f} {1:>11.2f}x")
+    for workers in args.workers:
+        rate = run(workers, True, args)
+        print(f"{'shared':<8} {workers:>7} {rate:>11.0f} {rate / baseline:>11.2f}x")
+
+
+if __name__ == "__main__":
+    main()
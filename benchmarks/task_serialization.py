@@ -0,0 +1,69 @@
+"""Benchmark per-item cost of serializing task responses in task-management-app-db.
+
+Compares the old path (``TaskRead.model_validate(task.model_dump())`` per row, then
+FastAPI re-validating against ``response_model`` and encoding with ``json.dumps``)
+with the new path (one cached ``TypeAdapter`` validation from ORM attributes and a
+single ``pydantic_core.to_json`` call, as done by ``PydanticJSONResponse``).
+
+Usage:
+    python benchmarks/task_serialization.py --items 1000 --repeat 50
+"""
+
+import argparse
+import json
+import sys
+import timeit
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "task-management-app-db"))
+
+import pydantic_core  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+
+from models import Task  # noqa: E402
+from schemas import TaskRead  # noqa: E402
+from serialization import PydanticJSONResponse, to_task_reads  # noqa: E402
+
+_response_model_adapter = TypeAdapter(List[TaskRead])
+
+
+def make_tasks(count: int) -> List[Task]:
+    return [
+        Task(id=i, title=f"Task {i}", description="Benchmark task description", completed=i % 2 == 0)
+        for i in range(1, count + 1)
+    ]
+
+
+def before(tasks: List[Task]) -> bytes:
+    items = [TaskRead.model_validate(task.model_dump()) for task in tasks]  # service
+    validated = _response_model_adapter.validate_python(items)  # response_model re-validation
+    content = _response_model_adapter.dump_python(validated, mode="json")  # jsonable encoding
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()  # JSONResponse
+
+
+def after(tasks: List[Task]) -> bytes:
+    return PydanticJSONResponse(to_task_reads(tasks)).body
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=1000, help="tasks per response")
+    parser.add_argument("--repeat", type=int, default=50, help="responses per measurement")
+    args = parser.parse_args()
+
+    tasks = make_tasks(args.items)
+    assert json.loads(before(tasks)) == json.loads(after(tasks)), "both paths must produce the same JSON"
+
+    print(f"{'path':<8} {'us/item':>10} {'ms/response':>12}")
+    results = {}
+    for name, func in (("before", before), ("after", after)):
+        seconds = min(timeit.repeat(lambda: func(tasks), number=args.repeat, repeat=5)) / args.repeat
+        results[name] = seconds
+        print(f"{name:<8} {seconds / args.items * 1e6:>10.2f} {seconds * 1e3:>12.3f}")
+    print(f"speedup  {results['before'] / results['after']:.1f}x")
+    print(f"(pydantic-core {pydantic_core.__version__})")
+
+
+if __name__ == "__main__":
+    main()
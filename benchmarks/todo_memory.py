@@ -0,0 +1,109 @@
+"""Measure resident memory per todo in the task_management in-memory store.
+
+Compares the old representation (a plain class with a per-instance ``__dict__`` and a
+``uuid.UUID`` per todo, keyed by UUID) with the current ``models.Todo`` (``__slots__``,
+128-bit integer key, interned strings and shared dates, keyed by integer). Input data is
+built the same way for both, as request bodies would be: fresh strings and dates per todo,
+with titles, descriptions and due dates repeating across todos. The last row also counts
+the repository's secondary indexes.
+
+Usage:
+    python benchmarks/todo_memory.py --items 100000
+"""
+
+import argparse
+import gc
+import sys
+import tracemalloc
+import uuid
+from datetime import date
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "task_management"))
+
+from models import Todo  # noqa: E402
+from repositories import TodoRepository  # noqa: E402
+
+Fields = Tuple[str, Optional[str], bool, int, Optional[date]]
+
+
+class LegacyTodo:
+    """The Todo model before it was made compact (see git history of task_management/models.py)."""
+
+    def __init__(
+        self,
+        title: str,
+        description: Optional[str] = None,
+        completed: bool = False,
+        priority: int = 3,
+        due_date: Optional[date] = None,
+        id: Optional[uuid.UUID] = None,
+    ):
+        self.id: uuid.UUID = id if id else uuid.uuid4()
+        self.title = title
+        self.description = description
+        self.completed = completed
+        self.priority = priority
+        self.due_date = due_date
+
+
+def todo_fields(count: int) -> Iterator[Fields]:
+    for i in range(count):
+        due_date = date.fromordinal(date(2026, 1, 1).toordinal() + i % 365) if i % 2 else None
+        description = "".join(("Follow up with the team about item ", str(i % 50))) if i % 3 else None
+        yield "".join(("Task ", str(i % 1000))), description, i % 4 == 0, i % 3 + 1, due_date
+
+
+def build_legacy(count: int) -> Any:
+    store: Dict[uuid.UUID, LegacyTodo] = {}
+    for title, description, completed, priority, due_date in todo_fields(count):
+        todo = LegacyTodo(title, description, completed, priority, due_date)
+        store[todo.id] = todo
+    return store
+
+
+def build_compact(count: int) -> Any:
+    store: Dict[int, Todo] = {}
+    for title, description, completed, priority, due_date in todo_fields(count):
+        todo = Todo(title, description, completed, priority, due_date)
+        store[todo.key] = todo
+    return store
+
+
+def build_repository(count: int) -> Any:
+    repository = TodoRepository()
+    for title, description, completed, priority, due_date in todo_fields(count):
+        repository.add(Todo(title, description, completed, priority, due_date))
+    return repository
+
+
+def measure(build: Callable[[int], Any], count: int) -> float:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = build(count)
+        gc.collect()
+        allocated, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return allocated / count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=100_000, help="todos to keep resident")
+    args = parser.parse_args()
+
+    print(f"{'representation':<22} {'bytes/todo':>10}")
+    results = {}
+    for name, build in (("before", build_legacy), ("after", build_compact), ("after + indexes", build_repository)):
+        results[name] = measure(build, args.items)
+        print(f"{name:<22} {results[name]:>10.1f}")
+    print(f"reduction              {results['before'] / results['after']:.2f}x")
+    print(f"(Python {sys.version.split()[0]}, {args.items} todos)")
+
+
+if __name__ == "__main__":
+    main()
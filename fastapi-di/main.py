@@ -1,5 +1,6 @@
 from fastapi import FastAPI, Depends
 from typing import Annotated
+from metrics import instrument
 
 app = FastAPI(title="FASTAPI DI APP")
 
@@ -53,4 +54,8 @@ async def pesan_latte(
     """Endpoint untuk memesan latte."""
     print(f"\n[DEBUG] --> Endpoint: 'pesan_latte_endpoint' dipanggil untuk {nama_pelanggan}.")
     pesan_latte = barista.siapkan_latte(nama_pelanggan)
-    return {"status_pesanan": "Sukses", "minuman_anda": pesan_latte}
\ No newline at end of file
+    return {"status_pesanan": "Sukses", "minuman_anda": pesan_latte}
+
+
+# Metrik Prometheus di GET /metrics; dipanggil terakhir agar semua route ikut terbungkus
+instrument(app)
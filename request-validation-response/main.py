@@ -2,6 +2,7 @@ from typing import Annotated, Optional
 
 from fastapi import FastAPI, HTTPException, Path, status
 from pydantic import BaseModel, Field
+from metrics import instrument
 
 # --- In-Memory Databases/Data for Demo ---
 in_memory_products_db = {
@@ -144,3 +145,7 @@ async def get_product(product_id: int):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product not found")
 
     return ProductResponse(**in_memory_products_db[product_id])
+
+
+# Metrik Prometheus di GET /metrics; dipanggil terakhir agar semua route ikut terbungkus
+instrument(app)
@@ -0,0 +1,190 @@
+# app/archival.py
+import asyncio
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from cache import TaskCache, task_cache
+from config import (
+    ARCHIVE_AFTER_DAYS,
+    ARCHIVE_CHUNK_PAUSE_MS,
+    ARCHIVE_CHUNK_SIZE,
+    ARCHIVE_ENABLED,
+    ARCHIVE_INTERVAL_SECONDS,
+    ARCHIVE_RETENTION_DAYS,
+)
+from database import AsyncSessionLocal
+from logging_config import get_logger
+from repositories import TaskRepository
+
+logger = get_logger("database")
+
+
+class ArchiveWorker:
+    """Worker background yang memindahkan tugas selesai lama ke task_archive secara berkala.
+
+    Setiap chunk adalah transaksi tulis tersendiri yang memakai koneksi penulis yang sama
+    dengan request (pool_size=1). Di antara chunk worker melepas koneksi dan tidur
+    `chunk_pause_ms`, sehingga request yang sedang antre mendapat giliran dan write lock
+    tidak pernah ditahan lebih lama dari satu chunk.
+    """
+
+    def __init__(
+        self,
+        session_factory: "async_sessionmaker[AsyncSession]",
+        archive_after: timedelta,
+        retention: Optional[timedelta],
+        interval_seconds: float,
+        chunk_size: int,
+        chunk_pause_ms: float,
+        cache: Optional[TaskCache] = None,
+    ):
+        self.session_factory = session_factory
+        self.archive_after = archive_after
+        self.retention = retention
+        self.interval = interval_seconds
+        self.chunk_size = chunk_size
+        self.chunk_pause = chunk_pause_ms / 1000
+        self.cache = cache
+        self._worker: "Optional[asyncio.Task[None]]" = None
+        self._run_lock = asyncio.Lock()
+        # Metrik, dilaporkan lewat GET /tasks/archive/stats
+        self.runs = 0
+        self.archived_total = 0
+        self.purged_total = 0
+        self.running = False
+        self.current_run: Dict[str, Any] = {}
+        self._run_started = 0.0
+        self.last_run: Dict[str, Any] = {}
+        self.last_error: Optional[str] = None
+
+    def start(self) -> None:
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run(), name="archive-worker")
+
+    async def stop(self) -> None:
+        """Membatalkan worker; chunk yang sedang berjalan di-rollback oleh session-nya."""
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Archive run failed") # last_error sudah dicatat run_once
+            await asyncio.sleep(self.interval)
+
+    async def _chunk(self, step: str, before: datetime) -> int:
+        async with self.session_factory() as session:
+            repository = TaskRepository(session=session)
+            if step == "archived":
+                task_ids = await repository.archive_completed(before, self.chunk_size)
+                if task_ids and self.cache is not None:
+                    self.cache.invalidate(task_ids)
+                return len(task_ids)
+            return await repository.purge_archive(before, self.chunk_size)
+
+    def _update_throughput(self) -> None:
+        elapsed = time.perf_counter() - self._run_started
+        self.current_run["elapsed_seconds"] = round(elapsed, 3)
+        if elapsed > 0:
+            rows = self.current_run["archived"] + self.current_run["purged"]
+            self.current_run["rows_per_second"] = round(rows / elapsed, 1)
+
+    async def _drain(self, step: str, before: datetime) -> int:
+        """Menjalankan chunk `step` ("archived" atau "purged") sampai tidak ada baris tersisa, mengembalikan jumlah baris."""
+        total = 0
+        while True:
+            count = await self._chunk(step, before)
+            total += count
+            self.current_run[step] = total
+            self.current_run["chunks"] += 1
+            self._update_throughput()
+            if count < self.chunk_size:
+                return total
+            await asyncio.sleep(self.chunk_pause) # Beri giliran ke request yang antre write lock
+
+    async def run_once(self) -> Dict[str, Any]:
+        """Satu putaran arsip + purge; juga bisa dipanggil langsung (mis. dari script)."""
+        # Putaran manual menunggu putaran background (dan sebaliknya): keduanya berbagi current_run
+        async with self._run_lock:
+            return await self._run_once()
+
+    async def _run_once(self) -> Dict[str, Any]:
+        now = datetime.now()
+        self.running = True
+        self._run_started = time.perf_counter()
+        self.current_run = {
+            "started_at": now.isoformat(),
+            "archived": 0,
+            "purged": 0,
+            "chunks": 0,
+            "elapsed_seconds": 0.0,
+            "rows_per_second": 0.0,
+        }
+        try:
+            archived = await self._drain("archived", now - self.archive_after)
+            purged = await self._drain("purged", now - self.retention) if self.retention else 0
+            self._update_throughput()
+            run = self.current_run
+        except Exception as exc:
+            self.last_error = repr(exc)
+            raise
+        finally:
+            # Juga setelah gagal/dibatalkan: stats tidak boleh terus menampilkan putaran yang sudah berhenti
+            self.running = False
+            self.current_run = {}
+        self.runs += 1
+        self.archived_total += archived
+        self.purged_total += purged
+        self.last_run = run
+        self.last_error = None
+        if archived or purged:
+            logger.info(
+                "Archived %s and purged %s tasks",
+                archived,
+                purged,
+                extra={"archived": archived, "purged": purged, "rows_per_second": run["rows_per_second"]},
+            )
+        return run
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "runs": self.runs,
+            "archived_total": self.archived_total,
+            "purged_total": self.purged_total,
+            "chunk_size": self.chunk_size,
+            "interval_seconds": self.interval,
+            "current_run": self.current_run or None,
+            "last_run": self.last_run or None,
+            "last_error": self.last_error,
+        }
+
+
+# Satu worker per proses; None jika ARCHIVE_ENABLED tidak diaktifkan
+archive_worker: Optional[ArchiveWorker] = (
+    ArchiveWorker(
+        AsyncSessionLocal,
+        archive_after=timedelta(days=ARCHIVE_AFTER_DAYS),
+        retention=timedelta(days=ARCHIVE_RETENTION_DAYS) if ARCHIVE_RETENTION_DAYS > 0 else None,
+        interval_seconds=ARCHIVE_INTERVAL_SECONDS,
+        chunk_size=ARCHIVE_CHUNK_SIZE,
+        chunk_pause_ms=ARCHIVE_CHUNK_PAUSE_MS,
+        cache=task_cache,
+    )
+    if ARCHIVE_ENABLED
+    else None
+)
@@ -0,0 +1,122 @@
+# app/batching.py
+import asyncio
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from config import WRITE_BATCH_MAX_DELAY_MS, WRITE_BATCH_MAX_SIZE, WRITE_BATCHING_ENABLED
+from database import AsyncSessionLocal
+from logging_config import get_logger
+from repositories import TaskRepository
+
+logger = get_logger("database")
+
+# Operasi tulis yang dijalankan di dalam batch; menerima repository tanpa autocommit
+WriteOperation = Callable[[TaskRepository], Awaitable[Any]]
+_Pending = Tuple[WriteOperation, "asyncio.Future[Any]"]
+
+
+class WriteCoalescer:
+    """Menggabungkan operasi tulis yang datang bersamaan menjadi satu transaksi (group commit).
+
+    Batch ditutup setelah `max_batch_size` operasi atau `max_delay_ms` sejak operasi
+    pertama, mana yang lebih dulu. Setiap operasi berjalan di SAVEPOINT sendiri: jika satu
+    gagal, hanya pemanggil itu yang menerima exception, sisanya tetap di-commit bersama.
+    """
+
+    def __init__(
+        self,
+        session_factory: "async_sessionmaker[AsyncSession]",
+        max_batch_size: int,
+        max_delay_ms: float,
+    ):
+        self.session_factory = session_factory
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay_ms / 1000
+        self._queue: "Optional[asyncio.Queue[Optional[_Pending]]]" = None
+        self._worker: "Optional[asyncio.Task[None]]" = None
+        self.batches = 0
+        self.operations = 0
+
+    def start(self) -> None:
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run(), name="write-coalescer")
+
+    async def stop(self) -> None:
+        """Memproses sisa antrean lalu menghentikan worker."""
+        if self._worker is None or self._queue is None:
+            return
+        await self._queue.put(None)
+        await self._worker
+        self._worker = None
+
+    async def submit(self, operation: WriteOperation) -> Any:
+        """Mengantrekan operasi dan menunggu hasilnya setelah batch-nya di-commit."""
+        self.start() # Worker dijalankan saat pertama dipakai jika belum distart dari lifespan
+        assert self._queue is not None
+        future: "asyncio.Future[Any]" = asyncio.get_running_loop().create_future()
+        await self._queue.put((operation, future))
+        return await future
+
+    async def _run(self) -> None:
+        assert self._queue is not None
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            first = await self._queue.get()
+            if first is None:
+                break
+            batch: List[_Pending] = [first]
+            deadline = loop.time() + self.max_delay
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            await self._flush(batch)
+
+    async def _flush(self, batch: List[_Pending]) -> None:
+        self.batches += 1
+        self.operations += len(batch)
+        logger.debug("Committing write batch of %s operations", len(batch))
+        completed: List[Tuple["asyncio.Future[Any]", Any]] = []
+        try:
+            async with self.session_factory() as session:
+                repository = TaskRepository(session=session, autocommit=False)
+                for operation, future in batch:
+                    if future.done(): # Pemanggil sudah dibatalkan (mis. client disconnect)
+                        continue
+                    try:
+                        async with session.begin_nested():
+                            result = await operation(repository)
+                    except Exception as exc:
+                        future.set_exception(exc)
+                        continue
+                    completed.append((future, result))
+                await session.commit()
+        except Exception as exc:
+            logger.exception("Write batch failed")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        for future, result in completed:
+            if not future.done():
+                future.set_result(result)
+
+
+# Satu coalescer per proses; None jika WRITE_BATCHING_ENABLED tidak diaktifkan
+write_coalescer: Optional[WriteCoalescer] = (
+    WriteCoalescer(AsyncSessionLocal, WRITE_BATCH_MAX_SIZE, WRITE_BATCH_MAX_DELAY_MS)
+    if WRITE_BATCHING_ENABLED
+    else None
+)
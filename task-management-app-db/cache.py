@@ -0,0 +1,82 @@
+# app/cache.py
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+
+from config import TASK_CACHE_ENABLED, TASK_CACHE_MAX_SIZE, TASK_CACHE_TTL_SECONDS
+from schemas import TaskRead
+
+
+class TaskCache:
+    """LRU cache in-process dengan TTL untuk objek TaskRead, dikunci dengan ID tugas.
+
+    Semua operasi sinkron (tanpa await), jadi aman dipakai bersama oleh semua request
+    di satu event loop tanpa lock.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[int, Tuple[float, TaskRead]]" = OrderedDict()
+        # Naik setiap kali ada invalidasi. Pembaca mencatat nilainya sebelum query ke DB
+        # dan hasilnya hanya disimpan jika belum ada invalidasi di antaranya,
+        # sehingga data lama dari read yang "kalah balapan" tidak masuk ke cache.
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, task_id: int) -> Optional[TaskRead]:
+        entry = self._entries.get(task_id)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, task = entry
+        if expires_at < time.monotonic():
+            del self._entries[task_id]
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(task_id)
+        self.hits += 1
+        return task
+
+    def set(self, task_id: int, task: TaskRead, generation: Optional[int] = None) -> None:
+        if generation is not None and generation != self.generation:
+            return
+        self._entries[task_id] = (time.monotonic() + self.ttl_seconds, task)
+        self._entries.move_to_end(task_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, task_ids: Iterable[int]) -> None:
+        self.generation += 1
+        for task_id in task_ids:
+            self._entries.pop(task_id, None)
+
+    def clear(self) -> None:
+        self.generation += 1
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+# Satu instance per proses; None jika cache dimatikan lewat TASK_CACHE_ENABLED=0
+task_cache: Optional[TaskCache] = (
+    TaskCache(max_size=TASK_CACHE_MAX_SIZE, ttl_seconds=TASK_CACHE_TTL_SECONDS)
+    if TASK_CACHE_ENABLED
+    else None
+)
@@ -0,0 +1,97 @@
+# app/check_query_budgets.py
+"""Memeriksa jumlah query SQL per endpoint terhadap budget di QUERY_BUDGETS.
+
+Menjalankan setiap endpoint lewat TestClient terhadap database sementara dan menghitung
+statement-nya dengan `assert_max_queries` (lihat timing.py). Keluar dengan status 1 jika ada
+endpoint yang melebihi budget, sehingga regresi N+1 / query tambahan ketahuan sebelum rilis.
+
+    python check_query_budgets.py [--verbose]
+"""
+import argparse
+import os
+import sys
+import tempfile
+from typing import Any, Callable, Dict, List, Tuple
+
+# Database sementara dan cache dimatikan (agar GET /tasks/{id} benar-benar ke DB);
+# harus diset sebelum config/database di-import
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{tempfile.mkdtemp(prefix='query-budgets-')}/budgets.db"
+os.environ["TASK_CACHE_ENABLED"] = "0"
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from fastapi.testclient import TestClient  # noqa: E402
+from httpx import Response  # noqa: E402
+
+from main import app  # noqa: E402
+from timing import assert_max_queries  # noqa: E402
+
+# Budget maksimal query per endpoint (BEGIN/COMMIT tidak dihitung)
+QUERY_BUDGETS: Dict[str, int] = {
+    "POST /tasks/": 1, # INSERT
+    "GET /tasks/": 2, # versi koleksi (ETag) + halaman
+    "GET /tasks/search": 1,
+    "GET /tasks/stats": 2, # total + per hari
+    "GET /tasks/{task_id}": 1,
+    "PUT /tasks/{task_id}": 1, # UPDATE ... RETURNING
+    "DELETE /tasks/{task_id}": 1, # DELETE ... RETURNING
+    "POST /tasks/bulk": 1, # satu INSERT ... RETURNING id untuk seluruh batch
+    "PATCH /tasks/bulk": 2, # SELECT ID yang ada + satu executemany UPDATE
+    "DELETE /tasks/bulk": 1,
+    "GET /tasks/export": 1,
+}
+
+Call = Callable[[TestClient, Dict[str, Any]], Response]
+
+# Dijalankan berurutan; `state` membawa ID yang dibuat oleh langkah sebelumnya
+CALLS: List[Tuple[str, Call]] = [
+    ("POST /tasks/bulk", lambda client, state: client.post(
+        "/tasks/bulk", json=[{"title": f"budget {i}", "description": "query budget"} for i in range(50)]
+    )),
+    ("POST /tasks/", lambda client, state: client.post("/tasks/", json={"title": "budget single"})),
+    ("GET /tasks/", lambda client, state: client.get("/tasks/", params={"limit": 20})),
+    ("GET /tasks/search", lambda client, state: client.get("/tasks/search", params={"q": "budg"})),
+    ("GET /tasks/stats", lambda client, state: client.get("/tasks/stats")),
+    ("GET /tasks/{task_id}", lambda client, state: client.get(f"/tasks/{state['id']}")),
+    ("PUT /tasks/{task_id}", lambda client, state: client.put(f"/tasks/{state['id']}", json={"completed": True})),
+    ("PATCH /tasks/bulk", lambda client, state: client.patch(
+        "/tasks/bulk", json=[{"id": task_id, "completed": True} for task_id in state["bulk_ids"][:10]]
+    )),
+    ("GET /tasks/export", lambda client, state: client.get("/tasks/export")),
+    ("DELETE /tasks/{task_id}", lambda client, state: client.delete(f"/tasks/{state['id']}")),
+    ("DELETE /tasks/bulk", lambda client, state: client.request(
+        "DELETE", "/tasks/bulk", json=state["bulk_ids"][10:20]
+    )),
+]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--verbose", action="store_true", help="cetak semua statement per endpoint")
+    args = parser.parse_args()
+
+    failures = 0
+    state: Dict[str, Any] = {}
+    with TestClient(app) as client:
+        for endpoint, call in CALLS:
+            budget = QUERY_BUDGETS[endpoint]
+            try:
+                with assert_max_queries(budget) as log:
+                    response = call(client, state)
+            except AssertionError as exc:
+                failures += 1
+                print(f"FAIL {endpoint}: {exc}", file=sys.stderr)
+                continue
+            response.raise_for_status()
+            if endpoint == "POST /tasks/bulk":
+                state["bulk_ids"] = [item["id"] for item in response.json()["results"]]
+            elif endpoint == "POST /tasks/":
+                state["id"] = response.json()["id"]
+            print(f"ok   {endpoint}: {len(log)}/{budget} queries, {log.elapsed * 1000:.2f} ms")
+            if args.verbose:
+                for statement in log.statements:
+                    print(f"       {' '.join(statement.split())}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
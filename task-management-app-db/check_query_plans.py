@@ -0,0 +1,154 @@
+# app/check_query_plans.py
+"""Memeriksa bahwa query TaskRepository tidak melakukan full table scan.
+
+Menjalankan setiap method repository terhadap database sementara yang sudah dimigrasi,
+merekam semua SQL yang dikirim, lalu menjalankan EXPLAIN QUERY PLAN untuk masing-masing.
+Keluar dengan status 1 jika ada plan "SCAN <tabel>" tanpa index yang tidak diizinkan.
+
+    python check_query_plans.py [--verbose]
+"""
+import argparse
+import asyncio
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Tuple
+
+# Database sementara; harus diset sebelum config/database di-import
+_DB_PATH = os.path.join(tempfile.mkdtemp(prefix="query-plans-"), "plans.db")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_DB_PATH}"
+
+from sqlalchemy import event  # noqa: E402
+from sqlalchemy.engine.interfaces import ExecuteStyle  # noqa: E402
+
+from database import AsyncSessionLocal, create_db_and_tables, dispose_engines, read_engine, write_engine  # noqa: E402
+from models import Task  # noqa: E402
+from pagination import cursor_from_row, decode_cursor  # noqa: E402
+from repositories import TaskRepository  # noqa: E402
+from search import build_match_query  # noqa: E402
+
+# Scan penuh yang memang disengaja: (method, tabel) -> alasan
+ALLOWED_FULL_SCANS: Dict[Tuple[str, str], str] = {
+    ("get_all", "task"): "mengembalikan semua baris",
+    ("stream_rows", "task"): "export membaca semua baris dalam urutan rowid",
+    ("get_stats", "task_daily_stats"): "berjalan di urutan primary key dan berhenti di LIMIT",
+}
+
+# "SCAN task" / "SCAN TABLE task" tanpa "USING ... INDEX" = full table scan
+_FULL_SCAN = re.compile(r"^SCAN (?:TABLE )?(\w+)$")
+_SKIPPED_PREFIXES = ("BEGIN", "COMMIT", "ROLLBACK", "SAVEPOINT", "RELEASE", "PRAGMA")
+
+Captured = List[Tuple[str, str, Any]]
+
+
+def _capture(captured: Captured, label: List[str]) -> None:
+    for engine in (write_engine, read_engine):
+
+        @event.listens_for(engine.sync_engine, "before_cursor_execute")
+        def record(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+            if not statement.lstrip().upper().startswith(_SKIPPED_PREFIXES):
+                # insertmanyvalues: satu statement multi-VALUES yang sudah membawa parameter semua barisnya
+                if executemany and context.execute_style is not ExecuteStyle.INSERTMANYVALUES:
+                    parameters = parameters[0]
+                captured.append((label[0], statement, parameters))
+
+
+async def _exercise(label: List[str]) -> None:
+    """Memanggil semua method repository dengan variasi parameter yang dipakai router."""
+    now = datetime.now()
+
+    async def call(name: str, method: Any, *args: Any, **kwargs: Any) -> Any:
+        label[0] = name
+        result = method(*args, **kwargs)
+        if hasattr(result, "__aiter__"):
+            return [chunk async for chunk in result]
+        return await result
+
+    async with AsyncSessionLocal() as session:
+        repository = TaskRepository(session=session)
+        task_ids = await call("bulk_create", repository.bulk_create, [
+            {"title": f"task {i}", "description": "plan check", "completed": i % 2 == 0} for i in range(20)
+        ])
+        await call("create", repository.create, Task(title="single"))
+        await call("get_by_id", repository.get_by_id, task_ids[0])
+        await call("exists", repository.exists, task_ids[0])
+        await call("get_collection_version", repository.get_collection_version)
+        await call("get_stats", repository.get_stats, 30)
+        await call("get_all", repository.get_all)
+        await call("stream_rows", repository.stream_rows, 10)
+        for sort_by in ("created_at", "title"):
+            for order in ("asc", "desc"):
+                for completed in (None, True):
+                    page = await call(
+                        "get_page", repository.get_page, limit=5, completed=completed, sort_by=sort_by, order=order
+                    )
+                    after = decode_cursor(cursor_from_row(page[-1], sort_by, order), sort_by, order)
+                    await call(
+                        "get_page", repository.get_page,
+                        limit=5, after=after, completed=completed, sort_by=sort_by, order=order,
+                    )
+            await call(
+                "get_page", repository.get_page,
+                limit=5, created_from=now - timedelta(days=1), created_to=now + timedelta(days=1), sort_by=sort_by,
+            )
+        await call("search", repository.search, build_match_query("task pla"), limit=5)
+        await call("update", repository.update, task_ids[1], {"title": "updated"})
+        await call("update", repository.update, task_ids[1], {"completed": True}, [now])
+        await call("bulk_update", repository.bulk_update, [{"id": task_ids[2], "completed": True}])
+        await call("delete", repository.delete, task_ids[3])
+        await call("delete", repository.delete, task_ids[4], [now])
+        await call("bulk_delete", repository.bulk_delete, task_ids[5:7])
+        await call("archive_completed", repository.archive_completed, now + timedelta(days=1), 5)
+        await call("purge_archive", repository.purge_archive, now + timedelta(days=1), 5)
+
+
+def _check(captured: Captured, verbose: bool) -> List[str]:
+    failures = []
+    conn = sqlite3.connect(_DB_PATH)
+    try:
+        for method, statement, parameters in captured:
+            # insertmanyvalues dapat menambahkan parameter sentinel di luar placeholder statement
+            parameters = tuple(parameters)[: statement.count("?")]
+            plan = conn.execute(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+            details = [row[-1] for row in plan]
+            if verbose:
+                print(f"[{method}] {' '.join(statement.split())}")
+                for detail in details:
+                    print(f"    {detail}")
+            for detail in details:
+                match = _FULL_SCAN.match(detail)
+                if match and (method, match.group(1)) not in ALLOWED_FULL_SCANS:
+                    failures.append(f"[{method}] {detail}: {' '.join(statement.split())}")
+    finally:
+        conn.close()
+    return failures
+
+
+async def _main(verbose: bool) -> int:
+    captured: Captured = []
+    label = ["migrations"]
+    await create_db_and_tables()
+    _capture(captured, label)
+    try:
+        await _exercise(label)
+    finally:
+        await dispose_engines()
+    failures = _check(captured, verbose)
+    for failure in failures:
+        print(f"FULL SCAN {failure}", file=sys.stderr)
+    print(f"Checked {len(captured)} statements, {len(failures)} full table scan(s).")
+    return 1 if failures else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--verbose", action="store_true", help="cetak plan setiap statement")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(_main(args.verbose)))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,77 @@
+import os
+from dataclasses import dataclass
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
-DATABASE_URL = f"sqlite+aiosqlite:///{BASE_DIR}/tasks.db"
\ No newline at end of file
+DATABASE_URL = os.getenv("DATABASE_URL", f"sqlite+aiosqlite:///{BASE_DIR}/tasks.db")
+
+
+# Profil engine SQLite: PRAGMA yang dipasang di setiap koneksi baru
+# dan ukuran pool untuk session baca (GET) dan session tulis (mutasi).
+@dataclass(frozen=True)
+class EngineProfile:
+    echo: bool  # Cetak semua SQL ke log
+    journal_mode: str  # WAL: pembaca tidak memblokir penulis dan sebaliknya
+    synchronous: str  # NORMAL cukup aman di mode WAL dan jauh lebih cepat dari FULL
+    cache_size: int  # Nilai negatif = KiB, mis. -65536 = 64 MiB page cache per koneksi
+    mmap_size: int  # Byte file database yang dibaca lewat memory-mapping
+    busy_timeout_ms: int  # Lama menunggu lock sebelum "database is locked"
+    read_pool_size: int  # Jumlah koneksi read-only yang boleh dipakai bersamaan
+
+
+ENGINE_PROFILES = {
+    "development": EngineProfile(
+        echo=True,
+        journal_mode="DELETE",
+        synchronous="FULL",
+        cache_size=-2000,
+        mmap_size=0,
+        busy_timeout_ms=5000,
+        read_pool_size=5,
+    ),
+    "production": EngineProfile(
+        echo=False,
+        journal_mode="WAL",
+        synchronous="NORMAL",
+        cache_size=-65536,
+        mmap_size=256 * 1024 * 1024,
+        busy_timeout_ms=5000,
+        read_pool_size=int(os.getenv("DB_READ_POOL_SIZE", "8")),
+    ),
+}
+
+DB_PROFILE = os.getenv("DB_PROFILE", "production")
+ENGINE_PROFILE = ENGINE_PROFILES[DB_PROFILE]
+
+# Header X-Query-Count / X-Query-Time-Ms di setiap response (lihat timing.py).
+# Default aktif hanya di profil development.
+QUERY_HEADERS_ENABLED = os.getenv(
+    "QUERY_HEADERS", "1" if DB_PROFILE == "development" else "0"
+).lower() in ("1", "true", "yes")
+
+# Cache read-through untuk GET /tasks/{task_id} (lihat cache.py)
+TASK_CACHE_ENABLED = os.getenv("TASK_CACHE_ENABLED", "1").lower() not in ("0", "false", "no")
+TASK_CACHE_MAX_SIZE = int(os.getenv("TASK_CACHE_MAX_SIZE", "10000"))
+TASK_CACHE_TTL_SECONDS = float(os.getenv("TASK_CACHE_TTL_SECONDS", "30"))
+
+# Logging terstruktur (lihat logging_config.py)
+# LOG_LEVELS mengatur level per layer, mis. "repository=DEBUG,sql=INFO,request=WARNING"
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_LEVELS = os.getenv("LOG_LEVELS", "")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")  # "json" atau "text"
+
+# Group commit untuk POST/PUT /tasks (lihat batching.py). Nonaktif secara default.
+WRITE_BATCHING_ENABLED = os.getenv("WRITE_BATCHING_ENABLED", "0").lower() in ("1", "true", "yes")
+WRITE_BATCH_MAX_SIZE = int(os.getenv("WRITE_BATCH_MAX_SIZE", "64"))
+WRITE_BATCH_MAX_DELAY_MS = float(os.getenv("WRITE_BATCH_MAX_DELAY_MS", "2"))
+
+# Arsip tugas selesai di background (lihat archival.py). Nonaktif secara default.
+# Tugas selesai yang tidak berubah selama ARCHIVE_AFTER_DAYS dipindah ke task_archive per
+# ARCHIVE_CHUNK_SIZE baris; arsip yang lebih tua dari ARCHIVE_RETENTION_DAYS dihapus (0 = simpan).
+ARCHIVE_ENABLED = os.getenv("ARCHIVE_ENABLED", "0").lower() in ("1", "true", "yes")
+ARCHIVE_AFTER_DAYS = float(os.getenv("ARCHIVE_AFTER_DAYS", "30"))
+ARCHIVE_RETENTION_DAYS = float(os.getenv("ARCHIVE_RETENTION_DAYS", "0"))
+ARCHIVE_INTERVAL_SECONDS = float(os.getenv("ARCHIVE_INTERVAL_SECONDS", "3600"))
+ARCHIVE_CHUNK_SIZE = int(os.getenv("ARCHIVE_CHUNK_SIZE", "500"))
+ARCHIVE_CHUNK_PAUSE_MS = float(os.getenv("ARCHIVE_CHUNK_PAUSE_MS", "50"))
@@ -1,36 +1,163 @@
 # app/database.py
-from collections.abc import AsyncGenerator
+import logging
+import time
+from collections.abc import AsyncGenerator, Callable
+from typing import Any, Dict, Iterable, Tuple
 
-from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
-from sqlmodel import SQLModel
+from sqlalchemy import Connection, event
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from config import DATABASE_URL  # Import DATABASE_URL dari config.py
+from config import DATABASE_URL, ENGINE_PROFILE, EngineProfile  # Import konfigurasi dari config.py
+from logging_config import get_logger
+from metrics import registry
+from migrations import run_migrations
+from timing import instrument_engine
 
-# Membuat async engine untuk koneksi database
-# echo=True akan mencetak semua SQL yang dihasilkan oleh SQLModel ke konsol
-async_engine = create_async_engine(DATABASE_URL, echo=True)
+logger = get_logger("database")
+
+# SQL tidak lagi dicetak lewat echo=True (handler sinkron milik SQLAlchemy).
+# Profil dengan echo menaikkan level logger "sqlalchemy.engine" yang diarahkan ke antrean log.
+if ENGINE_PROFILE.echo:
+    logging.getLogger("sqlalchemy.engine").setLevel(logging.INFO)
+
+
+def _install_pragmas(engine: AsyncEngine, profile: EngineProfile, read_only: bool) -> None:
+    """Memasang PRAGMA SQLite di setiap koneksi baru yang dibuat pool."""
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection: Any, connection_record: Any) -> None:
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"PRAGMA busy_timeout = {int(profile.busy_timeout_ms)}")
+        if not read_only:
+            # journal_mode disimpan di file database, cukup diset dari koneksi penulis
+            cursor.execute(f"PRAGMA journal_mode = {profile.journal_mode}")
+        cursor.execute(f"PRAGMA synchronous = {profile.synchronous}")
+        cursor.execute(f"PRAGMA cache_size = {int(profile.cache_size)}")
+        cursor.execute(f"PRAGMA mmap_size = {int(profile.mmap_size)}")
+        if read_only:
+            cursor.execute("PRAGMA query_only = ON")
+        cursor.close()
+
+
+def _install_explicit_begin(engine: AsyncEngine) -> None:
+    """Mengambil alih BEGIN dari driver agar SAVEPOINT berfungsi dan write lock diambil di awal.
+
+    Driver sqlite3/aiosqlite mengelola transaksi sendiri dan merusak SAVEPOINT. Dengan
+    isolation_level=None SQLAlchemy yang mengirim BEGIN; IMMEDIATE mengambil write lock
+    sejak awal transaksi sehingga tidak ada deadlock saat upgrade lock dari baca ke tulis.
+    """
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def disable_driver_transactions(dbapi_connection: Any, connection_record: Any) -> None:
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine.sync_engine, "begin")
+    def begin_immediate(conn: Connection) -> None:
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+# Engine penulis: tepat satu koneksi (pool_size=1, tanpa overflow), sehingga semua
+# mutasi dari proses ini antre di pool dan tidak pernah saling berebut write lock SQLite.
+write_engine = create_async_engine(DATABASE_URL, pool_size=1, max_overflow=0)
+_install_pragmas(write_engine, ENGINE_PROFILE, read_only=False)
+_install_explicit_begin(write_engine)
+instrument_engine(write_engine)
+
+# Engine pembaca: pool beberapa koneksi read-only (query_only) untuk route GET.
+# Di mode WAL pembaca tidak diblokir oleh penulis, jadi request baca bisa berjalan paralel.
+read_engine = create_async_engine(
+    DATABASE_URL,
+    pool_size=ENGINE_PROFILE.read_pool_size,
+    max_overflow=0,
+)
+_install_pragmas(read_engine, ENGINE_PROFILE, read_only=True)
+instrument_engine(read_engine)
+
+# --- Metrik pool dan session (lihat metrics.py) ---
+
+_ENGINES = {"write": write_engine, "read": read_engine}
+_pool_checkouts: Dict[str, int] = {name: 0 for name in _ENGINES}
+
+
+def _count_checkouts(name: str, engine: AsyncEngine) -> None:
+    @event.listens_for(engine.sync_engine, "checkout")
+    def count_checkout(dbapi_connection: Any, connection_record: Any, connection_proxy: Any) -> None:
+        _pool_checkouts[name] += 1
+
+
+for _name, _engine in _ENGINES.items():
+    _count_checkouts(_name, _engine)
+
+
+def _pool_stat(stat: str) -> Callable[[], Iterable[Tuple[str, float]]]:
+    # Dibaca saat scrape: QueuePool menyimpan angka ini sendiri, tidak ada biaya per request.
+    # overflow() QueuePool bernilai negatif selama pool belum penuh, jadi dibatasi ke 0.
+    def collect() -> Iterable[Tuple[str, float]]:
+        for name, engine in _ENGINES.items():
+            value = getattr(engine.sync_engine.pool, stat)()
+            yield f'engine="{name}"', max(value, 0)
+
+    return collect
+
+
+registry.collector(
+    "db_pool_checkouts_total", "counter", "Jumlah checkout koneksi dari pool.",
+    lambda: [(f'engine="{name}"', count) for name, count in _pool_checkouts.items()],
+)
+registry.collector("db_pool_checked_out", "gauge", "Koneksi yang sedang dipakai.", _pool_stat("checkedout"))
+registry.collector("db_pool_overflow", "gauge", "Koneksi overflow di atas pool_size.", _pool_stat("overflow"))
+registry.collector("db_pool_size", "gauge", "Ukuran pool (pool_size).", _pool_stat("size"))
+_session_lifetime = registry.histogram(
+    "db_session_lifetime_seconds",
+    "Lama session dari get_session/get_read_session dibuka sampai ditutup.",
+    label_sets=[f'engine="{name}"' for name in _ENGINES],
+)
 
 # Membuat factory untuk AsyncSession
 # class_=AsyncSession: memastikan kita mendapatkan asynchronous session
 # expire_on_commit=False: penting untuk ORM async, objek tidak perlu di-refresh setelah commit
-AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+AsyncSessionLocal = async_sessionmaker(write_engine, class_=AsyncSession, expire_on_commit=False)
+AsyncReadSessionLocal = async_sessionmaker(read_engine, class_=AsyncSession, expire_on_commit=False)
 
-# Fungsi ini akan membuat tabel di database berdasarkan SQLModel kita
+# Menjalankan migrasi skema yang belum diterapkan (lihat migrations.py).
+# Jika skema sudah versi terbaru, hanya satu SELECT ke tabel schema_version yang dijalankan.
 async def create_db_and_tables():
-    print("[DEBUG] --> Database: Creating tables if they don't exist...")
-    async with async_engine.begin() as conn:
-        await conn.run_sync(SQLModel.metadata.create_all)
-    print("[DEBUG] --> Database: Tables created/verified.")
+    async with write_engine.begin() as conn:
+        applied = await conn.run_sync(run_migrations)
+    if applied:
+        logger.info("Applied %s schema migrations", applied)
+    else:
+        logger.info("Schema is up to date")
+
+# Menutup semua koneksi pool saat aplikasi berhenti
+async def dispose_engines() -> None:
+    await read_engine.dispose()
+    await write_engine.dispose()
 
 # Fungsi dependency untuk mendapatkan AsyncSession
 # Ini akan dipanggil oleh FastAPI untuk setiap request yang membutuhkannya
 # Menggunakan 'yield' untuk memastikan session dibuka dan ditutup dengan rapi
+# Session ini memakai engine penulis; gunakan untuk semua mutasi.
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
+    opened = time.perf_counter()
     async with AsyncSessionLocal() as session:
-        print("\n[DEBUG] --> DB Session: Opened for a new request.")
+        logger.debug("Session opened")
         try:
             yield session # Menyediakan session ke endpoint/service
         finally:
             await session.close() # Menutup session setelah request selesai
-            print("[DEBUG] --> DB Session: Closed.")
\ No newline at end of file
+            _session_lifetime['engine="write"'].observe(time.perf_counter() - opened)
+            logger.debug("Session closed")
+
+# Session read-only dari pool pembaca, untuk route GET
+async def get_read_session() -> AsyncGenerator[AsyncSession, None]:
+    opened = time.perf_counter()
+    async with AsyncReadSessionLocal() as session:
+        logger.debug("Read-only session opened")
+        try:
+            yield session
+        finally:
+            await session.close()
+            _session_lifetime['engine="read"'].observe(time.perf_counter() - opened)
+            logger.debug("Read-only session closed")
@@ -0,0 +1,63 @@
+# app/etags.py
+import hashlib
+from datetime import datetime
+from typing import List, Optional
+
+from schemas import TaskRead
+
+_TIMESTAMP_FORMAT = "%Y%m%d%H%M%S%f"
+
+
+def version_etag(task_id: int, version: datetime) -> str:
+    """Strong ETag per tugas, diturunkan dari ID dan updated_at (berubah di setiap update)."""
+    return f'"{task_id}-{version.strftime(_TIMESTAMP_FORMAT)}"'
+
+
+def task_etag(task: TaskRead) -> str:
+    return version_etag(task.id, task.updated_at or task.created_at)
+
+
+def collection_etag(version: int, query_string: str) -> str:
+    """ETag untuk GET /tasks: versi koleksi + parameter query (halaman/filter berbeda = ETag berbeda)."""
+    digest = hashlib.blake2b(query_string.encode(), digest_size=8).hexdigest()
+    return f'"c{version}-{digest}"'
+
+
+def _split(header: str) -> List[str]:
+    return [tag.strip() for tag in header.split(",") if tag.strip()]
+
+
+def if_none_match(header: Optional[str], etag: str) -> bool:
+    """True jika If-None-Match cocok (perbandingan weak, sesuai RFC 9110) -> balas 304."""
+    if not header:
+        return False
+    tags = _split(header)
+    if "*" in tags:
+        return True
+    return any(tag.removeprefix("W/") == etag for tag in tags)
+
+
+def if_match_timestamps(header: Optional[str], task_id: int) -> Optional[List[datetime]]:
+    """Mengubah If-Match menjadi daftar updated_at yang diterima untuk tugas `task_id`.
+
+    None berarti tidak ada syarat (header kosong atau "*"). List kosong berarti tidak ada
+    ETag yang mungkin cocok, sehingga update/delete pasti gagal dengan 412.
+    If-Match memakai perbandingan strong, jadi ETag weak (W/...) tidak pernah cocok.
+    """
+    if not header:
+        return None
+    tags = _split(header)
+    if "*" in tags:
+        return None
+    timestamps = []
+    for tag in tags:
+        if tag.startswith("W/") or len(tag) < 2 or tag[0] != '"' or tag[-1] != '"':
+            continue
+        tag_id, _, stamp = tag[1:-1].partition("-")
+        if tag_id != str(task_id):
+            continue
+        try:
+            timestamps.append(datetime.strptime(stamp, _TIMESTAMP_FORMAT))
+        except ValueError:
+            continue
+    return timestamps
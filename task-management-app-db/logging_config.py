@@ -0,0 +1,97 @@
+# app/logging_config.py
+import json
+import logging
+import queue
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional
+
+from config import LOG_FORMAT, LOG_LEVEL, LOG_LEVELS
+
+# Nama layer -> nama logger. Semua logger aplikasi berada di bawah "tasks",
+# sedangkan SQL dari SQLAlchemy memakai logger "sqlalchemy.engine".
+LAYER_LOGGERS = {
+    "app": "tasks.app",
+    "database": "tasks.database",
+    "di": "tasks.di",
+    "endpoint": "tasks.endpoint",
+    "service": "tasks.service",
+    "repository": "tasks.repository",
+    "request": "tasks.request",
+    "sql": "sqlalchemy.engine",
+}
+
+# Atribut bawaan LogRecord; sisanya (dari `extra=`) ikut ditulis sebagai field JSON
+_RESERVED_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+_listener: Optional[QueueListener] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Satu baris JSON per record, termasuk field tambahan dari `extra=`."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload: Dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and not key.startswith("_"):
+                payload[key] = value
+        if record.exc_info:
+            payload["exc"] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str)
+
+
+def get_logger(layer: str) -> logging.Logger:
+    return logging.getLogger(LAYER_LOGGERS[layer])
+
+
+def _parse_levels(spec: str) -> Dict[str, str]:
+    levels = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        layer, _, level = item.partition("=")
+        if layer.strip() not in LAYER_LOGGERS:
+            raise ValueError(f"Unknown log layer {layer!r} in LOG_LEVELS")
+        levels[layer.strip()] = level.strip().upper()
+    return levels
+
+
+def configure_logging() -> None:
+    """Memasang QueueHandler dan menjalankan QueueListener di thread terpisah.
+
+    Handler di event loop hanya memasukkan record ke antrean; menulis ke stdout
+    dilakukan oleh thread listener, sehingga I/O tidak pernah memblokir request.
+    """
+    global _listener
+    if _listener is not None:
+        return
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler(sys.stdout)
+    if LOG_FORMAT == "json":
+        stream_handler.setFormatter(JsonFormatter())
+    else:
+        stream_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    queue_handler = QueueHandler(log_queue)
+
+    for name in ("tasks", "sqlalchemy.engine"):
+        logger = logging.getLogger(name)
+        logger.handlers = [queue_handler]
+        logger.propagate = False
+    logging.getLogger("tasks").setLevel(LOG_LEVEL)
+    for layer, level in _parse_levels(LOG_LEVELS).items():
+        logging.getLogger(LAYER_LOGGERS[layer]).setLevel(level)
+
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown_logging() -> None:
+    """Menghentikan listener setelah semua record di antrean ditulis."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -2,17 +2,35 @@ from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 
-from database import create_db_and_tables  # Fungsi untuk membuat tabel
+from archival import archive_worker
+from batching import write_coalescer
+from database import create_db_and_tables, dispose_engines  # Fungsi untuk membuat tabel
+from logging_config import configure_logging, get_logger, shutdown_logging
+from metrics import instrument
 from routers import tasks  # Router tasks kita
+from timing import RequestTimingMiddleware
+
+logger = get_logger("app")
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    print("\n[DEBUG] --> FastAPI App: Startup event - Creating database tables...")
+    configure_logging()
+    logger.info("Startup: creating database tables")
     await create_db_and_tables()
-    print("[DEBUG] --> FastAPI App: Startup complete.")
+    if write_coalescer is not None:
+        write_coalescer.start()
+    if archive_worker is not None:
+        archive_worker.start()
+    logger.info("Startup complete")
     yield
-    print("\n[DEBUG] --> FastAPI App: Shutdown event - Application shutting down.")
+    logger.info("Shutdown: application shutting down")
+    if archive_worker is not None:
+        await archive_worker.stop()
+    if write_coalescer is not None:
+        await write_coalescer.stop()
+    await dispose_engines()
+    shutdown_logging()
 
 app = FastAPI(
     title="Simple Task Management App using DB",
@@ -21,8 +39,14 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Satu record log terstruktur per request berisi timing fase DI, service, repository dan SQL
+app.add_middleware(RequestTimingMiddleware)
+
 app.include_router(tasks.router)
 
 @app.get("/")
 async def root():
-    return {"message": "Welcome to the Task Management API! Go to /docs for Swagger UI."}
\ No newline at end of file
+    return {"message": "Welcome to the Task Management API! Go to /docs for Swagger UI."}
+
+# Metrik Prometheus di GET /metrics; dipanggil terakhir agar semua route ikut terbungkus
+instrument(app)
\ No newline at end of file
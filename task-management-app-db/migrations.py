@@ -0,0 +1,141 @@
+# app/migrations.py
+from dataclasses import dataclass
+from typing import Callable, List
+
+from sqlalchemy import Connection, MetaData, inspect, text
+from sqlalchemy.schema import CreateIndex, CreateTable
+from sqlmodel import SQLModel
+
+from logging_config import get_logger
+from models import Task
+from search import FTS_TABLE, create_search_index
+from stats import count_archived_in_stats, create_stats_tables
+from versioning import create_version_table
+
+logger = get_logger("database")
+
+SCHEMA_VERSION_TABLE = "schema_version"
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    description: str
+    apply: Callable[[Connection], None]
+
+
+def _create_tables(sync_conn: Connection) -> None:
+    # Database yang dibuat sebelum ada schema_version sudah punya tabelnya; checkfirst membuat
+    # langkah ini aman dijalankan ulang sehingga database lama ikut ter-upgrade.
+    SQLModel.metadata.create_all(sync_conn, checkfirst=True)
+
+
+def _create_indexes(*names: str) -> Callable[[Connection], None]:
+    def apply(sync_conn: Connection) -> None:
+        for index in Task.__table__.indexes:
+            if index.name in names:
+                # IF NOT EXISTS: checkfirst tidak bisa me-reflect index ekspresi di SQLite
+                sync_conn.execute(CreateIndex(index, if_not_exists=True))
+
+    return apply
+
+
+def _list_filter_indexes(sync_conn: Connection) -> None:
+    _create_indexes(
+        "ix_task_created_at_id",
+        "ix_task_completed_created_at_id",
+        "ix_task_title_id",
+        "ix_task_completed_title_id",
+        "ix_task_completed_last_changed",
+    )(sync_conn)
+    # ix_task_title_id sudah mencakup pencarian dan pengurutan berdasarkan title
+    sync_conn.execute(text("DROP INDEX IF EXISTS ix_task_title"))
+
+
+def _autoincrement_task_ids(sync_conn: Connection) -> None:
+    # Tanpa AUTOINCREMENT SQLite memberi tugas baru max(id) + 1, sehingga ID tugas yang diarsipkan
+    # dipakai ulang (dan arsip berikutnya gagal di primary key task_archive). SQLite tidak bisa
+    # mengubah definisi kolom, jadi tabel dibangun ulang: salin baris, hapus tabel lama, rename.
+    # Trigger tidak berjalan saat menyalin (trigger ada di tabel lama) dan rowid tetap sama, sehingga
+    # task_stats dan task_version tidak perlu dihitung ulang.
+    schema = sync_conn.execute(text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'task'")).scalar()
+    if "AUTOINCREMENT" in schema.upper():
+        return  # Database baru: create_all sudah membuatnya dengan AUTOINCREMENT
+    sync_conn.execute(CreateTable(Task.__table__.to_metadata(MetaData(), name="task_new")))
+    columns = ", ".join(column.name for column in Task.__table__.columns)
+    sync_conn.execute(text(f"INSERT INTO task_new ({columns}) SELECT {columns} FROM task"))
+    # Tugas yang sudah mendapat ID bekas tugas arsip diberi ID baru; tanpa itu worker arsip
+    # gagal terus di primary key task_archive saat tiba giliran tugas tersebut.
+    reused = sync_conn.execute(
+        text("SELECT id FROM task_new WHERE id IN (SELECT id FROM task_archive) ORDER BY id")
+    ).scalars().all()
+    last_id = sync_conn.execute(
+        text("SELECT max(coalesce((SELECT max(id) FROM task), 0), coalesce((SELECT max(id) FROM task_archive), 0))")
+    ).scalar()
+    for new_id, old_id in enumerate(reused, start=last_id + 1):
+        sync_conn.execute(text("UPDATE task_new SET id = :new WHERE id = :old"), {"new": new_id, "old": old_id})
+    if reused:
+        logger.warning("Tasks %s reused IDs of archived tasks and were renumbered", list(reused))
+    # DROP TABLE ikut menghapus index dan trigger milik task; keduanya dibuat ulang di bawah
+    sync_conn.execute(text("DROP TABLE task"))
+    sync_conn.execute(text("ALTER TABLE task_new RENAME TO task"))
+    # Lanjutkan setelah ID terbesar yang pernah dipakai, termasuk yang sudah diarsipkan
+    sync_conn.execute(text("DELETE FROM sqlite_sequence WHERE name IN ('task', 'task_new')"))
+    sync_conn.execute(
+        text("INSERT INTO sqlite_sequence (name, seq) VALUES ('task', :seq)"), {"seq": last_id + len(reused)}
+    )
+    _create_indexes(*(index.name for index in Task.__table__.indexes))(sync_conn)
+    create_search_index(sync_conn)
+    if reused:
+        # Index FTS (external content) menunjuk ke rowid lama
+        sync_conn.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+    create_version_table(sync_conn)
+    create_stats_tables(sync_conn)
+
+
+# Urutan dan nomor versi tidak boleh diubah setelah dirilis; tambahkan migrasi baru di akhir.
+MIGRATIONS: List[Migration] = [
+    Migration(1, "create tables", _create_tables),
+    Migration(2, "task_fts full-text index", create_search_index),
+    Migration(3, "task_version collection counter", create_version_table),
+    Migration(4, "task_stats summary tables", create_stats_tables),
+    Migration(5, "list, filter and archive indexes", _list_filter_indexes),
+    Migration(6, "task_stats counts archived tasks", count_archived_in_stats),
+    Migration(7, "task ids are never reused (AUTOINCREMENT)", _autoincrement_task_ids),
+]
+
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+def current_version(sync_conn: Connection) -> int:
+    if not inspect(sync_conn).has_table(SCHEMA_VERSION_TABLE):
+        return 0
+    version = sync_conn.execute(text(f"SELECT max(version) FROM {SCHEMA_VERSION_TABLE}")).scalar()
+    return int(version or 0)
+
+
+def run_migrations(sync_conn: Connection) -> int:
+    """Menjalankan migrasi yang belum diterapkan, mengembalikan jumlah migrasi yang dijalankan.
+
+    Dipanggil di dalam satu transaksi penulis (BEGIN IMMEDIATE), jadi beberapa worker yang
+    start bersamaan menjalankan migrasi satu per satu dan yang berikutnya melihatnya sudah selesai.
+    """
+    version = current_version(sync_conn)
+    if version >= LATEST_VERSION:
+        return 0
+    sync_conn.execute(
+        text(
+            f"CREATE TABLE IF NOT EXISTS {SCHEMA_VERSION_TABLE} ("
+            "version INTEGER PRIMARY KEY, description TEXT NOT NULL, "
+            "applied_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP)"
+        )
+    )
+    pending = [migration for migration in MIGRATIONS if migration.version > version]
+    for migration in pending:
+        logger.info("Applying migration %s: %s", migration.version, migration.description)
+        migration.apply(sync_conn)
+        sync_conn.execute(
+            text(f"INSERT INTO {SCHEMA_VERSION_TABLE} (version, description) VALUES (:version, :description)"),
+            {"version": migration.version, "description": migration.description},
+        )
+    return len(pending)
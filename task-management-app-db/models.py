@@ -2,14 +2,46 @@
 from datetime import datetime
 from typing import Optional
 
+from sqlalchemy import Index, func, text
 from sqlmodel import Field, SQLModel  # Import dari sqlmodel
 
 
 # Model Task kita, merepresentasikan tabel 'task' di database
 class Task(SQLModel, table=True): # table=True berarti ini akan dipetakan ke database table
+    # Index komposit untuk keyset pagination per kolom sort (created_at/title, id), dengan dan
+    # tanpa filter completed, plus index ekspresi untuk query worker arsip (lihat archival.py).
+    # Index baru harus juga ditambahkan sebagai migrasi di migrations.py.
+    __table_args__ = (
+        Index("ix_task_created_at_id", "created_at", "id"),
+        Index("ix_task_completed_created_at_id", "completed", "created_at", "id"),
+        Index("ix_task_title_id", "title", "id"),
+        Index("ix_task_completed_title_id", "completed", "title", "id"),
+        Index(
+            "ix_task_completed_last_changed",
+            "completed",
+            func.coalesce(text("updated_at"), text("created_at")),
+        ),
+        # AUTOINCREMENT: ID tugas yang dihapus atau dipindah ke task_archive tidak pernah dipakai ulang
+        {"sqlite_autoincrement": True},
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True) # Unique ID, auto-incremented
-    title: str = Field(index=True) # Judul tugas, akan diindeks untuk pencarian cepat
+    title: str # Judul tugas; diindeks lewat ix_task_title_id
     description: Optional[str] = Field(default=None) # Optional description
     completed: bool = Field(default=False) # Task status, defaultnya belum selesai
     created_at: datetime = Field(default_factory=datetime.now) # Creation timestamp, defaultnya waktu sekarang
-    updated_at: Optional[datetime] = Field(default_factory=datetime.now) # Update timestamp, akan diupdate
\ No newline at end of file
+    updated_at: Optional[datetime] = Field(default_factory=datetime.now) # Update timestamp, akan diupdate
+
+# Tugas selesai yang sudah diarsipkan oleh worker di archival.py.
+# ID dipertahankan dari tabel task (bukan autoincrement baru).
+class TaskArchive(SQLModel, table=True):
+    __tablename__ = "task_archive"
+    __table_args__ = (Index("ix_task_archive_archived_at", "archived_at"),)
+
+    id: int = Field(primary_key=True)
+    title: str
+    description: Optional[str] = Field(default=None)
+    completed: bool = Field(default=True)
+    created_at: datetime
+    updated_at: Optional[datetime] = Field(default=None)
+    archived_at: datetime = Field(default_factory=datetime.now)
@@ -0,0 +1,53 @@
+# app/pagination.py
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Literal, Optional, Tuple
+
+# Kolom yang boleh dipakai untuk sorting. Setiap kolom dipasangkan dengan 'id'
+# sebagai tie-breaker sehingga urutan selalu deterministik (syarat keyset pagination).
+SortField = Literal["created_at", "title"]
+SortOrder = Literal["asc", "desc"]
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+class InvalidCursorError(ValueError):
+    """Cursor tidak bisa di-decode atau tidak cocok dengan parameter sort."""
+
+
+def encode_cursor(sort_by: SortField, order: SortOrder, value: Any, task_id: int) -> str:
+    """Membuat continuation token opaque dari posisi baris terakhir di halaman."""
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    payload = {"s": sort_by, "o": order, "v": value, "id": task_id}
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str, sort_by: SortField, order: SortOrder) -> Tuple[Any, int]:
+    """Mengembalikan (nilai kolom sort, id) dari continuation token."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        value, task_id = payload["v"], int(payload["id"])
+        if payload["s"] != sort_by or payload["o"] != order:
+            raise InvalidCursorError("Cursor does not match the requested sort order.")
+        if sort_by == "created_at":
+            value = datetime.fromisoformat(value)
+        elif not isinstance(value, str):
+            raise InvalidCursorError("Malformed cursor.")
+    except InvalidCursorError:
+        raise
+    except (binascii.Error, ValueError, KeyError, TypeError) as exc:
+        raise InvalidCursorError("Malformed cursor.") from exc
+    return value, task_id
+
+
+def cursor_from_row(row: Any, sort_by: SortField, order: SortOrder) -> Optional[str]:
+    """Helper kecil: cursor untuk baris terakhir, atau None jika tidak ada baris."""
+    if row is None:
+        return None
+    return encode_cursor(sort_by, order, getattr(row, sort_by), row.id)
@@ -1,55 +1,328 @@
 # app/repositories.py
 from datetime import datetime
-from typing import List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
 
-from sqlmodel import select
+from sqlalchemy import (
+    RowMapping,
+    column,
+    delete,
+    func,
+    insert,
+    literal,
+    literal_column,
+    table,
+    text,
+    tuple_,
+    update,
+)
+from sqlmodel import col, select
 from sqlmodel.ext.asyncio.session import AsyncSession  # Pastikan ini AsyncSession
 
-from models import Task  # Import model Task kita
+from logging_config import get_logger
+from models import Task, TaskArchive  # Import model Task kita
+from pagination import SortField, SortOrder
+from search import FTS_TABLE
+from stats import DAILY_STATS_TABLE, STATS_TABLE
+from timing import timed
+from versioning import VERSION_TABLE
+
+logger = get_logger("repository")
+
+_task_fts = table(FTS_TABLE, column("rowid"))
+# Bobot bm25 per kolom: kecocokan di judul lebih penting daripada di deskripsi
+_search_score = func.bm25(literal_column(FTS_TABLE), 10.0, 1.0).label("score")
 
 
 class TaskRepository:
-    def __init__(self, session: AsyncSession):
+    # autocommit=False dipakai oleh WriteCoalescer (batching.py): perubahan hanya di-flush,
+    # commit dilakukan sekali untuk seluruh batch oleh pemanggil.
+    def __init__(self, session: AsyncSession, autocommit: bool = True):
         self.session = session
+        self.autocommit = autocommit
 
+    async def _commit(self) -> None:
+        if self.autocommit:
+            await self.session.commit()
+        else:
+            await self.session.flush()
+
+    @timed("repository")
     async def create(self, task_data: Task) -> Task:
         """Menambahkan tugas baru ke database."""
-        print(f"[DEBUG] --> Repository: Creating task with title: {task_data.title}")
+        logger.debug("Creating task with title: %s", task_data.title)
         self.session.add(task_data) # Menambahkan objek Task ke session
-        await self.session.commit() # Menyimpan perubahan ke database
-        await self.session.refresh(task_data) # Memuat ulang objek dengan ID yang dihasilkan database
+        # Flush mengisi ID; timestamp sudah diisi di Python (default_factory) dan
+        # expire_on_commit=False, jadi tidak perlu refresh (SELECT + transaksi kedua)
+        await self._commit() # Menyimpan perubahan ke database
         return task_data
 
+    @staticmethod
+    def _version_condition(expected_versions: Optional[Sequence[datetime]]) -> List[Any]:
+        if expected_versions is None:
+            return []
+        # Baris lama bisa punya updated_at NULL; ETag-nya memakai created_at
+        version = func.coalesce(col(Task.updated_at), col(Task.created_at))
+        return [version.in_(list(expected_versions))]
+
+    @timed("repository")
+    async def exists(self, task_id: int) -> bool:
+        """Cek keberadaan tugas; dipakai hanya di jalur gagal untuk membedakan 404 dan 412."""
+        result = await self.session.exec(select(Task.id).where(col(Task.id) == task_id))
+        return result.first() is not None
+
+    @timed("repository")
+    async def get_version(self, task_id: int) -> Optional[datetime]:
+        """Versi satu tugas untuk ETag (updated_at, atau created_at untuk baris lama) tanpa memuat barisnya."""
+        version = func.coalesce(col(Task.updated_at), col(Task.created_at))
+        result = await self.session.exec(select(version).where(col(Task.id) == task_id))
+        return result.first()
+
+    @timed("repository")
+    async def begin_snapshot(self) -> None:
+        """Memulai transaksi baca eksplisit: SELECT berikutnya di session ini melihat snapshot yang sama.
+
+        Koneksi pembaca memakai mode transaksi bawaan driver, yang menjalankan SELECT tanpa
+        transaksi (autocommit), sehingga dua SELECT berurutan bisa melihat commit berbeda.
+        Transaksi berakhir (rollback) saat session ditutup.
+        """
+        await self.session.exec(text("BEGIN"))
+
+    @timed("repository")
+    async def get_collection_version(self) -> int:
+        """Versi koleksi tugas dari tabel counter yang dijaga trigger (lihat versioning.py)."""
+        result = await self.session.exec(text(f"SELECT version FROM {VERSION_TABLE} WHERE id = 1"))
+        return int(result.scalar_one())
+
+    @timed("repository")
+    async def get_stats(self, days: int) -> Tuple[RowMapping, List[RowMapping]]:
+        """Membaca ringkasan dari tabel statistik (lihat stats.py): satu baris total + `days` hari terakhir."""
+        totals = await self.session.exec(text(f"SELECT total, completed FROM {STATS_TABLE} WHERE id = 1"))
+        per_day = await self.session.exec(
+            text(
+                f"SELECT day, created, completed FROM {DAILY_STATS_TABLE} ORDER BY day DESC LIMIT :days"
+            ).bindparams(days=days)
+        )
+        return totals.mappings().one(), list(per_day.mappings().all())
+
+    @timed("repository")
     async def get_all(self) -> List[Task]:
         """Mengambil semua tugas dari database."""
-        print("[DEBUG] --> Repository: Getting all tasks.")
+        logger.debug("Getting all tasks")
         statement = select(Task) # Membuat query untuk memilih semua Task
         results = await self.session.exec(statement) # Mengeksekusi query secara asynchronous
         tasks = list(results.all()) # Mengambil semua hasil
         return tasks
 
+    @timed("repository")
+    async def get_page(
+        self,
+        *,
+        limit: int,
+        after: Optional[Tuple[Any, int]] = None,
+        completed: Optional[bool] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        sort_by: SortField = "created_at",
+        order: SortOrder = "desc",
+    ) -> List[Task]:
+        """Mengambil satu halaman tugas dengan keyset pagination.
+
+        Filter, sorting dan posisi cursor semuanya dijalankan di SQL, sehingga SQLite
+        cukup melompat ke posisi di index lalu membaca `limit` baris saja.
+        """
+        logger.debug("Getting page of tasks (limit=%s, after=%s)", limit, after)
+        sort_column = col(getattr(Task, sort_by))
+        id_column = col(Task.id)
+        statement = select(Task)
+        if completed is not None:
+            statement = statement.where(Task.completed == completed)
+        if created_from is not None:
+            statement = statement.where(Task.created_at >= created_from)
+        if created_to is not None:
+            statement = statement.where(Task.created_at < created_to)
+        if after is not None:
+            # Row-value comparison: (sort_column, id) > / < (nilai, id) bisa memakai index
+            position = tuple_(sort_column, id_column)
+            marker = tuple_(*after)
+            statement = statement.where(position < marker if order == "desc" else position > marker)
+        if order == "desc":
+            statement = statement.order_by(sort_column.desc(), id_column.desc())
+        else:
+            statement = statement.order_by(sort_column.asc(), id_column.asc())
+        results = await self.session.exec(statement.limit(limit))
+        return list(results.all())
+
+    async def stream_rows(self, chunk_size: int) -> AsyncIterator[Sequence[RowMapping]]:
+        """Membaca seluruh tabel task per potongan (chunk) lewat streaming cursor.
+
+        Hanya `chunk_size` baris yang ada di memori pada satu waktu. Baris dikembalikan
+        sebagai mapping kolom (bukan objek ORM) supaya tidak ada overhead identity map.
+        """
+        logger.debug("Streaming all tasks in chunks of %s", chunk_size)
+        table = Task.__table__
+        statement = table.select().order_by(table.c.id).execution_options(yield_per=chunk_size)
+        result = await self.session.stream(statement)
+        async for partition in result.mappings().partitions(chunk_size):
+            yield partition
+
+    @timed("repository")
+    async def search(self, match_query: str, *, limit: int, offset: int = 0) -> List[Tuple[Task, float]]:
+        """Mencari tugas lewat index FTS5, diurutkan berdasarkan relevansi (bm25)."""
+        logger.debug("Searching tasks (match=%s, limit=%s, offset=%s)", match_query, limit, offset)
+        statement = (
+            select(Task, _search_score)
+            .join(_task_fts, _task_fts.c.rowid == Task.id)
+            .where(literal_column(FTS_TABLE).op("MATCH")(match_query))
+            .order_by(_search_score, col(Task.id))
+            .limit(limit)
+            .offset(offset)
+        )
+        results = await self.session.exec(statement)
+        return [(task, score) for task, score in results.all()]
+
+    @timed("repository")
     async def get_by_id(self, task_id: int) -> Optional[Task]:
         """Mengambil tugas berdasarkan ID."""
-        print(f"[DEBUG] --> Repository: Getting task with ID: {task_id}")
+        logger.debug("Getting task with ID: %s", task_id)
         statement = select(Task).where(Task.id == task_id) # Query dengan kondisi WHERE
         result = await self.session.exec(statement)
         task = result.first() # Mengambil hasil pertama
         return task
 
-    async def update(self, task: Task, task_update_data: Task) -> Task:
-        """Memperbarui tugas yang sudah ada."""
-        print(f"[DEBUG] --> Repository: Updating task with ID: {task.id}")
-        # Mengisi data dari task_update_data ke objek task yang sudah ada
-        for key, value in task_update_data.model_dump(exclude_unset=True).items():
-            setattr(task, key, value)
-        task.updated_at = datetime.now() # Update timestamp
-        self.session.add(task) # 'add' juga digunakan untuk update di SQLModel
-        await self.session.commit()
-        await self.session.refresh(task) # Memuat ulang untuk memastikan data terbaru
+    @timed("repository")
+    async def update(
+        self,
+        task_id: int,
+        values: Dict[str, Any],
+        expected_versions: Optional[Sequence[datetime]] = None,
+    ) -> Optional[Task]:
+        """Memperbarui tugas dengan satu statement UPDATE ... RETURNING.
+
+        Mengembalikan None jika tidak ada baris dengan ID tersebut, jadi tidak perlu
+        SELECT terpisah sebelum atau sesudah UPDATE (SQLite >= 3.35).
+        `expected_versions` (dari If-Match) menjadi bagian dari WHERE, sehingga
+        pengecekan dan update terjadi secara atomik.
+        """
+        logger.debug("Updating task with ID: %s", task_id)
+        statement = (
+            update(Task)
+            .where(col(Task.id) == task_id, *self._version_condition(expected_versions))
+            .values(**{**values, "updated_at": datetime.now()}) # Update timestamp
+            .returning(Task)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.exec(statement)
+        task = result.scalar_one_or_none()
+        await self._commit()
         return task
 
-    async def delete(self, task: Task) -> None:
-        """Menghapus tugas dari database."""
-        print(f"[DEBUG] --> Repository: Deleting task with ID: {task.id}")
-        await self.session.delete(task) # Menghapus objek dari session
-        await self.session.commit() # Menyimpan perubahan ke database
\ No newline at end of file
+    @timed("repository")
+    async def delete(self, task_id: int, expected_versions: Optional[Sequence[datetime]] = None) -> bool:
+        """Menghapus tugas dengan satu statement DELETE ... RETURNING, False jika tidak ada."""
+        logger.debug("Deleting task with ID: %s", task_id)
+        statement = (
+            delete(Task)
+            .where(col(Task.id) == task_id, *self._version_condition(expected_versions))
+            .returning(col(Task.id))
+        )
+        result = await self.session.exec(statement)
+        deleted = result.scalar_one_or_none() is not None
+        await self._commit() # Menyimpan perubahan ke database
+        return deleted
+
+    # --- Operasi bulk: satu statement executemany dan satu commit untuk seluruh batch ---
+
+    @timed("repository")
+    async def bulk_create(self, rows: List[Dict[str, Any]]) -> List[int]:
+        """Menambahkan banyak tugas sekaligus, mengembalikan ID sesuai urutan input."""
+        logger.debug("Bulk creating %s tasks", len(rows))
+        if not rows:
+            return []
+        # Satu INSERT ... VALUES (...), (...) RETURNING id per halaman baris (insertmanyvalues),
+        # jadi ID diambil dari database, bukan ditebak. SQLite tidak menjamin urutan baris
+        # RETURNING, tetapi ID baru (INTEGER PRIMARY KEY) bertambah sesuai urutan baris yang
+        # disisipkan, sehingga ID yang diurutkan sesuai dengan urutan input.
+        # returning(sort_by_parameter_order=True) di SQLite menjadi satu INSERT per baris.
+        result = await self.session.exec(insert(Task).returning(col(Task.id)), params=rows)
+        task_ids = sorted(result.scalars().all())
+        await self._commit()
+        return task_ids
+
+    @timed("repository")
+    async def bulk_update(self, rows: List[Dict[str, Any]]) -> List[int]:
+        """Memperbarui banyak tugas berdasarkan ID, mengembalikan ID yang benar-benar ada sesuai urutan input."""
+        logger.debug("Bulk updating %s tasks", len(rows))
+        if not rows:
+            return []
+        existing = await self.session.exec(
+            select(Task.id).where(col(Task.id).in_({row["id"] for row in rows}))
+        )
+        existing_ids = set(existing.all())
+        now = datetime.now()
+        params = [{**row, "updated_at": now} for row in rows if row["id"] in existing_ids]
+        if params:
+            # ORM bulk UPDATE by primary key -> executemany
+            await self.session.exec(update(Task), params=params)
+        await self._commit()
+        # Urutan input (tanpa duplikat), bukan urutan set
+        return list(dict.fromkeys(row["id"] for row in params))
+
+    @timed("repository")
+    async def bulk_delete(self, task_ids: Sequence[int]) -> List[int]:
+        """Menghapus banyak tugas dalam satu statement, mengembalikan ID yang terhapus."""
+        logger.debug("Bulk deleting %s tasks", len(task_ids))
+        if not task_ids:
+            return []
+        statement = delete(Task).where(col(Task.id).in_(set(task_ids))).returning(col(Task.id))
+        result = await self.session.exec(statement)
+        deleted_ids = list(result.scalars().all())
+        await self._commit()
+        return deleted_ids
+
+    # --- Arsip (dipakai worker di archival.py) ---
+
+    @timed("repository")
+    async def archive_completed(self, before: datetime, limit: int) -> List[int]:
+        """Memindahkan maksimal `limit` tugas selesai yang terakhir berubah sebelum `before`
+        ke task_archive dalam satu transaksi pendek. Mengembalikan ID yang dipindahkan.
+        """
+        last_changed = func.coalesce(col(Task.updated_at), col(Task.created_at))
+        result = await self.session.exec(
+            select(Task.id)
+            .where(col(Task.completed).is_(True), last_changed < before)
+            .limit(limit) # Tanpa ORDER BY: cukup baca `limit` entri dari ix_task_completed_last_changed
+        )
+        task_ids = list(result.all())
+        if not task_ids:
+            return []
+        columns = ["id", "title", "description", "completed", "created_at", "updated_at"]
+        await self.session.exec(
+            insert(TaskArchive).from_select(
+                [*columns, "archived_at"],
+                select(
+                    *(Task.__table__.c[name] for name in columns),
+                    literal(datetime.now(), TaskArchive.__table__.c.archived_at.type),
+                ).where(col(Task.id).in_(task_ids)),
+            )
+        )
+        await self.session.exec(delete(Task).where(col(Task.id).in_(task_ids)))
+        await self._commit()
+        logger.debug("Archived %s tasks", len(task_ids))
+        return task_ids
+
+    @timed("repository")
+    async def purge_archive(self, before: datetime, limit: int) -> int:
+        """Menghapus maksimal `limit` baris arsip yang diarsipkan sebelum `before`."""
+        oldest = (
+            select(TaskArchive.id)
+            .where(col(TaskArchive.archived_at) < before)
+            .order_by(col(TaskArchive.archived_at))
+            .limit(limit)
+        )
+        result = await self.session.exec(
+            delete(TaskArchive).where(col(TaskArchive.id).in_(oldest)).returning(col(TaskArchive.id))
+        )
+        purged = len(result.all())
+        await self._commit()
+        logger.debug("Purged %s archived tasks", purged)
+        return purged
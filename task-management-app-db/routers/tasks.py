@@ -1,33 +1,68 @@
 # app/routers/tasks.py
-from typing import Annotated, Dict, List  # Import Dict dan Annotated
+import json
+from datetime import datetime
+from typing import Annotated, Any, AsyncIterator, Dict, List, Optional  # Import Dict dan Annotated
 
-from fastapi import APIRouter, Depends, status  # Import HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 from sqlmodel.ext.asyncio.session import AsyncSession  # Untuk get_session
 
-from database import get_session  # Dependency function untuk DB session
+from archival import archive_worker  # Worker arsip background (ARCHIVE_ENABLED)
+from batching import write_coalescer  # Group commit opsional (WRITE_BATCHING_ENABLED)
+from cache import task_cache  # Cache TaskRead bersama untuk seluruh proses
+from database import AsyncReadSessionLocal, get_read_session, get_session  # Dependency function untuk DB session
+from etags import collection_etag, if_match_timestamps, if_none_match, task_etag, version_etag
+from logging_config import get_logger
+from pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, SortField, SortOrder
 from repositories import TaskRepository  # Repository kita
-from schemas import TaskCreate, TaskRead, TaskUpdate  # Schemas kita
-from services import TaskService  # Service kita
+from schemas import BulkResult, TaskCreate, TaskPage, TaskRead, TaskSearchPage, TaskStats, TaskUpdate  # Schemas kita
+from serialization import PydanticJSONResponse  # Encode JSON satu langkah, tanpa validasi ulang
+from services import ExportFormat, TaskService  # Service kita
 
 router = APIRouter(prefix="/tasks", tags=["Tasks"])
 
+endpoint_logger = get_logger("endpoint")
+
+MAX_BULK_ITEMS = 10_000
+NDJSON_MEDIA_TYPES = ("application/x-ndjson", "application/jsonlines", "application/json-seq")
+
 # --- Dependency Functions (untuk TaskService) ---
 
-# Dependency yang menyediakan TaskRepository
-# Ia bergantung pada get_session untuk mendapatkan database session
-async def get_task_repository(
+# Satu provider per service, langsung di atas session: session adalah satu-satunya resource
+# per request, repository dan service hanya membungkusnya. Dulu rantainya tiga level
+# (session -> repository -> service), dan setiap level menambah resolusi dependency per request.
+async def get_task_service(
     session: Annotated[AsyncSession, Depends(get_session)]
-) -> TaskRepository:
-    print("\n[DEBUG] --> DI Step: Providing TaskRepository instance.")
-    return TaskRepository(session=session)
+) -> TaskService:
+    return TaskService(repository=TaskRepository(session=session), cache=task_cache, coalescer=write_coalescer)
 
-# Dependency yang menyediakan TaskService
-# Ia bergantung pada get_task_repository untuk mendapatkan repository
-async def get_task_service(
-    repository: Annotated[TaskRepository, Depends(get_task_repository)]
+# Versi read-only dari provider di atas, memakai pool session pembaca.
+# Dipakai oleh semua route GET agar tidak antre di koneksi penulis.
+async def get_read_task_service(
+    session: Annotated[AsyncSession, Depends(get_read_session)]
 ) -> TaskService:
-    print("[DEBUG] --> DI Step: Providing TaskService instance.")
-    return TaskService(repository=repository)
+    return TaskService(repository=TaskRepository(session=session), cache=task_cache)
+
+# Dependency yang membaca body bulk: JSON array atau NDJSON (satu objek JSON per baris)
+# Validasi per item dilakukan di service agar item yang rusak tidak menggagalkan seluruh batch
+async def get_bulk_items(request: Request) -> List[Any]:
+    body = await request.body()
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    try:
+        if content_type in NDJSON_MEDIA_TYPES:
+            items = [json.loads(line) for line in body.splitlines() if line.strip()]
+        else:
+            items = json.loads(body)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid JSON body: {exc}") from exc
+    if not isinstance(items, list):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Bulk body must be a JSON array or NDJSON.")
+    if len(items) > MAX_BULK_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Bulk requests are limited to {MAX_BULK_ITEMS} items.",
+        )
+    return items
 
 # --- Task Endpoints (CRUD Operations) ---
 
@@ -38,45 +73,193 @@ async def create_new_task(
 ):
     """Membuat tugas baru.
     """
-    print(f"\n[DEBUG] --> Endpoint: Creating new task with title: {task_create.title}")
-    return await service.create_task(task_create)
+    endpoint_logger.debug("Creating new task with title: %s", task_create.title)
+    task = await service.create_task(task_create)
+    return PydanticJSONResponse(task, status_code=status.HTTP_201_CREATED, headers={"ETag": task_etag(task)})
 
-@router.get("/", response_model=List[TaskRead])
+@router.get("/", response_model=TaskPage)
 async def get_all_existing_tasks(
-    service: Annotated[TaskService, Depends(get_task_service)] # Suntikkan TaskService
+    request: Request,
+    service: Annotated[TaskService, Depends(get_read_task_service)], # Suntikkan TaskService
+    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE, description="Jumlah tugas per halaman")] = DEFAULT_PAGE_SIZE,
+    cursor: Annotated[Optional[str], Query(description="Token next_cursor dari halaman sebelumnya")] = None,
+    completed: Annotated[Optional[bool], Query(description="Filter berdasarkan status selesai")] = None,
+    created_from: Annotated[Optional[datetime], Query(description="created_at >= nilai ini")] = None,
+    created_to: Annotated[Optional[datetime], Query(description="created_at < nilai ini")] = None,
+    sort_by: SortField = "created_at",
+    order: SortOrder = "desc",
+):
+    """Mengambil tugas per halaman (keyset pagination).
+
+    Gunakan `next_cursor` dari response sebagai parameter `cursor` untuk halaman berikutnya.
+    Mendukung If-None-Match: jika koleksi belum berubah, dibalas 304 tanpa menjalankan query halaman.
+    """
+    endpoint_logger.debug("Getting tasks page")
+    # Versi dibaca di awal transaksi baca yang juga dipakai query halaman, jadi ETag konsisten dengan isinya
+    etag = collection_etag(await service.get_collection_version(), request.url.query)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if if_none_match(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    page = await service.get_all_tasks(
+        limit=limit,
+        cursor=cursor,
+        completed=completed,
+        created_from=created_from,
+        created_to=created_to,
+        sort_by=sort_by,
+        order=order,
+    )
+    return PydanticJSONResponse(page, headers=headers)
+
+@router.get("/search", response_model=TaskSearchPage)
+async def search_existing_tasks(
+    q: Annotated[str, Query(min_length=1, max_length=200, description="Kata kunci; kata terakhir boleh sebagian")],
+    service: Annotated[TaskService, Depends(get_read_task_service)],
+    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = DEFAULT_PAGE_SIZE,
+    offset: Annotated[int, Query(ge=0, le=10_000)] = 0,
+):
+    """Mencari tugas berdasarkan judul dan deskripsi (FTS5), diurutkan dari yang paling relevan.
+    """
+    endpoint_logger.debug("Searching tasks: %s", q)
+    return PydanticJSONResponse(await service.search_tasks(q, limit=limit, offset=offset))
+
+# --- Bulk Endpoints ---
+# Didefinisikan sebelum route /{task_id} agar path "/bulk" tidak ditangkap sebagai task_id
+
+@router.post("/bulk", response_model=BulkResult)
+async def bulk_create_tasks(
+    items: Annotated[List[Any], Depends(get_bulk_items)],
+    service: Annotated[TaskService, Depends(get_task_service)]
+):
+    """Membuat banyak tugas (array `TaskCreate` atau NDJSON) dalam satu transaksi.
+    """
+    endpoint_logger.debug("Bulk creating %s tasks", len(items))
+    return PydanticJSONResponse(await service.bulk_create_tasks(items))
+
+@router.patch("/bulk", response_model=BulkResult)
+async def bulk_update_tasks(
+    items: Annotated[List[Any], Depends(get_bulk_items)],
+    service: Annotated[TaskService, Depends(get_task_service)]
+):
+    """Memperbarui banyak tugas (array `TaskUpdate` + `id`, atau NDJSON) dalam satu transaksi.
+    """
+    endpoint_logger.debug("Bulk updating %s tasks", len(items))
+    return PydanticJSONResponse(await service.bulk_update_tasks(items))
+
+@router.delete("/bulk", response_model=BulkResult)
+async def bulk_delete_tasks(
+    items: Annotated[List[Any], Depends(get_bulk_items)],
+    service: Annotated[TaskService, Depends(get_task_service)]
 ):
-    """Mengambil semua tugas yang ada.
+    """Menghapus banyak tugas berdasarkan array ID (atau NDJSON) dalam satu statement.
     """
-    print("\n[DEBUG] --> Endpoint: Getting all tasks.")
-    return await service.get_all_tasks()
+    endpoint_logger.debug("Bulk deleting %s tasks", len(items))
+    return PydanticJSONResponse(await service.bulk_delete_tasks(items))
+
+# --- Export Endpoint ---
+
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+# Session untuk export dibuka di dalam generator, bukan lewat Depends(get_read_session):
+# dependency dengan yield sudah ditutup sebelum StreamingResponse selesai mengirim body.
+async def _stream_export(export_format: ExportFormat) -> AsyncIterator[bytes]:
+    async with AsyncReadSessionLocal() as session:
+        service = TaskService(repository=TaskRepository(session=session))
+        async for chunk in service.export_tasks(export_format):
+            yield chunk
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_all_tasks(
+    export_format: Annotated[ExportFormat, Query(alias="format")] = "ndjson",
+):
+    """Mengekspor seluruh tugas sebagai stream NDJSON atau CSV dengan memori konstan.
+    """
+    endpoint_logger.debug("Exporting tasks as %s", export_format)
+    return StreamingResponse(
+        _stream_export(export_format),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="tasks.{export_format}"'},
+    )
+
+# --- Stats Endpoint ---
+
+@router.get("/stats", response_model=TaskStats)
+async def get_task_stats(
+    service: Annotated[TaskService, Depends(get_read_task_service)],
+    days: Annotated[int, Query(ge=1, le=366, description="Jumlah hari terakhir di per_day")] = 30,
+):
+    """Total, rasio selesai, dan jumlah tugas per hari pembuatan dari tabel ringkasan.
+
+    Tugas yang sudah diarsipkan tetap terhitung (pengarsipan tidak mengubah ringkasan) sampai
+    dihapus oleh purge arsip. Ringkasan diperbarui oleh trigger di transaksi yang sama dengan setiap perubahan tugas;
+    jika perlu dihitung ulang, jalankan `python stats.py rebuild`.
+    """
+    endpoint_logger.debug("Getting task stats for last %s days", days)
+    return PydanticJSONResponse(await service.get_stats(days))
+
+# --- Archive Endpoint ---
+
+@router.get("/archive/stats")
+async def get_task_archive_stats() -> Dict[str, Any]:
+    """Progres dan throughput (rows/sec) worker arsip, atau enabled=false jika dimatikan.
+    """
+    if archive_worker is None:
+        return {"enabled": False}
+    return {"enabled": True, **archive_worker.stats()}
+
+# --- Cache Endpoint ---
+
+@router.get("/cache/stats")
+async def get_task_cache_stats() -> Dict[str, Any]:
+    """Statistik cache TaskRead (hit/miss/eviction), atau enabled=false jika dimatikan.
+    """
+    if task_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **task_cache.stats()}
 
 @router.get("/{task_id}", response_model=TaskRead)
 async def get_existing_task_by_id(
     task_id: int,
-    service: Annotated[TaskService, Depends(get_task_service)] # Suntikkan TaskService
+    service: Annotated[TaskService, Depends(get_read_task_service)], # Suntikkan TaskService
+    if_none_match_header: Annotated[Optional[str], Header(alias="If-None-Match")] = None,
 ):
-    """Mengambil tugas berdasarkan ID.
+    """Mengambil tugas berdasarkan ID. Mendukung If-None-Match (304 jika tidak berubah).
     """
-    print(f"\n[DEBUG] --> Endpoint: Getting task by ID: {task_id}")
-    return await service.get_task_by_id(task_id)
+    endpoint_logger.debug("Getting task by ID: %s", task_id)
+    if if_none_match_header:
+        # 304 dijawab dari versi tugas saja, tanpa memuat baris dan membangun TaskRead
+        version = await service.get_task_version(task_id)
+        if version is not None:
+            etag = version_etag(task_id, version)
+            if if_none_match(if_none_match_header, etag):
+                return Response(
+                    status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag, "Cache-Control": "no-cache"}
+                )
+    task = await service.get_task_by_id(task_id)
+    return PydanticJSONResponse(task, headers={"ETag": task_etag(task), "Cache-Control": "no-cache"})
 
 @router.put("/{task_id}", response_model=TaskRead)
 async def update_existing_task(
     task_id: int,
     task_update: TaskUpdate,
-    service: Annotated[TaskService, Depends(get_task_service)] # Suntikkan TaskService
+    service: Annotated[TaskService, Depends(get_task_service)], # Suntikkan TaskService
+    if_match: Annotated[Optional[str], Header(alias="If-Match")] = None,
 ):
     """Memperbarui tugas yang sudah ada.
+
+    Dengan If-Match, update hanya dijalankan jika ETag masih cocok; jika tidak, 412.
     """
-    print(f"\n[DEBUG] --> Endpoint: Updating task with ID: {task_id}")
-    return await service.update_task(task_id, task_update)
+    endpoint_logger.debug("Updating task with ID: %s", task_id)
+    task = await service.update_task(task_id, task_update, if_match_timestamps(if_match, task_id))
+    return PydanticJSONResponse(task, headers={"ETag": task_etag(task)})
 
 @router.delete("/{task_id}", status_code=status.HTTP_200_OK)
 async def delete_existing_task(
     task_id: int,
-    service: Annotated[TaskService, Depends(get_task_service)] # Suntikkan TaskService
+    service: Annotated[TaskService, Depends(get_task_service)], # Suntikkan TaskService
+    if_match: Annotated[Optional[str], Header(alias="If-Match")] = None,
 ) -> Dict[str, str]: # Mengembalikan Dict untuk pesan sukses
-    """Menghapus tugas.
+    """Menghapus tugas. Dengan If-Match, hanya dihapus jika ETag masih cocok (412 jika tidak).
     """
-    print(f"\n[DEBUG] --> Endpoint: Deleting task with ID: {task_id}")
-    return await service.delete_task(task_id)
\ No newline at end of file
+    endpoint_logger.debug("Deleting task with ID: %s", task_id)
+    return await service.delete_task(task_id, if_match_timestamps(if_match, task_id))
\ No newline at end of file
@@ -1,7 +1,8 @@
 # app/schemas.py
-from datetime import datetime
-from typing import Optional
+from datetime import date, datetime
+from typing import List, Literal, Optional
 
+from pydantic import field_validator
 from sqlmodel import SQLModel  # Import SQLModel juga di sini karena schemas berasal dari models
 
 
@@ -24,10 +25,68 @@ class TaskRead(TaskBase):
     created_at: datetime
     updated_at: Optional[datetime]
 
+# Schema untuk satu halaman hasil GET /tasks (keyset pagination)
+# next_cursor bernilai None jika tidak ada halaman berikutnya
+class TaskPage(SQLModel):
+    items: List[TaskRead]
+    next_cursor: Optional[str] = None
+
+# Schema untuk hasil GET /tasks/search, diurutkan dari yang paling relevan
+# score adalah nilai bm25 dari FTS5: semakin kecil (negatif) semakin relevan
+class TaskSearchHit(TaskRead):
+    score: float
+
+class TaskSearchPage(SQLModel):
+    items: List[TaskSearchHit]
+    next_offset: Optional[int] = None
+
+# Schema untuk GET /tasks/stats, dibaca dari tabel ringkasan (bukan scan tabel task)
+class DailyTaskCount(SQLModel):
+    day: date
+    created: int
+    completed: int
+
+class TaskStats(SQLModel):
+    total: int
+    completed: int
+    open: int
+    completion_ratio: float # 0.0 jika belum ada tugas
+    per_day: List[DailyTaskCount] # Jumlah tugas per hari pembuatan, terbaru dulu
+
 # Schema untuk memperbarui Task (PUT/PATCH request)
 # Semua field bersifat opsional karena kita mungkin hanya ingin memperbarui sebagian
 class TaskUpdate(SQLModel):
     title: Optional[str] = None
     description: Optional[str] = None
     completed: Optional[bool] = None
-    updated_at: Optional[datetime] = None # Akan diisi otomatis di service/repo
\ No newline at end of file
+    updated_at: Optional[datetime] = None # Akan diisi otomatis di service/repo
+
+# --- Schemas untuk operasi bulk (/tasks/bulk) ---
+
+# Satu item update bulk: field TaskUpdate ditambah ID tugas yang diperbarui
+class TaskBulkUpdate(TaskUpdate):
+    id: int
+
+    # Kolom NOT NULL boleh tidak dikirim, tapi null eksplisit ditolak di sini (item invalid),
+    # bukan gagal di constraint database untuk seluruh batch
+    @field_validator("title", "completed")
+    @classmethod
+    def reject_null(cls, value):
+        if value is None:
+            raise ValueError("boleh tidak dikirim, tapi tidak boleh null")
+        return value
+
+# Hasil per item; index menunjuk posisi item di request (array atau baris NDJSON)
+class BulkItemResult(SQLModel):
+    index: int
+    status: Literal["created", "updated", "deleted", "not_found", "invalid"]
+    id: Optional[int] = None
+    detail: Optional[str] = None
+
+# Ringkasan operasi bulk, termasuk throughput untuk keperluan benchmark
+class BulkResult(SQLModel):
+    results: List[BulkItemResult]
+    succeeded: int
+    failed: int
+    elapsed_ms: float
+    rows_per_second: float
@@ -0,0 +1,65 @@
+# app/search.py
+import re
+from typing import Optional
+
+from sqlalchemy import Connection, inspect, text
+
+# Tabel virtual FTS5 "external content": teks tidak disalin, hanya index-nya yang disimpan.
+# prefix='2 3' membuat index tambahan untuk prefix 2 dan 3 karakter agar query "abc*" cepat.
+FTS_TABLE = "task_fts"
+
+_FTS_DDL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, description,
+        content='task', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )
+    """,
+    # Trigger menjaga index tetap sinkron untuk semua jalur tulis (ORM, bulk, UPDATE ... RETURNING)
+    f"""
+    CREATE TRIGGER IF NOT EXISTS task_fts_after_insert AFTER INSERT ON task BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS task_fts_after_delete AFTER DELETE ON task BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS task_fts_after_update AFTER UPDATE OF title, description ON task BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO {FTS_TABLE}(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END
+    """,
+]
+
+_TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+def create_search_index(sync_conn: Connection) -> None:
+    """Membuat tabel FTS5 + trigger; jika tabel baru dibuat, index diisi dari data yang sudah ada."""
+    is_new = not inspect(sync_conn).has_table(FTS_TABLE)
+    for statement in _FTS_DDL:
+        sync_conn.execute(text(statement))
+    if is_new:
+        sync_conn.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+
+
+def build_match_query(query: str) -> Optional[str]:
+    """Mengubah input bebas dari user menjadi query MATCH FTS5 yang aman.
+
+    Setiap kata di-quote (sehingga operator FTS5 di input tidak diinterpretasi) dan
+    kata terakhir diberi '*' untuk prefix matching, cocok untuk search-as-you-type.
+    Semua kata harus cocok (AND implisit).
+    Mengembalikan None jika input tidak berisi kata sama sekali.
+    """
+    tokens = _TOKEN_PATTERN.findall(query)
+    if not tokens:
+        return None
+    *head, last = tokens
+    return " ".join([*(f'"{token}"' for token in head), f'"{last}"*'])
@@ -0,0 +1,40 @@
+# app/serialization.py
+from typing import Any, Iterable, List
+
+import pydantic_core
+from fastapi.responses import Response
+from pydantic import BaseModel, TypeAdapter
+
+from models import Task
+from schemas import TaskRead
+
+# Validator di-cache sekali per proses. from_attributes=True membaca atribut objek ORM
+# secara langsung, tanpa model_dump() -> dict -> model_validate() seperti sebelumnya.
+_task_list_adapter = TypeAdapter(List[TaskRead])
+
+
+def to_task_read(task: Task) -> TaskRead:
+    """Membangun TaskRead langsung dari atribut objek ORM (satu kali validasi)."""
+    return TaskRead.model_validate(task, from_attributes=True)
+
+
+def to_task_reads(tasks: Iterable[Task]) -> List[TaskRead]:
+    """Versi list dari to_task_read: seluruh list divalidasi dalam satu panggilan pydantic-core."""
+    return _task_list_adapter.validate_python(list(tasks), from_attributes=True)
+
+
+class PydanticJSONResponse(Response):
+    """Response JSON yang di-encode langsung ke bytes oleh pydantic-core dalam satu langkah.
+
+    Endpoint yang mengembalikan response ini (bukan model) dilewati oleh validasi ulang
+    response_model FastAPI dan jsonable_encoder; response_model tetap dipakai untuk OpenAPI.
+    Isi harus sudah berupa schema yang valid (TaskRead, TaskPage, dll).
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, BaseModel):
+            # Serializer class model sudah dikompilasi untuk tipe field-nya, lebih cepat dari to_json
+            return content.__pydantic_serializer__.to_json(content)
+        return pydantic_core.to_json(content)
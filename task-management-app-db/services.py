@@ -1,61 +1,354 @@
 # app/services.py
-from typing import Dict, List  # Import List dan Dict untuk type hints   
+import csv
+import io
+import json
+import time
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Literal, Optional  # Import Dict dan Optional untuk type hints
 
 from fastapi import HTTPException, status  # Untuk menangani HTTP errors
+from pydantic import TypeAdapter, ValidationError
 
+from batching import WriteCoalescer  # Group commit opsional untuk create/update
+from cache import TaskCache  # Cache read-through untuk TaskRead
+from logging_config import get_logger
 from models import Task  # Database Task model
+from pagination import InvalidCursorError, SortField, SortOrder, cursor_from_row, decode_cursor
 from repositories import TaskRepository  # Repository kita
-from schemas import TaskCreate, TaskRead, TaskUpdate  # Schema untuk API
+from search import build_match_query
+from serialization import to_task_read, to_task_reads
+from schemas import (  # Schema untuk API
+    BulkItemResult,
+    BulkResult,
+    DailyTaskCount,
+    TaskBulkUpdate,
+    TaskCreate,
+    TaskPage,
+    TaskRead,
+    TaskSearchHit,
+    TaskSearchPage,
+    TaskStats,
+    TaskUpdate,
+)
+from timing import timed
+
+logger = get_logger("service")
+
+_task_id_adapter = TypeAdapter(int)
+
+ExportFormat = Literal["ndjson", "csv"]
+EXPORT_COLUMNS = ("id", "title", "description", "completed", "created_at", "updated_at")
+
+
+def _json_default(value: Any) -> str:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _csv_value(value: Any) -> Any:
+    # Format tanggal dan boolean disamakan dengan output NDJSON/JSON API
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return value
+
+
+def _invalid(index: int, exc: ValidationError) -> BulkItemResult:
+    detail = "; ".join(
+        f"{'.'.join(str(part) for part in error['loc']) or 'item'}: {error['msg']}" for error in exc.errors()
+    )
+    return BulkItemResult(index=index, status="invalid", detail=detail)
+
+
+def _bulk_result(results: List[BulkItemResult], started: float) -> BulkResult:
+    elapsed = time.perf_counter() - started
+    succeeded = sum(1 for item in results if item.status not in ("invalid", "not_found"))
+    return BulkResult(
+        results=results,
+        succeeded=succeeded,
+        failed=len(results) - succeeded,
+        elapsed_ms=round(elapsed * 1000, 3),
+        rows_per_second=round(succeeded / elapsed, 1) if elapsed > 0 else 0.0,
+    )
 
 
 class TaskService:
-    def __init__(self, repository: TaskRepository):
+    def __init__(
+        self,
+        repository: TaskRepository,
+        cache: Optional[TaskCache] = None,
+        coalescer: Optional[WriteCoalescer] = None,
+    ):
         self.repository = repository
+        self.cache = cache # None berarti cache dimatikan
+        self.coalescer = coalescer # None berarti setiap tulis langsung di-commit sendiri
+
+    def _invalidate(self, *task_ids: int) -> None:
+        if self.cache is not None:
+            self.cache.invalidate(task_ids)
 
+    @timed("service")
     async def create_task(self, task_data: TaskCreate) -> TaskRead:
         """Membuat tugas baru dan menyimpannya ke database."""
-        print(f"[DEBUG] --> Service: Creating task: {task_data.title}")
+        logger.debug("Creating task: %s", task_data.title)
         new_task = Task.model_validate(task_data.model_dump()) # Konversi schema ke DB model
-        task_in_db = await self.repository.create(new_task)
-        return TaskRead.model_validate(task_in_db.model_dump()) # Konversi DB model ke response schema
+        if self.coalescer is not None:
+            task_in_db = await self.coalescer.submit(lambda repository: repository.create(new_task))
+        else:
+            task_in_db = await self.repository.create(new_task)
+        return to_task_read(task_in_db) # Konversi DB model ke response schema
 
-    async def get_all_tasks(self) -> List[TaskRead]:
-        """Mengambil semua tugas."""
-        print("[DEBUG] --> Service: Getting all tasks.")
-        tasks = await self.repository.get_all()
-        return [TaskRead.model_validate(task.model_dump()) for task in tasks]
+    @timed("service")
+    async def get_all_tasks(
+        self,
+        *,
+        limit: int,
+        cursor: Optional[str] = None,
+        completed: Optional[bool] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        sort_by: SortField = "created_at",
+        order: SortOrder = "desc",
+    ) -> TaskPage:
+        """Mengambil satu halaman tugas, atau raises 400 jika cursor tidak valid."""
+        logger.debug("Getting tasks page (limit=%s, cursor=%s)", limit, cursor)
+        after = None
+        if cursor:
+            try:
+                after = decode_cursor(cursor, sort_by, order)
+            except InvalidCursorError as exc:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+        # Ambil satu baris ekstra untuk mengetahui apakah masih ada halaman berikutnya
+        tasks = await self.repository.get_page(
+            limit=limit + 1,
+            after=after,
+            completed=completed,
+            created_from=created_from,
+            created_to=created_to,
+            sort_by=sort_by,
+            order=order,
+        )
+        has_more = len(tasks) > limit
+        tasks = tasks[:limit]
+        next_cursor = cursor_from_row(tasks[-1], sort_by, order) if has_more else None
+        return TaskPage(
+            items=to_task_reads(tasks),
+            next_cursor=next_cursor,
+        )
 
+    @timed("service")
+    async def search_tasks(self, query: str, *, limit: int, offset: int = 0) -> TaskSearchPage:
+        """Full-text search di judul dan deskripsi dengan prefix matching dan ranking."""
+        logger.debug("Searching tasks: %s", query)
+        match_query = build_match_query(query)
+        if match_query is None:
+            return TaskSearchPage(items=[])
+        hits = await self.repository.search(match_query, limit=limit + 1, offset=offset)
+        has_more = len(hits) > limit
+        return TaskSearchPage(
+            items=[
+                TaskSearchHit.model_validate(task, from_attributes=True, update={"score": score})
+                for task, score in hits[:limit]
+            ],
+            next_offset=offset + limit if has_more else None,
+        )
+
+    @timed("service")
     async def get_task_by_id(self, task_id: int) -> TaskRead:
         """Mengambil tugas berdasarkan ID, atau raises 404 jika tidak ditemukan."""
-        print(f"[DEBUG] --> Service: Getting task by ID: {task_id}")
+        logger.debug("Getting task by ID: %s", task_id)
+        generation = None
+        if self.cache is not None:
+            cached = self.cache.get(task_id)
+            if cached is not None:
+                return cached
+            generation = self.cache.generation
         task = await self.repository.get_by_id(task_id)
         if not task:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Task with ID {task_id} not found."
             )
-        return TaskRead.model_validate(task.model_dump())
+        task_read = to_task_read(task)
+        if self.cache is not None:
+            self.cache.set(task_id, task_read, generation=generation)
+        return task_read
+
+    @timed("service")
+    async def get_collection_version(self) -> int:
+        """Versi koleksi tugas untuk ETag GET /tasks.
+
+        Dibaca di awal transaksi baca, sehingga query halaman berikutnya di session yang sama
+        melihat snapshot yang sama dan ETag selalu cocok dengan isi halaman.
+        """
+        await self.repository.begin_snapshot()
+        return await self.repository.get_collection_version()
+
+    @timed("service")
+    async def get_task_version(self, task_id: int) -> Optional[datetime]:
+        """Versi tugas untuk If-None-Match (dari cache jika ada), tanpa membangun TaskRead; None jika tidak ada."""
+        if self.cache is not None:
+            cached = self.cache.get(task_id)
+            if cached is not None:
+                return cached.updated_at or cached.created_at
+        return await self.repository.get_version(task_id)
 
-    async def update_task(self, task_id: int, task_update_data: TaskUpdate) -> TaskRead:
-        """Memperbarui tugas yang sudah ada, atau raises 404 jika tidak ditemukan."""
-        print(f"[DEBUG] --> Service: Updating task ID: {task_id}")
-        task_in_db = await self.repository.get_by_id(task_id)
-        if not task_in_db:
+    @timed("service")
+    async def get_stats(self, days: int) -> TaskStats:
+        """Statistik tugas dari ringkasan yang dijaga trigger: O(1) terhadap jumlah tugas."""
+        totals, per_day = await self.repository.get_stats(days)
+        total, completed = totals["total"], totals["completed"]
+        return TaskStats(
+            total=total,
+            completed=completed,
+            open=total - completed,
+            completion_ratio=round(completed / total, 4) if total else 0.0,
+            per_day=[DailyTaskCount.model_validate(dict(row)) for row in per_day],
+        )
+
+    async def _raise_missing_or_precondition_failed(self, task_id: int) -> None:
+        # Dipanggil hanya saat UPDATE/DELETE tidak mengenai baris apa pun
+        if await self.repository.exists(task_id):
             raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Task with ID {task_id} not found."
+                status_code=status.HTTP_412_PRECONDITION_FAILED,
+                detail=f"Task with ID {task_id} was modified (If-Match did not match)."
             )
-        updated_task = await self.repository.update(task_in_db, Task.model_validate(task_update_data.model_dump(exclude_unset=True)))
-        return TaskRead.model_validate(updated_task.model_dump())
-
-    async def delete_task(self, task_id: int) -> Dict[str, str]:
-        """Menghapus tugas, atau raises 404 jika tidak ditemukan."""
-        print(f"[DEBUG] --> Service: Deleting task ID: {task_id}")
-        task_in_db = await self.repository.get_by_id(task_id)
-        if not task_in_db:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Task with ID {task_id} not found."
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Task with ID {task_id} not found."
+        )
+
+    @timed("service")
+    async def update_task(
+        self,
+        task_id: int,
+        task_update_data: TaskUpdate,
+        expected_versions: Optional[List[datetime]] = None,
+    ) -> TaskRead:
+        """Memperbarui tugas yang sudah ada, atau raises 404/412 jika tidak ditemukan/berubah."""
+        logger.debug("Updating task ID: %s", task_id)
+        # Satu UPDATE ... RETURNING: tidak ada SELECT terpisah, jadi tidak ada race window
+        values = task_update_data.model_dump(exclude_unset=True)
+        if self.coalescer is not None:
+            updated_task = await self.coalescer.submit(
+                lambda repository: repository.update(task_id, values, expected_versions)
+            )
+        else:
+            updated_task = await self.repository.update(task_id, values, expected_versions)
+        if not updated_task:
+            if expected_versions is None:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Task with ID {task_id} not found."
+                )
+            await self._raise_missing_or_precondition_failed(task_id)
+        self._invalidate(task_id)
+        return to_task_read(updated_task)
+
+    @timed("service")
+    async def delete_task(self, task_id: int, expected_versions: Optional[List[datetime]] = None) -> Dict[str, str]:
+        """Menghapus tugas, atau raises 404/412 jika tidak ditemukan/berubah."""
+        logger.debug("Deleting task ID: %s", task_id)
+        if not await self.repository.delete(task_id, expected_versions):
+            if expected_versions is None:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Task with ID {task_id} not found."
+                )
+            await self._raise_missing_or_precondition_failed(task_id)
+        self._invalidate(task_id)
+        return {"message": f"Task with ID {task_id} deleted successfully."}
+
+    async def export_tasks(self, export_format: ExportFormat, chunk_size: int = 1000) -> AsyncIterator[bytes]:
+        """Menghasilkan isi tabel task sebagai NDJSON atau CSV, satu chunk bytes per potongan baris."""
+        logger.debug("Exporting tasks as %s", export_format)
+        if export_format == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(EXPORT_COLUMNS)
+            yield buffer.getvalue().encode() # Header langsung dikirim sebagai byte pertama
+            async for rows in self.repository.stream_rows(chunk_size):
+                buffer.seek(0)
+                buffer.truncate()
+                writer.writerows([_csv_value(row[column]) for column in EXPORT_COLUMNS] for row in rows)
+                yield buffer.getvalue().encode()
+            return
+        async for rows in self.repository.stream_rows(chunk_size):
+            lines = [json.dumps(dict(row), default=_json_default, separators=(",", ":")) for row in rows]
+            yield ("\n".join(lines) + "\n").encode()
+
+    # --- Operasi bulk ---
+    # Setiap item divalidasi sendiri-sendiri: item yang tidak valid dilaporkan per index,
+    # sedangkan item yang valid dieksekusi bersama dalam satu transaksi.
+
+    @timed("service")
+    async def bulk_create_tasks(self, items: List[Any]) -> BulkResult:
+        """Membuat banyak tugas dalam satu transaksi."""
+        logger.debug("Bulk creating %s tasks", len(items))
+        started = time.perf_counter()
+        results: List[Optional[BulkItemResult]] = [None] * len(items)
+        rows: List[Dict[str, Any]] = []
+        positions: List[int] = []
+        for index, item in enumerate(items):
+            try:
+                task = Task.model_validate(TaskCreate.model_validate(item).model_dump())
+            except ValidationError as exc:
+                results[index] = _invalid(index, exc)
+                continue
+            rows.append(task.model_dump(exclude={"id"}))
+            positions.append(index)
+        new_ids = await self.repository.bulk_create(rows)
+        for index, task_id in zip(positions, new_ids):
+            results[index] = BulkItemResult(index=index, status="created", id=task_id)
+        return _bulk_result([item for item in results if item is not None], started)
+
+    @timed("service")
+    async def bulk_update_tasks(self, items: List[Any]) -> BulkResult:
+        """Memperbarui banyak tugas dalam satu transaksi; ID yang tidak ada dilaporkan not_found."""
+        logger.debug("Bulk updating %s tasks", len(items))
+        started = time.perf_counter()
+        results: List[Optional[BulkItemResult]] = [None] * len(items)
+        rows: List[Dict[str, Any]] = []
+        positions: List[int] = []
+        for index, item in enumerate(items):
+            try:
+                task_update = TaskBulkUpdate.model_validate(item)
+            except ValidationError as exc:
+                results[index] = _invalid(index, exc)
+                continue
+            rows.append(task_update.model_dump(exclude_unset=True))
+            positions.append(index)
+        updated_ids = set(await self.repository.bulk_update(rows))
+        self._invalidate(*updated_ids)
+        for index, row in zip(positions, rows):
+            found = row["id"] in updated_ids
+            results[index] = BulkItemResult(
+                index=index, status="updated" if found else "not_found", id=row["id"]
+            )
+        return _bulk_result([item for item in results if item is not None], started)
+
+    @timed("service")
+    async def bulk_delete_tasks(self, items: List[Any]) -> BulkResult:
+        """Menghapus banyak tugas dalam satu statement DELETE."""
+        logger.debug("Bulk deleting %s tasks", len(items))
+        started = time.perf_counter()
+        results: List[Optional[BulkItemResult]] = [None] * len(items)
+        task_ids: List[int] = []
+        positions: List[int] = []
+        for index, item in enumerate(items):
+            try:
+                task_ids.append(_task_id_adapter.validate_python(item))
+            except ValidationError as exc:
+                results[index] = _invalid(index, exc)
+                continue
+            positions.append(index)
+        deleted_ids = set(await self.repository.bulk_delete(task_ids))
+        self._invalidate(*deleted_ids)
+        for index, task_id in zip(positions, task_ids):
+            found = task_id in deleted_ids
+            results[index] = BulkItemResult(
+                index=index, status="deleted" if found else "not_found", id=task_id
             )
-        await self.repository.delete(task_in_db)
-        return {"message": f"Task with ID {task_id} deleted successfully."}
\ No newline at end of file
+        return _bulk_result([item for item in results if item is not None], started)
@@ -0,0 +1,151 @@
+# app/stats.py
+import argparse
+import asyncio
+
+from sqlalchemy import Connection, inspect, text
+
+# Ringkasan tabel task yang dijaga oleh trigger di transaksi yang sama dengan setiap
+# INSERT/UPDATE/DELETE (ORM, bulk, UPDATE ... RETURNING, maupun group commit).
+# GET /tasks/stats cukup membaca tabel kecil ini, bukan scan seluruh tabel task.
+#
+# Ringkasan mencakup tugas aktif dan tugas di task_archive: worker arsip memindahkan tugas
+# (INSERT ke task_archive lalu DELETE dari task), dan pemindahan itu tidak mengubah ringkasan,
+# sehingga jumlah tugas yang dibuat per hari tetap historis. DELETE dari task hanya dihitung jika
+# barisnya belum ada di task_archive (ID task tidak pernah dipakai ulang, lihat migrasi 7);
+# baris arsip baru dikurangi saat dihapus oleh purge.
+STATS_TABLE = "task_stats"
+DAILY_STATS_TABLE = "task_daily_stats"
+
+_DAY = "date({row}.created_at)"
+
+
+def _add_day(row: str) -> str:
+    return f"""
+        INSERT INTO {DAILY_STATS_TABLE} (day, created, completed)
+        VALUES ({_DAY.format(row=row)}, 1, {row}.completed)
+        ON CONFLICT(day) DO UPDATE SET
+            created = created + 1,
+            completed = completed + excluded.completed;
+    """
+
+
+def _remove_day(row: str) -> str:
+    return f"""
+        UPDATE {DAILY_STATS_TABLE} SET created = created - 1, completed = completed - {row}.completed
+        WHERE day = {_DAY.format(row=row)};
+        DELETE FROM {DAILY_STATS_TABLE} WHERE day = {_DAY.format(row=row)} AND created <= 0;
+    """
+
+
+def _remove_row(row: str) -> str:
+    return f"""
+        UPDATE {STATS_TABLE} SET total = total - 1, completed = completed - {row}.completed WHERE id = 1;
+        {_remove_day(row)}
+    """
+
+
+_STATS_DDL = [
+    f"""
+    CREATE TABLE IF NOT EXISTS {STATS_TABLE} (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        total INTEGER NOT NULL,
+        completed INTEGER NOT NULL
+    )
+    """,
+    f"""
+    CREATE TABLE IF NOT EXISTS {DAILY_STATS_TABLE} (
+        day TEXT PRIMARY KEY,
+        created INTEGER NOT NULL,
+        completed INTEGER NOT NULL
+    ) WITHOUT ROWID
+    """,
+    f"INSERT OR IGNORE INTO {STATS_TABLE} (id, total, completed) VALUES (1, 0, 0)",
+    f"""
+    CREATE TRIGGER IF NOT EXISTS task_stats_after_insert AFTER INSERT ON task BEGIN
+        UPDATE {STATS_TABLE} SET total = total + 1, completed = completed + new.completed WHERE id = 1;
+        {_add_day("new")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS task_stats_after_delete AFTER DELETE ON task
+    WHEN NOT EXISTS (SELECT 1 FROM task_archive WHERE id = old.id) BEGIN
+        {_remove_row("old")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS task_archive_stats_after_delete AFTER DELETE ON task_archive BEGIN
+        {_remove_row("old")}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS task_stats_after_update AFTER UPDATE OF completed, created_at ON task BEGIN
+        UPDATE {STATS_TABLE} SET completed = completed - old.completed + new.completed WHERE id = 1;
+        {_remove_day("old")}
+        {_add_day("new")}
+    END
+    """,
+]
+
+
+_ALL_TASKS = (
+    "(SELECT created_at, completed FROM task UNION ALL SELECT created_at, completed FROM task_archive)"
+)
+
+
+def rebuild_stats(sync_conn: Connection) -> None:
+    """Menghitung ulang seluruh ringkasan dari tabel task dan task_archive (perbaikan jika pernah tidak sinkron)."""
+    sync_conn.execute(text(f"DELETE FROM {DAILY_STATS_TABLE}"))
+    sync_conn.execute(
+        text(
+            f"UPDATE {STATS_TABLE} SET "
+            f"total = (SELECT count(*) FROM {_ALL_TASKS}), "
+            f"completed = (SELECT coalesce(sum(completed), 0) FROM {_ALL_TASKS}) "
+            "WHERE id = 1"
+        )
+    )
+    sync_conn.execute(
+        text(
+            f"INSERT INTO {DAILY_STATS_TABLE} (day, created, completed) "
+            f"SELECT date(created_at), count(*), sum(completed) FROM {_ALL_TASKS} GROUP BY date(created_at)"
+        )
+    )
+
+
+def create_stats_tables(sync_conn: Connection) -> None:
+    """Membuat tabel ringkasan + trigger; jika tabel baru dibuat, ringkasan diisi dari data lama."""
+    is_new = not inspect(sync_conn).has_table(STATS_TABLE)
+    for statement in _STATS_DDL:
+        sync_conn.execute(text(statement))
+    if is_new:
+        rebuild_stats(sync_conn)
+
+
+def count_archived_in_stats(sync_conn: Connection) -> None:
+    """Mengganti trigger DELETE versi lama (yang ikut mengurangi ringkasan saat tugas diarsipkan)
+    dan menghitung ulang ringkasan agar tugas yang sudah diarsipkan ikut terhitung.
+    """
+    sync_conn.execute(text("DROP TRIGGER IF EXISTS task_stats_after_delete"))
+    create_stats_tables(sync_conn)
+    rebuild_stats(sync_conn)
+
+
+async def _rebuild() -> None:
+    # Import di sini: database.py sendiri meng-import modul ini untuk create_stats_tables
+    from database import create_db_and_tables, dispose_engines, write_engine
+
+    await create_db_and_tables()
+    async with write_engine.begin() as conn:
+        await conn.run_sync(rebuild_stats)
+    await dispose_engines()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Utilitas ringkasan statistik tugas.")
+    parser.add_argument("command", choices=["rebuild"], help="rebuild: hitung ulang ringkasan dari tabel task dan task_archive")
+    parser.parse_args()
+    asyncio.run(_rebuild())
+    print("Task statistics rebuilt.")
+
+
+if __name__ == "__main__":
+    main()
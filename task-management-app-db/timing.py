@@ -0,0 +1,205 @@
+# app/timing.py
+import functools
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, TypeVar
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from config import QUERY_HEADERS_ENABLED
+from logging_config import get_logger
+from metrics import registry
+
+request_logger = get_logger("request")
+
+_queries_per_request = registry.histogram(
+    "db_queries_per_request",
+    "Jumlah statement SQL per request HTTP.",
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89),
+)[""]
+
+F = TypeVar("F", bound=Callable[..., Awaitable[Any]])
+
+
+class RequestTimings:
+    """Akumulator waktu per fase untuk satu request (disimpan di context var)."""
+
+    __slots__ = ("started", "handler_started", "phases", "sql_count")
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.handler_started: Optional[float] = None
+        self.phases: Dict[str, float] = {}
+        self.sql_count = 0
+
+    def add(self, phase: str, elapsed: float) -> None:
+        self.phases[phase] = self.phases.get(phase, 0.0) + elapsed
+
+    def as_fields(self, total: float) -> Dict[str, Any]:
+        fields: Dict[str, Any] = {"total_ms": round(total * 1000, 3)}
+        if self.handler_started is not None:
+            # Fase "di": parsing request + resolusi dependency sampai service pertama dipanggil
+            fields["di_ms"] = round((self.handler_started - self.started) * 1000, 3)
+        for phase, elapsed in self.phases.items():
+            fields[f"{phase}_ms"] = round(elapsed * 1000, 3)
+        fields["sql_count"] = self.sql_count
+        return fields
+
+
+# None di luar request HTTP (mis. worker background): semua pencatatan di bawah langsung return
+_current: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+
+def timed(phase: str) -> Callable[[F], F]:
+    """Decorator untuk method async service/repository yang menambah waktu ke fase `phase`."""
+
+    def decorator(func: F) -> F:
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            timings = _current.get()
+            if timings is None:
+                return await func(*args, **kwargs)
+            started = time.perf_counter()
+            if phase == "service" and timings.handler_started is None:
+                timings.handler_started = started
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                timings.add(phase, time.perf_counter() - started)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+class QueryLog:
+    """Statement SQL yang tercatat selama satu blok `count_queries()`."""
+
+    __slots__ = ("statements", "elapsed")
+
+    def __init__(self) -> None:
+        self.statements: List[str] = []
+        self.elapsed = 0.0
+
+    def __len__(self) -> int:
+        return len(self.statements)
+
+
+# Log aktif dari count_queries(). Sengaja global (bukan context var): TestClient menjalankan
+# aplikasi di thread/event loop lain, sehingga context pemanggil tidak ikut terbawa.
+_query_logs: List[QueryLog] = []
+
+# BEGIN/COMMIT/SAVEPOINT bukan query: tidak dihitung dalam jumlah maupun budget
+_TRANSACTION_CONTROL = ("BEGIN", "COMMIT", "ROLLBACK", "SAVEPOINT", "RELEASE")
+
+
+@contextmanager
+def count_queries() -> Iterator[QueryLog]:
+    """Mencatat semua statement SQL (kecuali kontrol transaksi) yang dijalankan di dalam blok."""
+    log = QueryLog()
+    _query_logs.append(log)
+    try:
+        yield log
+    finally:
+        _query_logs.remove(log)
+
+
+@contextmanager
+def assert_max_queries(budget: int) -> Iterator[QueryLog]:
+    """Gagal dengan AssertionError jika blok menjalankan lebih dari `budget` query.
+
+    Contoh di test:
+
+        with assert_max_queries(1):
+            client.get(f"/tasks/{task_id}")
+    """
+    with count_queries() as log:
+        yield log
+    if len(log) > budget:
+        statements = "\n".join(f"  {i}. {statement}" for i, statement in enumerate(log.statements, 1))
+        raise AssertionError(f"Expected at most {budget} queries, got {len(log)}:\n{statements}")
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Mencatat jumlah dan durasi statement SQL ke RequestTimings yang aktif dan ke count_queries()."""
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def before_cursor_execute(
+        conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool
+    ) -> None:
+        if _current.get() is not None or _query_logs:
+            conn.info["query_started"] = time.perf_counter()
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def after_cursor_execute(
+        conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool
+    ) -> None:
+        started = conn.info.pop("query_started", None)
+        if started is None or statement.startswith(_TRANSACTION_CONTROL):
+            return
+        elapsed = time.perf_counter() - started
+        timings = _current.get()
+        if timings is not None:
+            timings.sql_count += 1
+            timings.add("sql", elapsed)
+        for log in _query_logs:
+            log.statements.append(statement)
+            log.elapsed += elapsed
+
+
+def _query_headers(timings: RequestTimings) -> List[Any]:
+    sql_ms = timings.phases.get("sql", 0.0) * 1000
+    return [
+        (b"x-query-count", str(timings.sql_count).encode()),
+        (b"x-query-time-ms", f"{sql_ms:.3f}".encode()),
+        (b"server-timing", f"db;desc=\"{timings.sql_count} queries\";dur={sql_ms:.3f}".encode()),
+    ]
+
+
+class RequestTimingMiddleware:
+    """ASGI middleware yang menulis satu record log per request berisi timing tiap fase.
+
+    Jumlah statement SQL per request selalu dicatat ke metrik db_queries_per_request;
+    record log hanya ditulis jika logger "tasks.request" aktif di level INFO. Dengan
+    QUERY_HEADERS_ENABLED, jumlah dan durasi query ditambahkan ke header response
+    (untuk response streaming: query yang sudah berjalan sebelum header dikirim).
+    """
+
+    def __init__(self, app: Callable[..., Awaitable[None]]):
+        self.app = app
+
+    async def __call__(
+        self, scope: Dict[str, Any], receive: Callable[..., Any], send: Callable[..., Any]
+    ) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        timings = RequestTimings()
+        token = _current.set(timings)
+        status_code = 500
+
+        async def send_with_status(message: Dict[str, Any]) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if QUERY_HEADERS_ENABLED:
+                    message["headers"] = [*message.get("headers", ()), *_query_headers(timings)]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            _current.reset(token)
+            _queries_per_request.observe(timings.sql_count)
+            if request_logger.isEnabledFor(logging.INFO):
+                fields = timings.as_fields(time.perf_counter() - timings.started)
+                request_logger.info(
+                    "%s %s %s",
+                    scope["method"],
+                    scope["path"],
+                    status_code,
+                    extra={"method": scope["method"], "path": scope["path"], "status": status_code, **fields},
+                )
@@ -0,0 +1,30 @@
+# app/versioning.py
+from sqlalchemy import Connection, text
+
+# Satu baris counter yang naik setiap ada INSERT/UPDATE/DELETE di tabel task.
+# Dipakai sebagai versi koleksi untuk ETag GET /tasks: cukup baca satu baris
+# untuk tahu apakah ada perubahan, tanpa menjalankan query halaman.
+VERSION_TABLE = "task_version"
+
+_VERSION_DDL = [
+    f"""
+    CREATE TABLE IF NOT EXISTS {VERSION_TABLE} (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        version INTEGER NOT NULL
+    )
+    """,
+    f"INSERT OR IGNORE INTO {VERSION_TABLE} (id, version) VALUES (1, 0)",
+    *(
+        f"""
+        CREATE TRIGGER IF NOT EXISTS task_version_after_{event.lower()} AFTER {event} ON task BEGIN
+            UPDATE {VERSION_TABLE} SET version = version + 1 WHERE id = 1;
+        END
+        """
+        for event in ("INSERT", "UPDATE", "DELETE")
+    ),
+]
+
+
+def create_version_table(sync_conn: Connection) -> None:
+    for statement in _VERSION_DDL:
+        sync_conn.execute(text(statement))
@@ -0,0 +1,141 @@
+"""In-process change feed for todos, streamed to clients over SSE and WebSocket.
+
+``TodoService`` publishes every create/update/delete (and due-date reminder) to the
+``ChangeBroadcaster``. Each event gets a sequence number and is encoded once, as an SSE frame
+and as JSON, no matter how many clients receive it. A bounded history of recent events lets a
+client resume from the last sequence number it saw.
+
+Every subscriber has its own bounded queue of pending events, keyed by todo: a newer event for
+a todo that is still pending replaces the older one (coalescing), since events carry the todo's
+full state. A subscriber that falls so far behind that more than ``capacity`` todos are pending
+gets its queue dropped and a single ``reset`` event instead, telling it to re-fetch
+``GET /todos`` and continue from the reset's sequence number. Slow clients therefore cost a
+bounded amount of memory and never hold up publishing.
+"""
+import asyncio
+from collections import OrderedDict, deque
+from itertools import islice
+from typing import Any, Deque, Dict, List, Optional, Set
+from uuid import UUID
+
+from models import Todo
+from schemas import TodoResponse
+
+CREATED = "created"
+UPDATED = "updated"
+DELETED = "deleted"
+DUE = "due"
+RESET = "reset"
+
+
+class ChangeEvent:
+    __slots__ = ("seq", "type", "todo_id", "key", "todo_json", "json", "sse")
+
+    def __init__(self, seq: int, change_type: str, todo_id: Optional[UUID], todo_json: Optional[str]):
+        self.seq = seq
+        self.type = change_type
+        self.todo_id = todo_id
+        self.key = None if todo_id is None else todo_id.int  # Hashes far faster than the UUID, once per subscriber
+        self.todo_json = todo_json
+        todo_id_json = "null" if todo_id is None else f'"{todo_id}"'
+        self.json = f'{{"seq":{seq},"type":"{change_type}","id":{todo_id_json},"todo":{todo_json or "null"}}}'
+        self.sse = f"id: {seq}\nevent: {change_type}\ndata: {self.json}\n\n".encode()
+
+
+class Subscription:
+    """One client's bounded, coalescing queue; created by ``ChangeBroadcaster.subscribe``."""
+
+    def __init__(self, broadcaster: "ChangeBroadcaster", capacity: int):
+        self.broadcaster = broadcaster
+        self.capacity = capacity
+        self.pending: "OrderedDict[Optional[int], ChangeEvent]" = OrderedDict()
+        self.overflowed = False
+        self._ready = asyncio.Event()
+
+    def offer(self, event: ChangeEvent) -> None:
+        if self.overflowed:
+            return  # A reset is already pending; it supersedes everything until it is taken
+        pending = self.pending
+        previous = pending.pop(event.key, None)
+        if previous is not None:
+            # Still pending, so the subscription is already marked ready
+            self.broadcaster.coalesced_total += 1
+            if previous.type == CREATED and event.type == UPDATED:
+                # The client has not seen the todo yet: it is still a creation, with the newest state
+                event = ChangeEvent(event.seq, CREATED, event.todo_id, event.todo_json)
+            pending[event.key] = event
+            return
+        if len(pending) >= self.capacity:
+            pending.clear()
+            self.overflowed = True
+            self.broadcaster.resets_total += 1
+        else:
+            pending[event.key] = event
+        self._ready.set()
+
+    async def next_batch(self, timeout: Optional[float] = None) -> List[ChangeEvent]:
+        """Waits for pending events and takes all of them, oldest first; ``[]`` after ``timeout`` seconds."""
+        if not self._ready.is_set():
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return []
+        self._ready.clear()
+        if self.overflowed:
+            self.overflowed = False
+            return [self.broadcaster.reset_event()]
+        batch = list(self.pending.values())
+        self.pending.clear()
+        return batch
+
+    def close(self) -> None:
+        self.broadcaster.subscribers.discard(self)
+
+
+class ChangeBroadcaster:
+    def __init__(self, history_size: int = 10_000, capacity: int = 256):
+        self.seq = 0
+        self.history: Deque[ChangeEvent] = deque(maxlen=history_size)
+        self.capacity = capacity
+        self.subscribers: Set[Subscription] = set()
+        self.coalesced_total = 0
+        self.resets_total = 0
+
+    def publish(self, change_type: str, todo_id: UUID, todo: Optional[Todo] = None) -> ChangeEvent:
+        self.seq += 1
+        todo_json = None if todo is None else TodoResponse.model_validate(todo).model_dump_json()
+        event = ChangeEvent(self.seq, change_type, todo_id, todo_json)
+        self.history.append(event)
+        for subscription in self.subscribers:
+            subscription.offer(event)
+        return event
+
+    def reset_event(self) -> ChangeEvent:
+        return ChangeEvent(self.seq, RESET, None, None)
+
+    def subscribe(self, since: Optional[int] = None) -> Subscription:
+        """Starts a subscription; with ``since``, events after that sequence number are replayed first.
+
+        If those events are no longer in the history (or ``since`` is ahead of the feed, e.g. after
+        a restart), the subscription starts with a ``reset`` event instead.
+        """
+        subscription = Subscription(self, self.capacity)
+        if since is not None and since != self.seq:
+            oldest = self.history[0].seq if self.history else self.seq + 1
+            if since < oldest - 1 or since > self.seq:
+                subscription.overflowed = True
+                subscription._ready.set()
+            else:
+                for event in islice(self.history, since - oldest + 1, None):
+                    subscription.offer(event)
+        self.subscribers.add(subscription)
+        return subscription
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "seq": self.seq,
+            "subscribers": len(self.subscribers),
+            "history": len(self.history),
+            "coalesced_total": self.coalesced_total,
+            "resets_total": self.resets_total,
+        }
@@ -0,0 +1,21 @@
+import os
+
+# Directory for the todo journal (append-only log + snapshot); unset = todos live in memory only
+TODO_DATA_DIR = os.getenv("TODO_DATA_DIR") or None
+# Buffered log records are written and fsync'ed in one batch at this interval
+TODO_SYNC_INTERVAL_MS = int(os.getenv("TODO_SYNC_INTERVAL_MS", "50"))
+# A new snapshot is written (and older log segments removed) once the log grows past this size
+TODO_SNAPSHOT_BYTES = int(os.getenv("TODO_SNAPSHOT_MB", "64")) * 1024 * 1024
+# Resolution of the due-date reminder timer wheel
+TODO_REMINDER_TICK_SECONDS = float(os.getenv("TODO_REMINDER_TICK_SECONDS", "1"))
+# Change feed (/todos/changes): events kept for resuming, pending todos per subscriber before a reset
+TODO_CHANGES_HISTORY = int(os.getenv("TODO_CHANGES_HISTORY", "10000"))
+TODO_CHANGES_QUEUE_SIZE = int(os.getenv("TODO_CHANGES_QUEUE_SIZE", "256"))
+# Idle streams get a keep-alive at this interval, which is also when closed connections are noticed
+TODO_CHANGES_HEARTBEAT_SECONDS = float(os.getenv("TODO_CHANGES_HEARTBEAT_SECONDS", "15"))
+# Memory-mapped file shared by all worker processes (uvicorn --workers N); unset = each process has its own todos.
+# Setting it disables the change feed (/todos/changes returns 501) and due-date reminders.
+TODO_SHARED_FILE = os.getenv("TODO_SHARED_FILE") or None
+# Size of that file: two log regions, and the todos may take up to half of one (a quarter of the file,
+# about 50 bytes per todo plus its text)
+TODO_SHARED_BYTES = int(os.getenv("TODO_SHARED_MB", "256")) * 1024 * 1024
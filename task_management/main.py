@@ -1,11 +1,54 @@
+from contextlib import asynccontextmanager
+
+from config import (
+    TODO_DATA_DIR,
+    TODO_REMINDER_TICK_SECONDS,
+    TODO_SHARED_BYTES,
+    TODO_SHARED_FILE,
+    TODO_SNAPSHOT_BYTES,
+    TODO_SYNC_INTERVAL_MS,
+)
 from fastapi import FastAPI
+from metrics import instrument
+from persistence import TodoJournal
+from providers import container
+from reminders import TimerWheel
+from repositories import close_journal, close_reminders, close_shared, open_journal, open_reminders, open_shared
 from routers import todos
+from services import TodoService
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load persisted todos (if enabled) before serving requests
+    if TODO_DATA_DIR and TODO_SHARED_FILE:
+        # Every worker would write its own journal of the same todos
+        raise RuntimeError("TODO_DATA_DIR and TODO_SHARED_FILE cannot be used together")
+    if TODO_DATA_DIR:
+        open_journal(TodoJournal(TODO_DATA_DIR, TODO_SYNC_INTERVAL_MS / 1000, TODO_SNAPSHOT_BYTES))
+    # Or share the todos with the other worker processes
+    if TODO_SHARED_FILE:
+        from shared import SharedTodoStore  # needs fcntl, which Windows does not have
+
+        open_shared(SharedTodoStore(TODO_SHARED_FILE, TODO_SHARED_BYTES))
+    container.startup()
+    # One timer wheel task for all due-date reminders. Not with a shared store: every worker would
+    # fire each reminder, and only learns of the other workers' todos when it next replays the log.
+    if not TODO_SHARED_FILE:
+        open_reminders(TimerWheel(container.resolve(TodoService).todos_came_due, TODO_REMINDER_TICK_SECONDS))
+    yield
+    await close_reminders()
+    container.shutdown()
+    close_journal()
+    close_shared()
+
 
 app = FastAPI(
     title="Task Management App",
     description="A Simple Task Management/Todo App",
     version="1.0.0",
     docs_url="/documentation",
+    lifespan=lifespan,
 )
 
 
@@ -20,3 +63,7 @@ def health_check():
 
 
 app.include_router(todos.router)
+
+
+# Prometheus metrics at GET /metrics; called last so every route gets wrapped
+instrument(app)
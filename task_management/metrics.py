@@ -0,0 +1,184 @@
+"""Prometheus-style metrics without extra dependencies.
+
+`instrument(app)` wraps every registered route and adds GET /metrics. All metric objects
+(counters, histograms, in-flight gauges) are created once per route at startup, so recording
+a request only increments numbers in existing lists: no new labels, strings or dicts; the only
+per-request allocation is the small closure that reads the status from the response message.
+The exposition text is built when it is scraped.
+"""
+import time
+from bisect import bisect_left
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from fastapi import FastAPI
+from fastapi.responses import Response
+from starlette.exceptions import HTTPException
+from starlette.routing import BaseRoute, WebSocketRoute
+
+ASGIApp = Callable[[Dict[str, Any], Callable[..., Any], Callable[..., Any]], Awaitable[None]]
+
+# Latency buckets (seconds): the Prometheus client defaults plus 1ms and 2.5ms
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _labels(**labels: str) -> str:
+    return ",".join(f'{key}="{value}"' for key, value in labels.items())
+
+
+class Histogram:
+    """Histogram with fixed buckets; `observe` only increments one slot (no allocation)."""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1) # Last slot = +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def render(self, name: str, labels: str) -> Iterable[str]:
+        prefix = f"{labels}," if labels else ""
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            yield f'{name}_bucket{{{prefix}le="{bound}"}} {cumulative}'
+        yield f'{name}_bucket{{{prefix}le="+Inf"}} {self.count}'
+        suffix = f"{{{labels}}}" if labels else ""
+        yield f"{name}_sum{suffix} {self.sum}"
+        yield f"{name}_count{suffix} {self.count}"
+
+
+class RouteMetrics:
+    """All metrics of one route; created once by `instrument`."""
+
+    __slots__ = ("labels", "in_flight", "status_counts", "latency")
+
+    def __init__(self, method: str, path: str):
+        self.labels = _labels(method=method, route=path)
+        self.in_flight = 0
+        self.status_counts = [0] * 6 # Per status class: index 1..5 = 1xx..5xx
+        self.latency = Histogram()
+
+
+class MetricsRegistry:
+    """The metrics of one application and the builder of their exposition text."""
+
+    def __init__(self) -> None:
+        self.routes: List[RouteMetrics] = []
+        self._histograms: List[Tuple[str, str, Dict[str, Histogram]]] = []
+        self._collectors: List[Tuple[str, str, str, Callable[[], Iterable[Tuple[str, float]]]]] = []
+
+    def histogram(
+        self, name: str, help_text: str, label_sets: Iterable[str] = ("",), buckets: Sequence[float] = LATENCY_BUCKETS
+    ) -> Dict[str, Histogram]:
+        """Registers a histogram per label set (e.g. 'engine="read"'); created now, not per request."""
+        series = {labels: Histogram(buckets) for labels in label_sets}
+        self._histograms.append((name, help_text, series))
+        return series
+
+    def collector(
+        self, name: str, metric_type: str, help_text: str, collect: Callable[[], Iterable[Tuple[str, float]]]
+    ) -> None:
+        """Registers a counter/gauge whose values are read at scrape time, e.g. pool statistics."""
+        self._collectors.append((name, metric_type, help_text, collect))
+
+    def render(self) -> str:
+        lines = [
+            "# HELP http_requests_total Requests per route and status class.",
+            "# TYPE http_requests_total counter",
+        ]
+        for route in self.routes:
+            for status_class in range(1, 6):
+                count = route.status_counts[status_class]
+                if count:
+                    lines.append(f'http_requests_total{{{route.labels},status="{status_class}xx"}} {count}')
+        lines += [
+            "# HELP http_requests_in_flight Requests currently being handled per route.",
+            "# TYPE http_requests_in_flight gauge",
+        ]
+        lines += [f"http_requests_in_flight{{{route.labels}}} {route.in_flight}" for route in self.routes]
+        lines += [
+            "# HELP http_request_duration_seconds Request latency per route.",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for route in self.routes:
+            lines += route.latency.render("http_request_duration_seconds", route.labels)
+        for name, help_text, series in self._histograms:
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+            for labels, histogram in series.items():
+                lines += histogram.render(name, labels)
+        for name, metric_type, help_text, collect in self._collectors:
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {metric_type}"]
+            for labels, value in collect():
+                lines.append(f"{name}{{{labels}}} {value}" if labels else f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+def _instrumented(app: ASGIApp, metrics: RouteMetrics) -> ASGIApp:
+    async def instrumented_app(
+        scope: Dict[str, Any], receive: Callable[..., Any], send: Callable[..., Any]
+    ) -> None:
+        metrics.in_flight += 1
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message: Dict[str, Any]) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await app(scope, receive, send_with_status)
+        except HTTPException as exc:
+            # E.g. a 404 from the router: turned into a response by ExceptionMiddleware outside this wrapper
+            status_code = exc.status_code
+            raise
+        finally:
+            metrics.in_flight -= 1
+            metrics.status_counts[min(status_code // 100, 5)] += 1
+            metrics.latency.observe(time.perf_counter() - started)
+
+    return instrumented_app
+
+
+def _route_metrics(route: BaseRoute) -> Optional[RouteMetrics]:
+    path = getattr(route, "path", None)
+    methods = getattr(route, "methods", None)
+    if path is None or not hasattr(route, "app"):
+        return None
+    if isinstance(route, WebSocketRoute):
+        return None  # WebSocket connections have no HTTP status and are long-lived
+    return RouteMetrics(",".join(sorted(methods)) if methods else "*", path)
+
+
+def instrument(app: FastAPI, metrics_registry: MetricsRegistry = registry, path: str = "/metrics") -> None:
+    """Adds GET /metrics and wraps every route registered so far.
+
+    Call it after all routers are included. Routes are wrapped directly (not through a
+    middleware), so the route template, e.g. /todos/{todo_id}, is known without routing again.
+    """
+
+    @app.get(path, include_in_schema=False)
+    async def metrics_endpoint() -> Response:
+        return Response(metrics_registry.render(), media_type=CONTENT_TYPE)
+
+    for route in app.router.routes:
+        route_metrics = _route_metrics(route)
+        if route_metrics is None:
+            continue
+        route.app = _instrumented(route.app, route_metrics)  # type: ignore[attr-defined]
+        metrics_registry.routes.append(route_metrics)
+    # Requests that match no route (404) are recorded as one route
+    unmatched = RouteMetrics("*", "<unmatched>")
+    app.router.default = _instrumented(app.router.default, unmatched)  # type: ignore[method-assign]
+    metrics_registry.routes.append(unmatched)
@@ -1,13 +1,32 @@
+import sys
 import uuid
 from datetime import date
-from typing import Optional
+from typing import Any, Dict, Optional
+
+# Shared date objects: many todos are due on the same few days
+_dates: Dict[date, date] = {}
+
+
+def compact_value(value: Any) -> Any:
+    """Returns a shared instance for values that repeat across todos (strings and dates)."""
+    if type(value) is str:
+        return sys.intern(value)
+    if type(value) is date:
+        return _dates.setdefault(value, value)
+    return value
 
 
 class Todo:
     """Represents a core Todo item within our application's business logic.
     This is separate from Pydantic schemas which are for API input/output.
+
+    Kept compact so millions of todos can stay resident: no per-instance ``__dict__``,
+    the ID is stored as its 128-bit integer (``id`` still returns a ``uuid.UUID``),
+    and strings and dates are shared between todos via ``compact_value``.
     """
 
+    __slots__ = ("key", "title", "description", "completed", "priority", "due_date")
+
     def __init__(
         self,
         title: str,
@@ -18,12 +37,20 @@ class Todo:
         # Generate a unique ID if not provided (for new todos)
         id: Optional[uuid.UUID] = None,
     ):
-        self.id: uuid.UUID = id if id else uuid.uuid4()
-        self.title = title
-        self.description = description
+        self.key: int = (id if id else uuid.uuid4()).int  # 128-bit integer form of the UUID
+        self.title = compact_value(title)
+        self.description = compact_value(description)
         self.completed = completed
         self.priority = priority
-        self.due_date = due_date
+        self.due_date = compact_value(due_date)
+
+    @property
+    def id(self) -> uuid.UUID:
+        return uuid.UUID(int=self.key)
+
+    @id.setter
+    def id(self, value: uuid.UUID) -> None:
+        self.key = value.int
 
     def to_dict(self):
         """Converts the Todo object to a dictionary, useful for storage and Pydantic conversion."""
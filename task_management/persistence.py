@@ -0,0 +1,432 @@
+"""Durable storage for the in-memory todo store: an append-only log plus periodic snapshots.
+
+Files in the data directory:
+
+- ``journal-<generation>.log``: one record per change (full todo on create/update, key on
+  delete), each framed as ``<length><crc32><body>`` so a torn write at the tail is detected
+  and cut off on the next start.
+- ``snapshot.bin``: every todo at the moment log generation ``<generation>`` was started,
+  stored column by column (key halves, title/description string IDs, due date ordinals,
+  priorities, completed flags) with each distinct string stored once, followed by the row
+  numbers sorted by key and by due date. Written to a temporary file, fsync'ed and renamed,
+  so it is either complete or absent.
+
+Changes are encoded into an in-memory buffer by the caller (a few microseconds, no I/O);
+a background thread writes and fsyncs the buffer every ``sync_interval`` seconds, so a
+crash loses at most that window. When the log grows past ``snapshot_bytes`` the thread
+starts a new log generation, writes a snapshot and deletes the older log files.
+
+On startup the snapshot is mapped and used in place (``TodoSnapshot``): opening it reads the
+header, and a todo is only decoded when it is read, so the start takes about as long for
+millions of todos as for a few. The remaining logs are read into a list of changes to apply
+on top; replaying a record that the snapshot already contains is harmless, because a record
+carries the whole todo.
+"""
+import logging
+import mmap
+import os
+import struct
+import sys
+import threading
+import zlib
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import date
+from itertools import accumulate, compress
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from models import Todo, compact_value
+
+logger = logging.getLogger(__name__)
+
+# key, completed, priority, due date ordinal (0 = none), title length, description length
+_TODO = struct.Struct("<16s?BIHI")
+_NO_DESCRIPTION = 0xFFFFFFFF
+# body length, crc32 of body
+_RECORD = struct.Struct("<II")
+_PUT = b"P"
+_DELETE = b"D"
+# magic, log generation covered by the snapshot, number of todos, number of distinct strings,
+# number of todos with a due date, number of those that are open
+_SNAPSHOT = struct.Struct("<8sQQQQQ")
+_SNAPSHOT_MAGIC = b"TODOSNP3"
+SNAPSHOT_FILE = "snapshot.bin"
+_MASK_64 = (1 << 64) - 1
+
+# (key, todo) for a put, (key, None) for a delete
+Change = Tuple[int, Optional[Todo]]
+
+
+def _log_name(generation: int) -> str:
+    return f"journal-{generation:08d}.log"
+
+
+def encode_todo(todo: Todo) -> bytes:
+    title = todo.title.encode()
+    description = b"" if todo.description is None else todo.description.encode()
+    return b"".join((
+        _TODO.pack(
+            todo.key.to_bytes(16, "big"),
+            todo.completed,
+            todo.priority,
+            todo.due_date.toordinal() if todo.due_date else 0,
+            len(title),
+            _NO_DESCRIPTION if todo.description is None else len(description),
+        ),
+        title,
+        description,
+    ))
+
+
+def decode_todo(buffer: bytes, offset: int, dates: Dict[int, date]) -> Tuple[Todo, int]:
+    """Decodes the todo at ``offset``; returns it with the offset just past it.
+
+    ``dates`` caches date objects by ordinal across calls, so todos due on the same day share one.
+    """
+    key, completed, priority, due, title_length, description_length = _TODO.unpack_from(buffer, offset)
+    offset += _TODO.size
+    title = compact_value(str(buffer[offset:offset + title_length], "utf-8"))
+    offset += title_length
+    description = None
+    if description_length != _NO_DESCRIPTION:
+        description = compact_value(str(buffer[offset:offset + description_length], "utf-8"))
+        offset += description_length
+    due_date = None
+    if due:
+        due_date = dates.get(due)
+        if due_date is None:
+            due_date = dates[due] = compact_value(date.fromordinal(due))
+    # Bypasses __init__: the UUID object and the second round of interning are not needed here
+    todo = Todo.__new__(Todo)
+    todo.key = int.from_bytes(key, "big")
+    todo.title = title
+    todo.description = description
+    todo.completed = completed
+    todo.priority = priority
+    todo.due_date = due_date
+    return todo, offset
+
+
+def _frame(body: bytes) -> bytes:
+    return _RECORD.pack(len(body), zlib.crc32(body)) + body
+
+
+def _restore(key: int, title: str, description: Optional[str], completed: bool, priority: int, due_date) -> Todo:
+    todo = Todo.__new__(Todo)
+    todo.key = key
+    todo.title = title
+    todo.description = description
+    todo.completed = completed
+    todo.priority = priority
+    todo.due_date = due_date
+    return todo
+
+
+def _padded(data: bytes) -> bytes:
+    """Pads a section to a multiple of 8 bytes so the next column starts aligned."""
+    return data + bytes(-len(data) % 8)
+
+
+def encode_snapshot(todos: List[Todo], generation: int) -> List[bytes]:
+    """Returns the sections of a columnar snapshot; see the module docstring."""
+    string_ids: Dict[str, int] = {}
+    titles = array("I", [string_ids.setdefault(todo.title, len(string_ids)) for todo in todos])
+    descriptions = [
+        _NO_DESCRIPTION if todo.description is None else string_ids.setdefault(todo.description, len(string_ids))
+        for todo in todos
+    ]
+    # None is stored as the ID after the last string
+    descriptions = array("I", [len(string_ids) if i == _NO_DESCRIPTION else i for i in descriptions])
+    strings = [string.encode() for string in string_ids]
+    text = b"".join(strings)
+    keys = [todo.key for todo in todos]
+    dues = array("I", [todo.due_date.toordinal() if todo.due_date else 0 for todo in todos])
+    completed = bytes([todo.completed for todo in todos])
+    rows = range(len(todos))
+    # Sorting is stable, so todos due on the same day stay in row order
+    by_due = sorted(compress(rows, dues), key=dues.__getitem__)
+    open_by_due = [row for row in by_due if not completed[row]]
+    return [
+        _SNAPSHOT.pack(_SNAPSHOT_MAGIC, generation, len(todos), len(strings), len(by_due), len(open_by_due)),
+        array("Q", accumulate(map(len, strings), initial=0)).tobytes(),  # Byte offsets into the text
+        _padded(text),
+        array("Q", [key >> 64 for key in keys]).tobytes(),
+        array("Q", [key & _MASK_64 for key in keys]).tobytes(),
+        _padded(titles.tobytes()),
+        _padded(descriptions.tobytes()),
+        _padded(dues.tobytes()),
+        _padded(bytes([todo.priority for todo in todos])),
+        _padded(completed),
+        _padded(array("I", sorted(rows, key=keys.__getitem__)).tobytes()),
+        _padded(array("I", by_due).tobytes()),
+        _padded(array("I", open_by_due).tobytes()),
+    ]
+
+
+def _column(buffer: memoryview, offset: int, typecode: str, count: int) -> Tuple[memoryview, int]:
+    """Returns ``count`` values at ``offset`` as a view over the mapping, and the offset of the next section."""
+    size = count * array(typecode).itemsize
+    return buffer[offset:offset + size].cast(typecode), offset + size + (-size % 8)
+
+
+class TodoSnapshot:
+    """A snapshot file, mapped into memory and read in place.
+
+    Every column is a memoryview over the mapping (indexed by row, in store order), so opening
+    a snapshot reads only its header and ``todo(row)`` decodes one todo when it is needed.
+    ``by_key`` holds the row numbers sorted by key, ``by_due`` and ``open_by_due`` those of the
+    todos with a due date (all of them, the open ones) sorted by due date and row.
+    """
+
+    def __init__(self, path: Path):
+        with open(path, "rb") as file:
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.generation, self.count, self._string_count, due_count, open_due_count = _SNAPSHOT.unpack_from(
+            buffer, 0
+        )
+        if magic != _SNAPSHOT_MAGIC:
+            raise ValueError("not a todo snapshot")
+        if sys.byteorder != "little":
+            raise ValueError("todo snapshots are written in little-endian byte order")
+        # The views keep the mapping alive for as long as they are used
+        view = memoryview(buffer)
+        self._offsets, offset = _column(view, _SNAPSHOT.size, "Q", self._string_count + 1)
+        text_size = self._offsets[-1]
+        self._text = view[offset:offset + text_size]
+        offset += text_size + (-text_size % 8)
+        self.high, offset = _column(view, offset, "Q", self.count)
+        self.low, offset = _column(view, offset, "Q", self.count)
+        self.titles, offset = _column(view, offset, "I", self.count)
+        self.descriptions, offset = _column(view, offset, "I", self.count)
+        self.dues, offset = _column(view, offset, "I", self.count)
+        self.priorities, offset = _column(view, offset, "B", self.count)
+        self.completed, offset = _column(view, offset, "B", self.count)
+        self.by_key, offset = _column(view, offset, "I", self.count)
+        self.by_due, offset = _column(view, offset, "I", due_count)
+        self.open_by_due, offset = _column(view, offset, "I", open_due_count)
+        # Due dates by ordinal, so todos due on the same day share one date
+        self._dates: Dict[int, Optional[date]] = {0: None}
+
+    def key(self, row: int) -> int:
+        return self.high[row] << 64 | self.low[row]
+
+    def find(self, key: int) -> Optional[int]:
+        """Row of the todo with ``key``: a binary search over ``by_key`` on the high half, then the low half."""
+        high, low = key >> 64, key & _MASK_64
+        position = bisect_left(self.by_key, high, key=self.high.__getitem__)
+        while position < self.count:
+            row = self.by_key[position]
+            if self.high[row] != high:
+                break
+            if self.low[row] == low:
+                return row
+            position += 1
+        return None
+
+    def _string(self, string_id: int) -> Optional[str]:
+        if string_id == self._string_count:
+            return None
+        return compact_value(str(self._text[self._offsets[string_id]:self._offsets[string_id + 1]], "utf-8"))
+
+    def due_date(self, row: int) -> Optional[date]:
+        ordinal = self.dues[row]
+        due_date = self._dates.get(ordinal)
+        if due_date is None and ordinal:
+            due_date = self._dates[ordinal] = compact_value(date.fromordinal(ordinal))
+        return due_date
+
+    def todo(self, row: int) -> Todo:
+        """Decodes the todo in ``row``; every call returns a new object."""
+        return _restore(
+            self.key(row),
+            self._string(self.titles[row]),
+            self._string(self.descriptions[row]),
+            bool(self.completed[row]),
+            self.priorities[row],
+            self.due_date(row),
+        )
+
+    def due_rows(self, due_after: Optional[date], due_before: Optional[date], open_only: bool = False) -> memoryview:
+        """Rows with ``due_after <= due_date <= due_before`` (either bound optional), by due date."""
+        rows = self.open_by_due if open_only else self.by_due
+        start = 0 if due_after is None else bisect_left(rows, due_after.toordinal(), key=self.dues.__getitem__)
+        end = len(rows)
+        if due_before is not None:
+            end = bisect_right(rows, due_before.toordinal(), key=self.dues.__getitem__)
+        return rows[start:max(start, end)]
+
+
+class TodoJournal:
+    """Append-only log and snapshots of the todo store in ``directory``.
+
+    ``put``/``delete`` must be called while holding the store lock passed to ``start``,
+    in the same order as the changes are applied to the store.
+    """
+
+    def __init__(self, directory: str, sync_interval: float = 0.05, snapshot_bytes: int = 64 * 1024 * 1024):
+        self.directory = Path(directory)
+        self.sync_interval = sync_interval
+        self.snapshot_bytes = snapshot_bytes
+        self.generation = 0
+        self.log_bytes = 0  # Size of the current log generation
+        self._buffer = bytearray()
+        self._log_file = None
+        self._lock: Optional[threading.RLock] = None
+        self._capture: Optional[Callable[[], Iterable[Todo]]] = None
+        self._closing = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._io_lock = threading.Lock()  # Serializes flushes and snapshots
+
+    # --- startup ---
+
+    def load(self) -> Optional[Tuple[Optional[TodoSnapshot], List[Change]]]:
+        """Opens the snapshot (if any) and reads the changes logged after it, oldest first.
+
+        Returns None when the directory holds no data yet. Opens the log for appending.
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        snapshot_path = self.directory / SNAPSHOT_FILE
+        logs = sorted(self.directory.glob("journal-*.log"))
+        if not snapshot_path.exists() and not logs:
+            self._open_log(0)
+            return None
+
+        snapshot = None
+        changes: List[Change] = []
+        dates: Dict[int, date] = {}
+        generation = 0
+        if snapshot_path.exists():
+            snapshot = self._read_snapshot(snapshot_path)
+            generation = snapshot.generation
+        for path in logs:
+            log_generation = int(path.stem.split("-")[1])
+            if log_generation < generation:
+                path.unlink()  # Left over from a snapshot that finished before the cleanup
+                continue
+            self._replay(path, changes, dates)
+            generation = log_generation
+        self._open_log(generation)
+        logger.info(
+            "Loaded %d todos and %d logged changes from %s (log generation %d)",
+            0 if snapshot is None else snapshot.count, len(changes), self.directory, generation,
+        )
+        return snapshot, changes
+
+    def _read_snapshot(self, path: Path) -> TodoSnapshot:
+        try:
+            return TodoSnapshot(path)
+        except ValueError as exc:
+            raise ValueError(f"{path}: {exc}") from exc
+
+    def _replay(self, path: Path, changes: List[Change], dates: Dict[int, date]) -> None:
+        size = path.stat().st_size
+        if size == 0:
+            return
+        offset = 0
+        with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            while offset + _RECORD.size <= size:
+                length, checksum = _RECORD.unpack_from(buffer, offset)
+                start = offset + _RECORD.size
+                body = buffer[start:start + length]
+                if len(body) < length or zlib.crc32(body) != checksum:
+                    break
+                if body[:1] == _PUT:
+                    todo, _ = decode_todo(body, 1, dates)
+                    changes.append((todo.key, todo))
+                else:
+                    changes.append((int.from_bytes(body[1:17], "big"), None))
+                offset = start + length
+        if offset < size:
+            logger.warning("Discarding %d bytes of incomplete records at the end of %s", size - offset, path)
+            os.truncate(path, offset)
+
+    def _open_log(self, generation: int) -> None:
+        self.generation = generation
+        self._log_file = open(self.directory / _log_name(generation), "ab")
+        self.log_bytes = self._log_file.tell()
+
+    # --- writes (caller holds the store lock) ---
+
+    def put(self, todo: Todo) -> None:
+        self._buffer += _frame(_PUT + encode_todo(todo))
+
+    def delete(self, key: int) -> None:
+        self._buffer += _frame(_DELETE + key.to_bytes(16, "big"))
+
+    # --- background flushing ---
+
+    def start(self, lock: threading.RLock, capture: Callable[[], Iterable[Todo]]) -> None:
+        """Starts the flush thread; ``capture`` returns every todo and is called with ``lock`` held.
+
+        What it returns is iterated after ``lock`` is released, so it may be a lazy view of that moment.
+        """
+        self._lock = lock
+        self._capture = capture
+        self._thread = threading.Thread(target=self._run, name="todo-journal", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._closing.wait(self.sync_interval):
+            try:
+                self.flush()
+                if self.log_bytes >= self.snapshot_bytes:
+                    self.snapshot()
+            except Exception:
+                logger.exception("Todo journal flush failed")
+
+    def _take_buffer(self) -> bytearray:
+        with self._lock:
+            buffer, self._buffer = self._buffer, bytearray()
+        return buffer
+
+    def flush(self) -> None:
+        """Writes buffered records to the log and fsyncs it."""
+        with self._io_lock:
+            self._write(self._take_buffer())
+
+    def _write(self, data: bytes) -> None:
+        if data:
+            self._log_file.write(data)
+            self._log_file.flush()
+            os.fsync(self._log_file.fileno())
+            self.log_bytes += len(data)
+
+    def snapshot(self) -> None:
+        """Starts a new log generation and writes a snapshot of the store as of that point."""
+        with self._io_lock:
+            with self._lock:
+                pending, self._buffer = self._buffer, bytearray()
+                todos = self._capture()
+            # Records buffered before the capture belong to the old generation
+            self._write(pending)
+            self._log_file.close()
+            self._open_log(self.generation + 1)
+            self._write_snapshot(list(todos), self.generation)
+            for path in self.directory.glob("journal-*.log"):
+                if int(path.stem.split("-")[1]) < self.generation:
+                    path.unlink()
+
+    def _write_snapshot(self, todos: List[Todo], generation: int) -> None:
+        temporary = self.directory / f"{SNAPSHOT_FILE}.tmp"
+        with open(temporary, "wb") as file:
+            file.writelines(encode_snapshot(todos, generation))
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary, self.directory / SNAPSHOT_FILE)
+        # Make the rename itself durable
+        directory = os.open(self.directory, os.O_RDONLY)
+        try:
+            os.fsync(directory)
+        finally:
+            os.close(directory)
+        logger.info("Wrote todo snapshot: %d todos, log generation %d", len(todos), generation)
+
+    def close(self) -> None:
+        """Stops the flush thread and compacts the log into a snapshot for a fast next start."""
+        self._closing.set()
+        if self._thread is not None:
+            self._thread.join()
+            self.snapshot()
+        if self._log_file is not None:
+            self._log_file.close()
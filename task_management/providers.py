@@ -0,0 +1,109 @@
+"""A small dependency provider container with explicit lifetimes.
+
+- ``SINGLETON``: built once (eagerly by ``startup()`` in the app lifespan) and shared by every request.
+- ``TTL``: built on first use and rebuilt once ``ttl`` seconds have passed, e.g. for configuration
+  or clients that should be refreshed periodically.
+- ``REQUEST``: the factory itself is the FastAPI dependency, so it runs for every request and may be
+  a (async) generator to clean up afterwards, e.g. a database session.
+
+``dependency(key)`` returns the function to put in ``Depends(...)``. For singleton and TTL providers
+it is an ``async def`` returning the cached instance, so FastAPI neither builds objects nor hops to
+its threadpool (as it does for plain ``def`` dependencies) on each request.
+"""
+import time
+from enum import Enum
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+T = TypeVar("T")
+
+_MISSING = object()
+
+
+class Lifetime(str, Enum):
+    SINGLETON = "singleton"
+    TTL = "ttl"
+    REQUEST = "request"
+
+
+class Provider:
+    """One registered factory and, for singleton/TTL lifetimes, its cached instance."""
+
+    __slots__ = ("factory", "lifetime", "ttl", "value", "expires_at")
+
+    def __init__(self, factory: Callable[..., Any], lifetime: Lifetime, ttl: Optional[float]):
+        self.factory = factory
+        self.lifetime = lifetime
+        self.ttl = ttl
+        self.value: Any = _MISSING
+        self.expires_at = 0.0
+
+
+class ProviderContainer:
+    """Registry of providers keyed by the type they provide."""
+
+    def __init__(self) -> None:
+        self._providers: Dict[Any, Provider] = {}
+
+    def register(
+        self,
+        key: Any,
+        factory: Callable[..., Any],
+        lifetime: Lifetime = Lifetime.SINGLETON,
+        ttl: Optional[float] = None,
+    ) -> None:
+        """Registers ``factory`` for ``key``.
+
+        Singleton and TTL factories are called with the container, so they can ``resolve``
+        their own dependencies. Request factories are FastAPI dependencies and receive
+        whatever their signature asks for.
+        """
+        if lifetime is Lifetime.TTL and not ttl:
+            raise ValueError("TTL providers need a positive ttl")
+        self._providers[key] = Provider(factory, lifetime, ttl)
+
+    def resolve(self, key: Any) -> Any:
+        """Returns the cached instance for ``key``, building it if needed (not for REQUEST providers)."""
+        provider = self._providers[key]
+        if provider.lifetime is Lifetime.REQUEST:
+            raise LookupError(f"{key!r} is request-scoped; inject it with Depends(container.dependency(...))")
+        if provider.lifetime is Lifetime.TTL and time.monotonic() >= provider.expires_at:
+            provider.value = _MISSING
+        if provider.value is _MISSING:
+            provider.value = provider.factory(self)
+            if provider.ttl:
+                provider.expires_at = time.monotonic() + provider.ttl
+        return provider.value
+
+    def dependency(self, key: Any) -> Callable[..., Any]:
+        """Returns the callable to use in ``Depends(...)`` for ``key``."""
+        provider = self._providers[key]
+        if provider.lifetime is Lifetime.REQUEST:
+            return provider.factory
+
+        if provider.lifetime is Lifetime.SINGLETON:
+
+            async def provide_singleton() -> Any:
+                value = provider.value
+                return self.resolve(key) if value is _MISSING else value
+
+            return provide_singleton
+
+        async def provide_cached() -> Any:
+            return self.resolve(key)
+
+        return provide_cached
+
+    def startup(self) -> None:
+        """Builds every singleton up front, so the first requests don't pay for it."""
+        for key, provider in self._providers.items():
+            if provider.lifetime is Lifetime.SINGLETON:
+                self.resolve(key)
+
+    def shutdown(self) -> None:
+        """Drops cached instances; they are rebuilt on the next ``startup`` or use."""
+        for provider in self._providers.values():
+            provider.value = _MISSING
+            provider.expires_at = 0.0
+
+
+container = ProviderContainer()
@@ -0,0 +1,141 @@
+"""Timer wheel that fires reminder events when todos come due.
+
+Deadlines are hashed into buckets by tick number (``deadline / tick``, rounded up). A single asyncio task
+sleeps until the earliest non-empty bucket, then hands every key in it to the callback in one
+call. Scheduling and cancelling are O(1) dict/set operations (plus a heap push for a tick not
+yet in the heap), memory grows with the number of pending keys and distinct ticks, and there is never
+more than one task or timer handle, however many todos are pending.
+"""
+import asyncio
+import heapq
+import logging
+import math
+import time
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+def due_timestamp(due_date: date) -> float:
+    """A todo comes due at the start of its due date (server local time)."""
+    return datetime.combine(due_date, datetime.min.time()).timestamp()
+
+
+class TimerWheel:
+    def __init__(
+        self,
+        callback: Callable[[List[Hashable]], Any],
+        tick: float = 1.0,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.callback = callback
+        self.tick = tick
+        self.clock = clock
+        self._buckets: Dict[int, Set[Hashable]] = {}
+        self._ticks: Dict[Hashable, int] = {}  # key -> bucket it is in
+        self._heap: List[int] = []  # Bucket ticks; may hold ticks of buckets emptied by cancel()
+        self._queued: Set[int] = set()  # Ticks in the heap, each pushed once until it is popped
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.fired_total = 0
+
+    def __len__(self) -> int:
+        return len(self._ticks)
+
+    def schedule(self, key: Hashable, deadline: float) -> None:
+        """Fires ``key`` at ``deadline`` (epoch seconds), replacing an earlier schedule; past deadlines are dropped."""
+        tick = math.ceil(deadline / self.tick)  # Never fire before the deadline
+        if self._ticks.get(key) == tick:
+            return
+        self.cancel(key)
+        if tick <= int(self.clock() // self.tick):
+            return
+        self._bucket(tick).add(key)
+        self._ticks[key] = tick
+
+    def schedule_many(self, keys: Iterable[Hashable], deadline: float) -> None:
+        """Like ``schedule`` for keys sharing one deadline (e.g. todos due on the same day), none scheduled yet."""
+        tick = math.ceil(deadline / self.tick)
+        if tick <= int(self.clock() // self.tick):
+            return
+        keys = list(keys)
+        if not keys:
+            return
+        if not self._ticks.keys().isdisjoint(keys):
+            raise ValueError("schedule_many() got keys that are already scheduled")
+        self._bucket(tick).update(keys)
+        self._ticks.update(dict.fromkeys(keys, tick))
+
+    def _bucket(self, tick: int) -> Set[Hashable]:
+        bucket = self._buckets.get(tick)
+        if bucket is None:
+            bucket = self._buckets[tick] = set()
+            if tick not in self._queued:  # Still queued if cancel() emptied an earlier bucket
+                if not self._heap or tick < self._heap[0]:
+                    self._wakeup.set()  # Earlier than what the loop is sleeping towards
+                heapq.heappush(self._heap, tick)
+                self._queued.add(tick)
+        return bucket
+
+    def cancel(self, key: Hashable) -> None:
+        tick = self._ticks.pop(key, None)
+        if tick is not None:
+            bucket = self._buckets[tick]
+            bucket.discard(key)
+            if not bucket:
+                del self._buckets[tick]
+
+    def fire_due(self) -> int:
+        """Fires every bucket whose tick has passed; returns the number of keys fired."""
+        now_tick = int(self.clock() // self.tick)
+        fired = 0
+        while self._heap and self._heap[0] <= now_tick:
+            tick = heapq.heappop(self._heap)
+            self._queued.discard(tick)
+            bucket = self._buckets.pop(tick, None)
+            if not bucket:
+                continue
+            keys = list(bucket)
+            for key in keys:
+                del self._ticks[key]
+            fired += len(keys)
+            try:
+                self.callback(keys)
+            except Exception:
+                logger.exception("Reminder callback failed for %d todo(s)", len(keys))
+        self.fired_total += fired
+        return fired
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run(), name="todo-reminders")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            self.fire_due()
+            self._wakeup.clear()
+            timeout = None
+            if self._heap:
+                timeout = max(0.0, self._heap[0] * self.tick - self.clock())
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        next_tick = min(self._buckets) if self._buckets else None
+        return {
+            "pending": len(self._ticks),
+            "buckets": len(self._buckets),
+            "fired_total": self.fired_total,
+            "next_deadline": None if next_tick is None else datetime.fromtimestamp(next_tick * self.tick),
+        }
@@ -1,11 +1,176 @@
-from typing import Dict, List, Optional
+import gc
+import heapq
+import threading
+from bisect import bisect_left, bisect_right, insort
+from contextlib import contextmanager
+from datetime import date, timedelta
+from itertools import chain, compress, groupby, islice, repeat
+from operator import attrgetter, itemgetter
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 from uuid import UUID
 
-from models import Todo
+from models import Todo, compact_value
+from persistence import Change, TodoJournal, TodoSnapshot
+from reminders import TimerWheel, due_timestamp
+
+if TYPE_CHECKING:
+    # shared needs fcntl (POSIX only); main imports it only when TODO_SHARED_FILE is set
+    from shared import SharedTodoStore
 
 # Simulasi database in-memory
-# Kunci adalah UUID, nilai adalah objek Todo
-_in_memory_todos_db: Dict[UUID, Todo] = {}
+# Kunci adalah UUID dalam bentuk integer 128-bit (Todo.key), nilai adalah objek Todo
+_in_memory_todos_db: Dict[int, Todo] = {}
+# Held by every write; the journal also takes it to read a consistent view for snapshots
+_lock = threading.RLock()
+# Set by open_journal() when todos are persisted (TODO_DATA_DIR)
+_journal: Optional[TodoJournal] = None
+# Set by open_reminders(): fires when open todos come due
+_reminders: Optional[TimerWheel] = None
+# Set by open_shared() when worker processes share the todos (TODO_SHARED_FILE)
+_shared: "Optional[SharedTodoStore]" = None
+# Set by open_journal() when the store starts from a snapshot: its todos stay in the mapped file,
+# listed before those in _in_memory_todos_db, and are only decoded when read. A todo that is
+# changed or deleted moves to _in_memory_todos_db first, with its row as its sequence number.
+_snapshot: Optional[TodoSnapshot] = None
+# State of every snapshot row
+_snapshot_rows = bytearray()
+_IN_SNAPSHOT, _MOVED, _DELETED = 0, 1, 2
+
+# Todo fields an update may change but never set to None
+_REQUIRED_FIELDS = ("title", "completed", "priority")
+
+# (priority, completed, due_date): the Todo fields covered by TodoIndexes
+IndexedValues = Tuple[int, bool, Optional[date]]
+
+
+def _selector(value: int) -> bytes:
+    """Translation table mapping the byte ``value`` to 1 and every other byte to 0."""
+    table = bytearray(256)
+    table[value] = 1
+    return bytes(table)
+
+
+def _both(selected: bytes, other: bytes) -> bytes:
+    """Byte-wise AND of two selectors of the same length, computed on them as (very long) integers."""
+    return (int.from_bytes(selected, "little") & int.from_bytes(other, "little")).to_bytes(len(selected), "little")
+
+
+# Snapshot rows to list: those still in the snapshot and those moved out of it
+_LISTED = bytes(state != _DELETED for state in range(256))
+
+
+class TodoIndexes:
+    """Secondary indexes over the in-memory store, so filtered queries touch only matching todos.
+
+    - ``by_priority`` / ``by_completed``: value -> set of todo keys (``Todo.key``).
+    - ``due_dates``: sorted list of ``(due_date, sequence, key)`` for range lookups with bisect.
+    - ``open_due_dates``: the same entries (shared tuples) for todos that are not completed, so
+      due/overdue lookups are O(log n + k) without skipping completed todos.
+    - ``sequence``: insertion order of every todo, used to return results in the same
+      order as ``get_all``. Todos moved out of a snapshot keep their row as sequence number;
+      the others are numbered after the snapshot's rows.
+    """
+
+    def __init__(self) -> None:
+        self.by_priority: Dict[int, Set[int]] = {}
+        self.by_completed: Dict[bool, Set[int]] = {}
+        self.due_dates: List[Tuple[date, int, int]] = []
+        self.open_due_dates: List[Tuple[date, int, int]] = []
+        self.sequence: Dict[int, int] = {}
+        self._next_sequence = 0
+
+    def add(self, todo: Todo, sequence: Optional[int] = None) -> None:
+        key = todo.key
+        if sequence is not None:
+            self.sequence[key] = sequence
+        elif key not in self.sequence:
+            self.sequence[key] = self._next_sequence
+            self._next_sequence += 1
+        self.by_priority.setdefault(todo.priority, set()).add(key)
+        self.by_completed.setdefault(todo.completed, set()).add(key)
+        if todo.due_date is not None:
+            entry = (todo.due_date, self.sequence[key], key)
+            insort(self.due_dates, entry)
+            if not todo.completed:
+                insort(self.open_due_dates, entry)
+
+    def rebuild(self, todos: Iterable[Todo]) -> None:
+        """Replaces all entries; built column-wise so a restart with millions of todos stays fast."""
+        todos = list(todos)
+        keys = list(map(attrgetter("key"), todos))
+        priorities = list(map(attrgetter("priority"), todos))
+        completed = list(map(attrgetter("completed"), todos))
+        due_dates = list(map(attrgetter("due_date"), todos))
+        self.sequence = dict(zip(keys, range(len(keys))))
+        # Selectors for compress() are made with bytes.translate, which runs in C per value
+        priority_bytes, completed_bytes = bytes(priorities), bytes(completed)
+        self.by_priority = {
+            priority: set(compress(keys, priority_bytes.translate(_selector(priority)))) for priority in set(priorities)
+        }
+        self.by_completed = {
+            completed: set(compress(keys, completed_bytes.translate(_selector(completed)))) for completed in (True, False)
+        }
+        self.due_dates = sorted(compress(zip(due_dates, range(len(keys)), keys), due_dates))
+        # Sequence numbers are list positions here, so completed flags can be looked up by them
+        open_by_sequence = completed_bytes.translate(_selector(False))
+        self.open_due_dates = list(compress(
+            self.due_dates, map(open_by_sequence.__getitem__, map(itemgetter(1), self.due_dates))
+        ))
+        self._next_sequence = len(keys)
+
+    def clear(self, first_sequence: int) -> None:
+        """Removes every entry; todos added later are numbered from ``first_sequence``."""
+        self.rebuild([])
+        self._next_sequence = first_sequence
+
+    def remove(self, todo: Todo) -> None:
+        self._discard(todo.key, (todo.priority, todo.completed, todo.due_date))
+        del self.sequence[todo.key]
+
+    def reindex(self, todo: Todo, previous: IndexedValues) -> None:
+        """Moves an updated todo from the entries of its ``previous`` values; its position in the ordering is kept."""
+        if previous != (todo.priority, todo.completed, todo.due_date):
+            self._discard(todo.key, previous)
+            self.add(todo)
+
+    def _discard(self, key: int, values: IndexedValues) -> None:
+        priority, completed, due_date = values
+        self.by_priority[priority].discard(key)
+        self.by_completed[completed].discard(key)
+        if due_date is not None:
+            entry = (due_date, self.sequence[key], key)
+            del self.due_dates[bisect_left(self.due_dates, entry)]
+            if not completed:
+                del self.open_due_dates[bisect_left(self.open_due_dates, entry)]
+
+    @staticmethod
+    def _bounds(entries: List[Tuple[date, int, int]], due_after: Optional[date], due_before: Optional[date]) -> slice:
+        start = 0 if due_after is None else bisect_left(entries, (due_after,))
+        end = len(entries)
+        if due_before is not None:
+            # (due_before, +inf): every entry on due_before sorts before it
+            end = bisect_right(entries, (due_before, float("inf")))
+        return slice(start, max(start, end))
+
+    def due_between(self, due_after: Optional[date], due_before: Optional[date]) -> List[int]:
+        """Keys with ``due_after <= due_date <= due_before`` (either bound optional), by due date."""
+        return [key for _, _, key in self.due_dates[self._bounds(self.due_dates, due_after, due_before)]]
+
+    def open_due_between(
+        self, due_after: Optional[date], due_before: Optional[date], limit: Optional[int] = None, offset: int = 0
+    ) -> List[int]:
+        """Like ``due_between`` for open todos only; pagination is applied to the slice, not after it."""
+        bounds = self._bounds(self.open_due_dates, due_after, due_before)
+        start = bounds.start + offset
+        stop = bounds.stop if limit is None else min(bounds.stop, start + limit)
+        return [key for _, _, key in self.open_due_dates[start:stop]]
+
+    def open_due_entries(self, due_after: Optional[date], due_before: Optional[date]) -> List[Tuple[date, int, int]]:
+        """The ``open_due_dates`` entries ``open_due_between`` selects, to merge with other sorted entries."""
+        return self.open_due_dates[self._bounds(self.open_due_dates, due_after, due_before)]
+
+
+_indexes = TodoIndexes()
 
 # Inisialisasi beberapa data dummy
 initial_todos = [
@@ -29,7 +194,8 @@ initial_todos = [
     ),
 ]
 for todo in initial_todos:
-    _in_memory_todos_db[todo.id] = todo
+    _in_memory_todos_db[todo.key] = todo
+    _indexes.add(todo)
 
 
 class TodoRepository:
@@ -39,30 +205,398 @@ class TodoRepository:
 
     # SELECT *
     def get_all(self) -> List[Todo]:
-        return list(_in_memory_todos_db.values())
+        _refresh()
+        return _in_order(0, None)
+
+    # SELECT * WHERE ... LIMIT ... OFFSET ...
+    def find(
+        self,
+        priority: Optional[int] = None,
+        completed: Optional[bool] = None,
+        due_after: Optional[date] = None,
+        due_before: Optional[date] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> List[Todo]:
+        """Returns todos matching every given filter, in insertion order.
+
+        The smallest matching index is used as the candidate set and the remaining filters
+        are checked per candidate, so the cost depends on the number of matches rather
+        than on the size of the store. Todos still in a snapshot are matched on its columns
+        (``_snapshot_matches``) and merged in.
+        """
+        _refresh()
+        stop = None if limit is None else offset + limit
+        candidates: List[Set[int]] = []
+        if priority is not None:
+            candidates.append(_indexes.by_priority.get(priority, set()))
+        if completed is not None:
+            candidates.append(_indexes.by_completed.get(completed, set()))
+        if due_after is not None or due_before is not None:
+            candidates.append(set(_indexes.due_between(due_after, due_before)))
+        if not candidates:
+            return _in_order(offset, stop)
+
+        smallest = min(candidates, key=len)
+        others = [candidate for candidate in candidates if candidate is not smallest]
+        matches = [key for key in smallest if all(key in other for other in others)]
+        matches.sort(key=_indexes.sequence.__getitem__)
+        if _snapshot is None:
+            return [_in_memory_todos_db[key] for key in matches[offset:stop]]
+        # (sequence number, key), with no key for rows still in the snapshot
+        merged = heapq.merge(
+            zip(_snapshot_matches(priority, completed, due_after, due_before), repeat(None)),
+            zip(map(_indexes.sequence.__getitem__, matches), matches),
+        )
+        return [_from_row(row, key) for row, key in islice(merged, offset, stop)]
+
+    # SELECT * WHERE completed = false AND due_date BETWEEN ... ORDER BY due_date
+    def find_open_due(
+        self,
+        due_after: Optional[date] = None,
+        due_before: Optional[date] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> List[Todo]:
+        """Returns open todos with a due date in the inclusive range, earliest first; O(log n + k)."""
+        _refresh()
+        if _snapshot is None:
+            keys = _indexes.open_due_between(due_after, due_before, limit, offset)
+            return [_in_memory_todos_db[key] for key in keys]
+        rows = _snapshot.due_rows(due_after, due_before, open_only=True)
+        # (due date, sequence number, key) like the index entries, with no key for rows still in the snapshot
+        merged = heapq.merge(
+            ((_snapshot.due_date(row), row, None) for row in rows if _snapshot_rows[row] == _IN_SNAPSHOT),
+            _indexes.open_due_entries(due_after, due_before),
+        )
+        stop = None if limit is None else offset + limit
+        return [_from_row(row, key) for _, row, key in islice(merged, offset, stop)]
 
     # SELECT * FROM TABLE WHERE TODO_ID = blablabla
     def get_by_id(self, todo_id: UUID) -> Optional[Todo]:
-        return _in_memory_todos_db.get(todo_id)
+        _refresh()
+        todo = _in_memory_todos_db.get(todo_id.int)
+        if todo is None:
+            row = _snapshot_row(todo_id.int)
+            if row is not None:
+                todo = _snapshot.todo(row)
+        return todo
 
     # INSERT INTO
     def add(self, todo: Todo) -> Todo:
         # insert
-        _in_memory_todos_db[todo.id] = todo
+        with _writing(1):
+            _store(todo)
+            _record_put(todo)
         return todo
 
     def update(self, todo_id: UUID, updated_data: Dict) -> Optional[Todo]:
-        if todo_id not in _in_memory_todos_db:
-            return None
+        with _writing(1):
+            existing_todo = _get_for_update(todo_id.int)
+            if existing_todo is None:
+                return None
 
-        existing_todo = _in_memory_todos_db[todo_id]
-        for key, value in updated_data.items():
-            if hasattr(existing_todo, key):
-                setattr(existing_todo, key, value)
+            _apply_update(existing_todo, updated_data)
         return existing_todo
 
+    # UPDATE ... WHERE TODO_ID IN (...), in one transaction
+    def update_many(self, updates: List[Tuple[UUID, Dict]]) -> Tuple[List[Tuple[Todo, bool]], List[UUID]]:
+        """Applies all ``updates`` (todo ID, fields) in order, or none of them if any todo does not exist.
+
+        Returns each updated todo with whether the update changed it, or no todos and the IDs
+        that were not found. Readers and other writers never see a partially applied batch.
+        Raises ValueError, before changing anything, if an update sets a required field to None.
+        """
+        with _writing(len(updates)):
+            todos = [_get_for_update(todo_id.int) for todo_id, _ in updates]
+            missing = [todo_id for (todo_id, _), todo in zip(updates, todos) if todo is None]
+            if missing:
+                return [], missing
+            # Checked for every item before any is applied, so a bad item cannot leave half a batch behind
+            for todo_id, data in updates:
+                nulls = [field for field in _REQUIRED_FIELDS if field in data and data[field] is None]
+                if nulls:
+                    raise ValueError(f"Todo {todo_id}: {', '.join(nulls)} cannot be null")
+            return [(todo, _apply_update(todo, data)) for todo, (_, data) in zip(todos, updates)], []
+
     def delete(self, todo_id: UUID) -> bool:
-        if todo_id in _in_memory_todos_db:
-            del _in_memory_todos_db[todo_id]
-            return True
-        return False
+        with _writing(1):
+            if _unstore(todo_id.int) is None:
+                return False
+            _record_delete(todo_id.int)
+        return True
+
+
+def _apply_update(todo: Todo, updated_data: Dict) -> bool:
+    """Sets the given fields and updates the indexes, journal and reminder; returns whether anything changed."""
+    previous = (todo.priority, todo.completed, todo.due_date)
+    changed = False
+    for key, value in updated_data.items():
+        if hasattr(todo, key) and getattr(todo, key) != value:
+            setattr(todo, key, compact_value(value))
+            changed = True
+    if changed:
+        _indexes.reindex(todo, previous)
+        _record_put(todo)
+        _sync_reminder(todo)
+    return changed
+
+
+def _snapshot_row(key: int) -> Optional[int]:
+    """Row of the todo with ``key`` if it is still read from the snapshot."""
+    if _snapshot is None:
+        return None
+    row = _snapshot.find(key)
+    return row if row is not None and _snapshot_rows[row] == _IN_SNAPSHOT else None
+
+
+def _get_for_update(key: int) -> Optional[Todo]:
+    """Returns the todo with ``key`` from ``_in_memory_todos_db``, moving it there from the snapshot if needed."""
+    todo = _in_memory_todos_db.get(key)
+    if todo is None:
+        row = _snapshot_row(key)
+        if row is not None:
+            todo = _in_memory_todos_db[key] = _snapshot.todo(row)
+            _snapshot_rows[row] = _MOVED
+            _indexes.add(todo, sequence=row)
+    return todo
+
+
+def _from_row(sequence: int, key: Optional[int]) -> Todo:
+    """The todo of a merged result: a snapshot row (no key) or a todo in ``_in_memory_todos_db``."""
+    return _snapshot.todo(sequence) if key is None else _in_memory_todos_db[key]
+
+
+def _listed_rows() -> Iterator[int]:
+    """Snapshot rows that still hold a todo (in the snapshot or moved out of it), in order."""
+    return compress(range(_snapshot.count), _snapshot_rows.translate(_LISTED))
+
+
+def _in_order(offset: int, stop: Optional[int]) -> List[Todo]:
+    """Every todo in insertion order, sliced ``[offset:stop]``: the snapshot's rows, then the todos added since."""
+    if _snapshot is None:
+        return list(islice(_in_memory_todos_db.values(), offset, stop))
+    todos = [
+        _snapshot.todo(row) if _snapshot_rows[row] == _IN_SNAPSHOT else _in_memory_todos_db[_snapshot.key(row)]
+        for row in islice(_listed_rows(), offset, stop)
+    ]
+    listed = _snapshot.count - _snapshot_rows.count(_DELETED)
+    added = (todo for todo in _in_memory_todos_db.values() if _indexes.sequence[todo.key] >= _snapshot.count)
+    todos += islice(added, max(0, offset - listed), None if stop is None else max(0, stop - listed))
+    return todos
+
+
+def _snapshot_matches(
+    priority: Optional[int], completed: Optional[bool], due_after: Optional[date], due_before: Optional[date]
+) -> Iterable[int]:
+    """Rows still in the snapshot that match every given filter, in order; selectors are built per column in C."""
+    selected = _snapshot_rows.translate(_selector(_IN_SNAPSHOT))
+    if priority is not None:
+        selected = _both(selected, _snapshot.priorities.tobytes().translate(_selector(priority)))
+    if completed is not None:
+        selected = _both(selected, _snapshot.completed.tobytes().translate(_selector(completed)))
+    if due_after is None and due_before is None:
+        return compress(range(_snapshot.count), selected)
+    return [row for row in sorted(_snapshot.due_rows(due_after, due_before)) if selected[row]]
+
+
+def _capture() -> Iterable[Todo]:
+    """Every todo in insertion order as of this call, made with ``_lock`` held; may be iterated after releasing it."""
+    if _snapshot is None:
+        return list(_in_memory_todos_db.values())
+    snapshot, rows, todos = _snapshot, bytes(_snapshot_rows), dict(_in_memory_todos_db)
+    added = [todo for todo in todos.values() if _indexes.sequence[todo.key] >= snapshot.count]
+    listed = (
+        snapshot.todo(row) if rows[row] == _IN_SNAPSHOT else todos[snapshot.key(row)]
+        for row in compress(range(snapshot.count), rows.translate(_LISTED))
+    )
+    return chain(listed, added)
+
+
+def _set_snapshot(snapshot: Optional[TodoSnapshot]) -> None:
+    """Empties the store, then starts it from ``snapshot`` (if given)."""
+    global _snapshot, _snapshot_rows
+    _snapshot = snapshot
+    _snapshot_rows = bytearray(0 if snapshot is None else snapshot.count)
+    _in_memory_todos_db.clear()
+    _indexes.clear(len(_snapshot_rows))
+
+
+def _apply(changes: List[Change]) -> None:
+    for key, todo in changes:
+        if todo is None:
+            _unstore(key)
+        else:
+            _store(todo)
+
+
+def _store(todo: Todo) -> None:
+    """Adds or replaces ``todo`` in the local store, its indexes and reminder."""
+    previous = _get_for_update(todo.key)
+    _in_memory_todos_db[todo.key] = todo
+    if previous is None:
+        _indexes.add(todo)
+    else:
+        # Replacing keeps the todo's position, as the dict does
+        _indexes.reindex(todo, (previous.priority, previous.completed, previous.due_date))
+    _sync_reminder(todo)
+
+
+def _unstore(key: int) -> Optional[Todo]:
+    """Removes the todo with ``key`` from the local store, its indexes and reminder; returns it if it existed."""
+    todo = _get_for_update(key)
+    if todo is not None:
+        del _in_memory_todos_db[key]
+        sequence = _indexes.sequence[key]
+        if sequence < len(_snapshot_rows):
+            _snapshot_rows[sequence] = _DELETED
+        _indexes.remove(todo)
+        if _reminders is not None:
+            _reminders.cancel(key)
+    return todo
+
+
+def _record_put(todo: Todo) -> None:
+    if _journal is not None:
+        _journal.put(todo)
+    if _shared is not None:
+        _shared.put(todo)
+
+
+def _record_delete(key: int) -> None:
+    if _journal is not None:
+        _journal.delete(key)
+    if _shared is not None:
+        _shared.delete(key)
+
+
+@contextmanager
+def _writing(records: int) -> Iterator[None]:
+    """Held by every write of up to ``records`` todos: the store lock and, with a shared store, its file lock.
+
+    With a shared store, the write starts caught up with the other workers and with room for its records.
+    """
+    with _lock:
+        if _shared is None:
+            yield
+            return
+        with _shared.writing(records):
+            _catch_up()
+            _shared.reserve()
+            yield
+
+
+def _refresh() -> None:
+    """Applies changes other workers made to the shared store before a read; one memory read if there are none."""
+    if _shared is not None and _shared.changed():
+        with _lock, _shared.reading():
+            _catch_up()
+
+
+def _catch_up() -> None:
+    """Replays the shared store's new changes into the local store; the caller holds both locks."""
+    reload, changes = _shared.read_changes()
+    if not reload:
+        _apply(changes)
+        return
+    todos: Dict[int, Todo] = {}
+    for key, todo in changes:
+        if todo is None:
+            todos.pop(key, None)
+        else:
+            todos[key] = todo
+    _set_snapshot(None)
+    _in_memory_todos_db.update(todos)
+    _indexes.rebuild(todos.values())
+    if _reminders is not None:
+        for todo in todos.values():
+            _sync_reminder(todo)
+
+
+def open_journal(journal: TodoJournal) -> None:
+    """Loads the store from ``journal`` and records every later change in it.
+
+    The snapshot's todos are read from it in place; only the changes logged after it are applied
+    one by one. An empty data directory is seeded with the current contents (the initial todos).
+    """
+    global _journal
+    with _lock:
+        # A long log means many new objects, which would otherwise trigger repeated GC passes
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            loaded = journal.load()
+            if loaded is not None:
+                snapshot, changes = loaded
+                _set_snapshot(snapshot)
+                _apply(changes)
+            else:
+                for todo in _in_memory_todos_db.values():
+                    journal.put(todo)
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+        journal.start(_lock, _capture)
+        _journal = journal
+
+
+def _sync_reminder(todo: Todo) -> None:
+    if _reminders is None:
+        return
+    if todo.completed or todo.due_date is None:
+        _reminders.cancel(todo.key)
+    else:
+        _reminders.schedule(todo.key, due_timestamp(todo.due_date))
+
+
+def open_reminders(wheel: TimerWheel) -> None:
+    """Schedules every open todo due after today on ``wheel`` and keeps it in sync with later changes."""
+    global _reminders
+    with _lock:
+        tomorrow = date.today() + timedelta(days=1)
+        if _snapshot is not None:
+            # A bucket at a time: the snapshot's open todos are sorted by due date
+            rows = _snapshot.due_rows(tomorrow, None, open_only=True)
+            rows = [row for row in rows if _snapshot_rows[row] == _IN_SNAPSHOT]
+            for ordinal, group in groupby(rows, _snapshot.dues.__getitem__):
+                wheel.schedule_many(map(_snapshot.key, group), due_timestamp(date.fromordinal(ordinal)))
+        for key in _indexes.open_due_between(tomorrow, None):
+            wheel.schedule(key, due_timestamp(_in_memory_todos_db[key].due_date))
+        _reminders = wheel
+    wheel.start()
+
+
+async def close_reminders() -> None:
+    global _reminders
+    if _reminders is not None:
+        wheel, _reminders = _reminders, None
+        await wheel.stop()
+
+
+def open_shared(store: "SharedTodoStore") -> None:
+    """Shares the store with the other worker processes attached to ``store``.
+
+    The first process seeds a new file with its current contents (the initial todos); every
+    other process replaces its contents with the shared todos.
+    """
+    global _shared
+    with _lock:
+        store.attach(_capture)
+        _shared = store
+        with store.reading():
+            _catch_up()
+
+
+def close_shared() -> None:
+    global _shared
+    if _shared is not None:
+        store, _shared = _shared, None
+        store.close()
+
+
+def close_journal() -> None:
+    """Flushes the journal and writes a final snapshot."""
+    global _journal
+    if _journal is not None:
+        journal, _journal = _journal, None
+        journal.close()
@@ -1,9 +1,16 @@
-from typing import Annotated, List
+import asyncio
+from datetime import date
+from typing import Annotated, Any, AsyncIterator, Callable, List, Optional, TypeVar
 from uuid import UUID  # Import UUID for type hinting
 
-from fastapi import APIRouter, Depends, Path, status  # Import APIRouter, Depends
+from changes import ChangeBroadcaster, Subscription  # Live change feed
+from config import TODO_CHANGES_HEARTBEAT_SECONDS, TODO_CHANGES_HISTORY, TODO_CHANGES_QUEUE_SIZE, TODO_SHARED_FILE
+from fastapi import APIRouter, Body, Depends, Header, HTTPException, Path, Query, WebSocket, status  # Import APIRouter, Depends
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from providers import container  # App-scoped provider container
 from repositories import TodoRepository  # Only for Dependency Injection
-from schemas import TodoCreate, TodoResponse, TodoUpdate  # Import Pydantic schemas
+from schemas import TodoBatchResult, TodoBatchUpdate, TodoCreate, TodoResponse, TodoUpdate  # Import Pydantic schemas
 from services import TodoService  # Import TodoService
 
 router = APIRouter(
@@ -12,10 +19,32 @@ router = APIRouter(
 )
 
 
-def get_todo_service() -> TodoService:
-    repo = TodoRepository()
-    service = TodoService(repo)
-    return service
+# The repository and service hold no per-request state, so one instance of each is built at
+# startup (container.startup() in the app lifespan) and shared by all requests.
+container.register(TodoRepository, lambda c: TodoRepository())
+# No change feed when workers share the store: each worker only sees the writes it handles itself
+# (others are replayed lazily and unpublished) and sequence numbers would differ between workers.
+container.register(
+    ChangeBroadcaster,
+    lambda c: None if TODO_SHARED_FILE else ChangeBroadcaster(TODO_CHANGES_HISTORY, TODO_CHANGES_QUEUE_SIZE),
+)
+container.register(TodoService, lambda c: TodoService(c.resolve(TodoRepository), c.resolve(ChangeBroadcaster)))
+get_todo_service = container.dependency(TodoService)
+get_change_broadcaster = container.dependency(ChangeBroadcaster)
+
+T = TypeVar("T")
+
+
+async def _call(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Calls a service method, in the threadpool when workers share the store.
+
+    There a call can wait for another worker's file lock (and a write can compact the log), which
+    must not hold up the event loop. A single worker's store only takes its in-process lock for
+    short, bounded work, so the call runs inline and saves the thread hop.
+    """
+    if TODO_SHARED_FILE:
+        return await run_in_threadpool(func, *args, **kwargs)
+    return func(*args, **kwargs)
 
 
 # CREATE (POST)
@@ -28,18 +57,134 @@ async def create_todo_endpoint(
     - Accepts `TodoCreate` schema as request body.
     - Returns `201 Created` and the created `TodoResponse`.
     """
-    todo = service.create_todo(todo_create)
-    return TodoResponse.model_validate(todo.to_dict())  # Convert core model to response schema
+    todo = await _call(service.create_todo, todo_create)
+    return TodoResponse.model_validate(todo)  # Read the response schema from the core model's attributes
 
 
 # READ All (GET)
 @router.get("/", response_model=List[TodoResponse], status_code=status.HTTP_200_OK)
-async def get_all_todos_endpoint(service: Annotated[TodoService, Depends(get_todo_service)]):
-    """**Get All Todos:** Retrieves a list of all available todo items.
+async def get_all_todos_endpoint(
+    service: Annotated[TodoService, Depends(get_todo_service)],
+    priority: Annotated[Optional[int], Query(ge=1, le=3, description="Only todos with this priority.")] = None,
+    completed: Annotated[Optional[bool], Query(description="Only completed or only open todos.")] = None,
+    due_after: Annotated[Optional[date], Query(description="Only todos due on or after this date.")] = None,
+    due_before: Annotated[Optional[date], Query(description="Only todos due on or before this date.")] = None,
+    limit: Annotated[Optional[int], Query(ge=1, le=1000, description="Maximum number of todos to return.")] = None,
+    offset: Annotated[int, Query(ge=0, description="Number of matching todos to skip.")] = 0,
+):
+    """**Get All Todos:** Retrieves a list of todo items, optionally filtered and paginated.
+    - Filters are combined with AND; todos without a due date never match `due_after`/`due_before`.
+    - Results keep insertion order; without `limit` all matching todos are returned.
+    - Returns a list of `TodoResponse` objects.
+    """
+    todos = await _call(
+        service.find_todos,
+        priority=priority,
+        completed=completed,
+        due_after=due_after,
+        due_before=due_before,
+        limit=limit,
+        offset=offset,
+    )
+    return [TodoResponse.model_validate(todo) for todo in todos]  # Read response schemas from the core models
+
+
+# READ due soon (GET)
+@router.get("/due", response_model=List[TodoResponse], status_code=status.HTTP_200_OK)
+async def get_due_todos_endpoint(
+    service: Annotated[TodoService, Depends(get_todo_service)],
+    within: Annotated[int, Query(ge=0, le=366, description="Days ahead to include; 0 = due today only.")] = 0,
+    limit: Annotated[Optional[int], Query(ge=1, le=1000, description="Maximum number of todos to return.")] = None,
+    offset: Annotated[int, Query(ge=0, description="Number of matching todos to skip.")] = 0,
+):
+    """**Get Due Todos:** Open todos due between today and `within` days from now, earliest first.
+    - Returns a list of `TodoResponse` objects.
+    """
+    todos = await _call(service.get_due_todos, within, limit, offset)
+    return [TodoResponse.model_validate(todo) for todo in todos]
+
+
+# READ overdue (GET)
+@router.get("/overdue", response_model=List[TodoResponse], status_code=status.HTTP_200_OK)
+async def get_overdue_todos_endpoint(
+    service: Annotated[TodoService, Depends(get_todo_service)],
+    limit: Annotated[Optional[int], Query(ge=1, le=1000, description="Maximum number of todos to return.")] = None,
+    offset: Annotated[int, Query(ge=0, description="Number of matching todos to skip.")] = 0,
+):
+    """**Get Overdue Todos:** Open todos whose due date is before today, earliest first.
     - Returns a list of `TodoResponse` objects.
     """
-    todos = service.get_all_todos()
-    return [TodoResponse.model_validate(todo.to_dict()) for todo in todos]  # Convert core models to response schemas
+    todos = await _call(service.get_overdue_todos, limit, offset)
+    return [TodoResponse.model_validate(todo) for todo in todos]
+
+
+# CHANGE FEED (SSE)
+_NO_FEED = "The change feed is not available when workers share the store (TODO_SHARED_FILE)."
+
+
+async def _sse_stream(changes: ChangeBroadcaster, since: Optional[int]) -> AsyncIterator[bytes]:
+    # Subscribed inside the generator so the finally below always runs for it
+    subscription = changes.subscribe(since)
+    try:
+        yield b"retry: 2000\n\n"
+        while True:
+            batch = await subscription.next_batch(TODO_CHANGES_HEARTBEAT_SECONDS)
+            # All pending events in one write; an SSE comment keeps idle connections alive
+            yield b"".join(event.sse for event in batch) if batch else b": keep-alive\n\n"
+    finally:
+        subscription.close()
+
+
+@router.get("/changes", response_class=StreamingResponse)
+async def stream_changes_endpoint(
+    changes: Annotated[Optional[ChangeBroadcaster], Depends(get_change_broadcaster)],
+    since: Annotated[Optional[int], Query(ge=0, description="Resume after this sequence number.")] = None,
+    last_event_id: Annotated[Optional[str], Header(description="Set by EventSource when reconnecting.")] = None,
+):
+    """**Change Feed (SSE):** Streams `created`, `updated`, `deleted` and `due` events as Server-Sent Events.
+    - Each event carries its sequence number as the SSE `id` and the todo's full state in `data`.
+    - Resumes after `since` (or the `Last-Event-ID` header); a `reset` event means the events were
+      no longer available or the client fell behind: re-fetch `GET /todos` and continue.
+    - Returns `501 Not Implemented` when workers share the store (`TODO_SHARED_FILE`).
+    """
+    if changes is None:
+        raise HTTPException(status_code=status.HTTP_501_NOT_IMPLEMENTED, detail=_NO_FEED)
+    if since is None and last_event_id is not None and last_event_id.isdigit():
+        since = int(last_event_id)
+    return StreamingResponse(
+        _sse_stream(changes, since),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# CHANGE FEED (WebSocket)
+async def _send_changes(websocket: WebSocket, subscription: Subscription) -> None:
+    while True:
+        for event in await subscription.next_batch():
+            await websocket.send_text(event.json)
+
+
+@router.websocket("/changes")
+async def changes_websocket_endpoint(
+    websocket: WebSocket,
+    changes: Annotated[Optional[ChangeBroadcaster], Depends(get_change_broadcaster)],
+    since: Annotated[Optional[int], Query(ge=0)] = None,
+):
+    """**Change Feed (WebSocket):** The same events as the SSE feed, one JSON text message per event."""
+    if changes is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason=_NO_FEED)
+        return
+    await websocket.accept()
+    subscription = changes.subscribe(since)
+    sender = asyncio.create_task(_send_changes(websocket, subscription))
+    try:
+        # Clients don't send anything; receiving is how a closed connection is noticed
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+    finally:
+        sender.cancel()
+        subscription.close()
 
 
 # UPDATE (PUT)
@@ -53,8 +198,24 @@ async def update_todo_endpoint(
     - Returns `200 OK` and the updated `TodoResponse`.
     - Returns `404 Not Found` if the todo does not exist.
     """
-    todo = service.update_todo(todo_id, todo_update)
-    return TodoResponse.model_validate(todo.to_dict())
+    todo = await _call(service.update_todo, todo_id, todo_update)
+    return TodoResponse.model_validate(todo)
+
+
+# BATCH UPDATE (PATCH)
+@router.patch("/", response_model=List[TodoBatchResult], status_code=status.HTTP_200_OK)
+async def update_todos_endpoint(
+    todo_updates: Annotated[List[TodoBatchUpdate], Body(min_length=1, max_length=1000)],
+    service: Annotated[TodoService, Depends(get_todo_service)],
+):
+    """**Batch Update Todos:** Updates many todo items in one request, atomically.
+    - Accepts a list of `TodoUpdate` fields plus the todo's `id`; items are applied in order.
+    - Returns `200 OK` and one `{id, status}` per item: `updated` or `unchanged`.
+    - Returns `404 Not Found` with the missing IDs (`not_found`) if any todo does not exist;
+      nothing is updated then.
+    """
+    results = await _call(service.update_todos, todo_updates)
+    return [TodoBatchResult(id=todo.id, status="updated" if changed else "unchanged") for todo, changed in results]
 
 
 # DELETE (DELETE)
@@ -67,5 +228,5 @@ async def delete_todo_endpoint(
     - Returns `204 No Content` on successful deletion.
     - Returns `404 Not Found` if the todo does not exist.
     """
-    service.delete_todo(todo_id)
+    await _call(service.delete_todo, todo_id)
     return  # 204 No Content returns no body
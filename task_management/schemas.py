@@ -1,7 +1,7 @@
 from datetime import date
 from typing import Literal, Optional
 
-from pydantic import UUID4, BaseModel, Field  # UUID4 for Pydantic type hint for UUID
+from pydantic import UUID4, BaseModel, Field, field_validator  # UUID4 for Pydantic type hint for UUID
 
 
 # Schema for creating a new Todo item (Request Body for POST)
@@ -49,3 +49,26 @@ class TodoResponse(BaseModel):
     # Pydantic v1: Use 'orm_mode = True'
     class Config:
         from_attributes = True
+
+
+# One item of a batch update (Request Body for PATCH /todos): the todo's ID plus the fields to change
+class TodoBatchUpdate(TodoUpdate):
+    id: UUID4 = Field(..., description="ID of the todo item to update")
+
+    # Only runs for fields that are given: an explicit null would otherwise be written into the todo
+    @field_validator("title", "completed", "priority")
+    @classmethod
+    def reject_null(cls, value):
+        if value is None:
+            raise ValueError("may be omitted but not null")
+        return value
+
+    # Example for documentation
+    class Config:
+        json_schema_extra = {"example": {"id": "3fa85f64-5717-4562-b3fc-2c963f66afa6", "completed": True}}
+
+
+# Per-item result of a batch update
+class TodoBatchResult(BaseModel):
+    id: UUID4
+    status: Literal["updated", "unchanged", "not_found"]
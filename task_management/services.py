@@ -1,10 +1,15 @@
-from typing import List
+import logging
+from datetime import date, timedelta
+from typing import List, Optional, Tuple
 from uuid import UUID
 
+from changes import CREATED, DELETED, DUE, UPDATED, ChangeBroadcaster  # Live change feed
 from fastapi import HTTPException, status  # Untuk raise HTTPExceptions
 from models import Todo  # Import core Todo model
 from repositories import TodoRepository  # Import TodoRepository
-from schemas import TodoCreate, TodoUpdate  # Import Pydantic schemas
+from schemas import TodoBatchUpdate, TodoCreate, TodoUpdate  # Import Pydantic schemas
+
+logger = logging.getLogger(__name__)
 
 
 class TodoService:
@@ -12,13 +17,57 @@ class TodoService:
     It orchestrates operations by interacting with the TodoRepository.
     """
 
-    def __init__(self, repository: TodoRepository):
+    def __init__(self, repository: TodoRepository, changes: Optional[ChangeBroadcaster] = None):
         self.repository = repository
+        self.changes = changes  # None means no change feed
 
     def get_all_todos(self) -> List[Todo]:
         """Retrieves all Todo items."""
         return self.repository.get_all()
 
+    def find_todos(
+        self,
+        priority: Optional[int] = None,
+        completed: Optional[bool] = None,
+        due_after: Optional[date] = None,
+        due_before: Optional[date] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> List[Todo]:
+        """Retrieves Todo items matching all given filters, with optional pagination.
+        Raises HTTPException if the due date range is empty.
+        """
+        if due_after is not None and due_before is not None and due_after > due_before:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="due_after must not be later than due_before."
+            )
+        return self.repository.find(
+            priority=priority,
+            completed=completed,
+            due_after=due_after,
+            due_before=due_before,
+            limit=limit,
+            offset=offset,
+        )
+
+    def get_due_todos(self, within_days: int, limit: Optional[int] = None, offset: int = 0) -> List[Todo]:
+        """Retrieves open Todo items due today or within the next ``within_days`` days, earliest first."""
+        today = date.today()
+        return self.repository.find_open_due(today, today + timedelta(days=within_days), limit, offset)
+
+    def get_overdue_todos(self, limit: Optional[int] = None, offset: int = 0) -> List[Todo]:
+        """Retrieves open Todo items whose due date has passed, earliest first."""
+        return self.repository.find_open_due(None, date.today() - timedelta(days=1), limit, offset)
+
+    def todos_came_due(self, keys: List[int]) -> None:
+        """Reminder callback of the timer wheel: ``keys`` are the IDs (as integers) of todos that just came due."""
+        for key in keys:
+            todo = self.repository.get_by_id(UUID(int=key))
+            if todo is not None:
+                logger.info("Todo %s is due: %s", todo.id, todo.title)
+                if self.changes is not None:
+                    self.changes.publish(DUE, todo.id, todo)
+
     def get_todo_by_id(self, todo_id: UUID) -> Todo:
         """Retrieves a single Todo item by its ID.
         Raises HTTPException if the todo is not found.
@@ -37,7 +86,10 @@ class TodoService:
             priority=todo_create.priority,
             due_date=todo_create.due_date,
         )
-        return self.repository.add(new_todo)
+        todo = self.repository.add(new_todo)
+        if self.changes is not None:
+            self.changes.publish(CREATED, todo.id, todo)
+        return todo
 
     def update_todo(self, todo_id: UUID, todo_update: TodoUpdate) -> Todo:
         """Updates an existing Todo item.
@@ -56,11 +108,33 @@ class TodoService:
         updated_todo = self.repository.update(todo_id, updated_data)
         if not updated_todo:  # Should not happen if get_by_id already passed
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to update todo.")
+        if self.changes is not None:
+            self.changes.publish(UPDATED, todo_id, updated_todo)
         return updated_todo
 
+    def update_todos(self, todo_updates: List[TodoBatchUpdate]) -> List[Tuple[Todo, bool]]:
+        """Applies a batch of updates atomically: all of them, or none if any todo is not found.
+        Returns each updated todo with whether the update changed it.
+        Raises HTTPException listing the missing IDs if any todo is not found.
+        """
+        updates = [(item.id, item.model_dump(exclude_unset=True, exclude={"id"})) for item in todo_updates]
+        results, missing = self.repository.update_many(updates)
+        if missing:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=[{"id": str(todo_id), "status": "not_found"} for todo_id in missing],
+            )
+        if self.changes is not None:
+            for todo, changed in results:
+                if changed:
+                    self.changes.publish(UPDATED, todo.id, todo)
+        return results
+
     def delete_todo(self, todo_id: UUID) -> None:
         """Deletes a Todo item.
         Raises HTTPException if the todo is not found.
         """
         if not self.repository.delete(todo_id):
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Todo with ID {todo_id} not found.")
+        if self.changes is not None:
+            self.changes.publish(DELETED, todo_id)
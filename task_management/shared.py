@@ -0,0 +1,193 @@
+"""Todo store shared by several worker processes (``uvicorn --workers N``) through a memory-mapped file.
+
+Each process keeps its own dict and indexes, exactly as with a single worker; the mapped file
+holds a log of changes that every process appends to and replays:
+
+- header: magic, version (bumped by every write), epoch (bumped when the log is compacted),
+  end of the log
+- two log regions, each half of the rest of the file; the log of epoch ``e`` is in region ``e % 2``
+- records: ``<length><body>``, with the journal's encoding of a todo (put) or its key (delete)
+
+A write takes an exclusive ``flock`` on the file, replays what other processes appended, applies
+its change locally and appends it, then bumps the version. A read compares the version in the
+mapping with the last one the process replayed (one 8-byte read: no lock, no system call) and
+only if it changed takes a shared lock and replays the new records. While nothing changes, reads
+therefore cost what they cost in the single-process store, and every worker serves them on its
+own core.
+
+Records are written first and the header last, so a worker killed in the middle of a write leaves
+the previous log intact. Every write first reserves room for its records (the most a todo can take,
+per record); when the region is too full, the writer compacts the log into the other region, one
+record per current todo, and the header switch to it bumps the epoch. A process that sees a new
+epoch reloads the whole store. If even the compacted log leaves no room, the write fails before
+anything is changed. The file outlives
+the workers, so a restart picks the todos up again (on /dev/shm until reboot, on a disk as long as
+the page cache is written back; there is no fsync, use TODO_DATA_DIR for durability).
+"""
+import fcntl
+import mmap
+import os
+import struct
+from contextlib import contextmanager
+from datetime import date
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple
+
+from models import Todo
+from persistence import Change, decode_todo, encode_todo
+
+# magic, version, epoch, end of log
+_HEADER = struct.Struct("<8sQQQ")
+_MAGIC = b"TODOSHM2"
+_VERSION_OFFSET = 8
+_LENGTH = struct.Struct("<I")
+_PUT = b"P"
+_DELETE = b"D"
+# Largest record: a todo with title and description at their length limits (schemas.py), in 4-byte UTF-8 characters
+MAX_RECORD_SIZE = _LENGTH.size + len(_PUT + encode_todo(Todo(title="\U0001f4dd" * 100, description="\U0001f4dd" * 500)))
+
+
+class SharedTodoStore:
+    def __init__(self, path: str, size: int):
+        self.path = path
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            if os.fstat(self._fd).st_size < size:
+                os.ftruncate(self._fd, size)  # Sparse: pages are only allocated as the log grows
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        self.size = os.fstat(self._fd).st_size
+        self.region_size = (self.size - _HEADER.size) // 2
+        self._map = mmap.mmap(self._fd, self.size)
+        # The header's version, read on every request without going through struct
+        self._version = memoryview(self._map)[_VERSION_OFFSET:_VERSION_OFFSET + 8].cast("Q")
+        # How far this process has replayed the log
+        self.version = 0
+        self.epoch = 0
+        self.offset = self._region(0)
+        self._capture: Callable[[], Iterable[Todo]] = list
+        self._dirty = False
+        self._reserved = 0
+        self._dates: Dict[int, date] = {}
+        self.compactions = 0
+
+    def attach(self, capture: Callable[[], Iterable[Todo]]) -> None:
+        """``capture`` returns every todo of this process's store (caught up with the log), for compaction.
+
+        A new (empty) file is seeded with the todos ``capture`` returns now.
+        """
+        self._capture = capture
+        with self.writing(0):
+            if self._map[:len(_MAGIC)] != _MAGIC:
+                self._compact()
+
+    def _region(self, epoch: int) -> int:
+        """Offset of the log region used by ``epoch``."""
+        return _HEADER.size + (epoch % 2) * self.region_size
+
+    def changed(self) -> bool:
+        """Whether other processes wrote since this one last replayed the log; safe without a lock."""
+        return self._version[0] != self.version
+
+    @contextmanager
+    def reading(self) -> Iterator[None]:
+        fcntl.flock(self._fd, fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    @contextmanager
+    def writing(self, records: int) -> Iterator[None]:
+        """Holds the file lock for a write of up to ``records`` records, which are published when it is released.
+
+        Call ``read_changes`` first thing inside, then ``reserve``, before changing anything.
+        """
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        self._reserved = records * MAX_RECORD_SIZE
+        try:
+            yield
+        finally:
+            try:
+                if self._dirty:
+                    self._dirty = False
+                    self.version = self._version[0] + 1
+                    _HEADER.pack_into(self._map, 0, _MAGIC, self.version, self.epoch, self.offset)
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def read_changes(self) -> Tuple[bool, List[Change]]:
+        """Returns the changes appended since the last call, oldest first; call under ``reading`` or ``writing``.
+
+        If the first value is true the log was compacted since (or is read for the first time) and
+        the changes make up the whole store, to replace the local one with.
+        """
+        magic, version, epoch, end = _HEADER.unpack_from(self._map)
+        reload = epoch != self.epoch
+        offset = self._region(epoch) if reload else self.offset
+        buffer = self._map
+        changes: List[Change] = []
+        while offset < end:
+            (length,) = _LENGTH.unpack_from(buffer, offset)
+            offset += _LENGTH.size
+            if buffer[offset:offset + 1] == _PUT:
+                todo, _ = decode_todo(buffer, offset + 1, self._dates)
+                changes.append((todo.key, todo))
+            else:
+                changes.append((int.from_bytes(buffer[offset + 1:offset + 17], "big"), None))
+            offset += length
+        self.version, self.epoch, self.offset = version, epoch, end
+        return reload, changes
+
+    def reserve(self) -> None:
+        """Makes room for the records announced to ``writing``, compacting the log if needed.
+
+        Raises RuntimeError if the store is full; nothing has been changed then.
+        """
+        if self.offset + self._reserved > self._region(self.epoch) + self.region_size:
+            self._compact()
+
+    def put(self, todo: Todo) -> None:
+        self._append(_PUT + encode_todo(todo))
+
+    def delete(self, key: int) -> None:
+        self._append(_DELETE + key.to_bytes(16, "big"))
+
+    def _append(self, body: bytes) -> None:
+        end = self.offset + _LENGTH.size + len(body)
+        if end > self._region(self.epoch) + self.region_size:
+            raise RuntimeError(f"Shared todo store {self.path}: write larger than reserved")
+        _LENGTH.pack_into(self._map, self.offset, len(body))
+        self._map[self.offset + _LENGTH.size:end] = body
+        self.offset = end
+        self._dirty = True
+
+    def _compact(self) -> None:
+        """Writes one put per current todo into the other region; call under ``writing``, caught up.
+
+        The current log stays valid until the header is switched when ``writing`` ends.
+        """
+        start = offset = self._region(self.epoch + 1)
+        # Half the region at most, or nearly every write would have to compact again
+        limit = start + min(self.region_size // 2, self.region_size - self._reserved)
+        # Encoded straight into the other region, giving up as soon as the todos don't fit
+        for todo in self._capture():
+            body = _PUT + encode_todo(todo)
+            end = offset + _LENGTH.size + len(body)
+            if end > limit:
+                raise RuntimeError(
+                    f"Shared todo store {self.path} is full: the todos take more than {limit - start} bytes"
+                    f" of a {self.region_size} byte log region; raise TODO_SHARED_MB"
+                )
+            _LENGTH.pack_into(self._map, offset, len(body))
+            self._map[offset + _LENGTH.size:end] = body
+            offset = end
+        self.offset = offset
+        self.epoch += 1
+        self._dirty = True
+        self.compactions += 1
+
+    def close(self) -> None:
+        self._version.release()
+        self._map.close()
+        os.close(self._fd)
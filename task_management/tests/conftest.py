@@ -0,0 +1,31 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+# The app's modules are imported flat, as when uvicorn runs from task_management/
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import repositories  # noqa: E402
+from models import Todo  # noqa: E402
+
+# The initial todos as they are on import, before any test changes them
+_INITIAL = [todo.to_dict() for todo in repositories._in_memory_todos_db.values()]
+
+
+def reset_store() -> None:
+    """Empties the module-level store and puts fresh copies of the initial todos back."""
+    todos = [Todo.from_dict(data) for data in _INITIAL]
+    repositories._set_snapshot(None)
+    repositories._in_memory_todos_db.update((todo.key, todo) for todo in todos)
+    repositories._indexes.rebuild(todos)
+
+
+@pytest.fixture
+def repository():
+    """A TodoRepository over the initial todos; journal and shared store are detached afterwards."""
+    reset_store()
+    yield repositories.TodoRepository()
+    repositories.close_journal()
+    repositories.close_shared()
+    reset_store()
@@ -0,0 +1,157 @@
+import zlib
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pytest
+
+import repositories
+from models import Todo
+from persistence import _RECORD, TodoJournal
+from repositories import TodoRepository
+
+DAY = date(2026, 1, 1)
+
+
+def start(directory: Path) -> None:
+    """Loads the store from ``directory`` as a starting worker does; the test flushes the journal itself."""
+    repositories.open_journal(TodoJournal(str(directory), sync_interval=3600))
+
+
+def crash() -> None:
+    """Stops the journal as if the process died right after its last flush: no final snapshot."""
+    journal = repositories._journal
+    journal.flush()
+    journal._closing.set()
+    journal._thread.join()
+    journal._log_file.close()
+    repositories._journal = None
+
+
+def restart(directory: Path, crash_first: bool = False) -> None:
+    if crash_first:
+        crash()
+    else:
+        repositories.close_journal()
+    start(directory)
+
+
+def as_dicts(todos: List[Todo]) -> List[Dict]:
+    return [todo.to_dict() for todo in todos]
+
+
+def last_log(directory: Path) -> Path:
+    return sorted(directory.glob("journal-*.log"))[-1]
+
+
+@pytest.mark.parametrize("tail", ["truncated", "corrupt"])
+def test_restart_discards_broken_log_tail(repository: TodoRepository, tmp_path: Path, tail: str) -> None:
+    start(tmp_path)
+    todos = [repository.add(Todo(title=f"todo {i}", priority=i % 3 + 1)) for i in range(5)]
+    repository.update(todos[1].id, {"completed": True})
+    repository.delete(todos[0].id)
+    expected = as_dicts(repository.get_all())
+    crash()
+
+    log = last_log(tmp_path)
+    intact = log.stat().st_size
+    body = b"D" + todos[2].key.to_bytes(16, "big")
+    with open(log, "ab") as file:
+        if tail == "truncated":
+            # The process died in the middle of writing the delete
+            file.write((_RECORD.pack(len(body), zlib.crc32(body)) + body)[:-5])
+        else:
+            # A complete record whose body does not match its checksum
+            file.write(_RECORD.pack(len(body), zlib.crc32(body) ^ 1) + body)
+
+    start(tmp_path)
+    assert as_dicts(repository.get_all()) == expected
+    assert log.stat().st_size == intact
+    # Later records are appended after the intact ones, not after the discarded bytes
+    repository.delete(todos[3].id)
+    restart(tmp_path, crash_first=True)
+    assert as_dicts(repository.get_all()) == [todo for todo in expected if todo["id"] != str(todos[3].id)]
+
+
+@pytest.mark.parametrize("crash_first", [False, True], ids=["clean", "crash"])
+def test_changed_snapshot_todos_survive_restart(repository: TodoRepository, tmp_path: Path, crash_first: bool) -> None:
+    start(tmp_path)
+    todos = [repository.add(Todo(title=f"todo {i}", due_date=DAY + timedelta(days=i))) for i in range(10)]
+    restart(tmp_path)
+    assert repositories._snapshot is not None and repositories._snapshot.count == 13
+
+    repository.update(todos[2].id, {"title": "renamed", "completed": True, "due_date": None})
+    repository.delete(todos[5].id)
+    assert repositories._snapshot_rows.count(repositories._IN_SNAPSHOT) == 11
+    expected = as_dicts(repository.get_all())
+
+    # A clean restart writes a new snapshot; after a crash the changes are replayed on top of the old one
+    restart(tmp_path, crash_first)
+    assert as_dicts(repository.get_all()) == expected
+    assert repository.get_by_id(todos[5].id) is None
+    renamed = repository.get_by_id(todos[2].id)
+    assert (renamed.title, renamed.completed, renamed.due_date) == ("renamed", True, None)
+    assert as_dicts(repository.find(completed=True)) == [renamed.to_dict()]
+    assert todos[5].id not in {todo.id for todo in repository.find_open_due()}
+
+
+def _matches(
+    todo: Todo,
+    priority: Optional[int],
+    completed: Optional[bool],
+    due_after: Optional[date],
+    due_before: Optional[date],
+) -> bool:
+    if priority is not None and todo.priority != priority:
+        return False
+    if completed is not None and todo.completed != completed:
+        return False
+    if due_after is None and due_before is None:
+        return True
+    return (
+        todo.due_date is not None
+        and (due_after is None or todo.due_date >= due_after)
+        and (due_before is None or todo.due_date <= due_before)
+    )
+
+
+def test_filtered_queries_over_snapshot_and_moved_todos(repository: TodoRepository, tmp_path: Path) -> None:
+    start(tmp_path)
+    for i in range(60):
+        due_date = None if i % 7 == 0 else DAY + timedelta(days=i % 10)
+        repository.add(Todo(title=f"todo {i}", completed=i % 4 == 0, priority=i % 3 + 1, due_date=due_date))
+    restart(tmp_path)
+
+    todos = repository.get_all()
+    for i, todo in enumerate(todos):
+        if i % 11 == 0:
+            repository.delete(todo.id)
+        elif i % 5 == 0:
+            repository.update(todo.id, {"priority": 1, "completed": not todo.completed})
+        elif i % 6 == 0:
+            repository.update(todo.id, {"due_date": DAY + timedelta(days=i % 4)})
+    for i in range(10):
+        repository.add(Todo(title=f"new {i}", priority=i % 3 + 1, due_date=DAY + timedelta(days=i % 8)))
+    rows = repositories._snapshot_rows
+    assert {repositories._IN_SNAPSHOT, repositories._MOVED, repositories._DELETED} <= set(rows)
+
+    # Reference results straight from the todos, in insertion order
+    model = [repository.get_by_id(todo.id) for todo in todos] + repository.get_all()[-10:]
+    model = [todo for todo in model if todo is not None]
+    ranges = [(None, None), (DAY + timedelta(days=3), None), (None, DAY + timedelta(days=5)), (DAY, DAY)]
+    for priority in (None, 1, 2, 3):
+        for completed in (None, True, False):
+            for due_after, due_before in ranges:
+                expected = [todo for todo in model if _matches(todo, priority, completed, due_after, due_before)]
+                found = repository.find(priority, completed, due_after, due_before)
+                assert as_dicts(found) == as_dicts(expected), (priority, completed, due_after, due_before)
+                paged = repository.find(priority, completed, due_after, due_before, limit=4, offset=2)
+                assert as_dicts(paged) == as_dicts(expected[2:6])
+
+    for due_after, due_before in ranges:
+        expected = sorted(
+            (todo for todo in model if todo.due_date and _matches(todo, None, False, due_after, due_before)),
+            key=lambda todo: (todo.due_date, model.index(todo)),
+        )
+        assert as_dicts(repository.find_open_due(due_after, due_before)) == as_dicts(expected)
+        assert as_dicts(repository.find_open_due(due_after, due_before, limit=3, offset=1)) == as_dicts(expected[1:4])
@@ -0,0 +1,129 @@
+from pathlib import Path
+from typing import Dict, Iterable
+
+import pytest
+
+pytest.importorskip("fcntl")  # The shared store is POSIX only
+
+import repositories  # noqa: E402
+from models import Todo  # noqa: E402
+from repositories import TodoRepository  # noqa: E402
+from shared import SharedTodoStore  # noqa: E402
+
+SIZE = 64 * 1024
+
+
+class Worker:
+    """One worker process's view of the shared file: its own store (a dict of todos) and mapping.
+
+    Two of them on the same file stand in for two processes; each opens the file itself, so their
+    ``flock`` calls exclude each other just as between processes.
+    """
+
+    def __init__(self, path: Path, todos: Iterable[Todo] = ()):
+        self.todos: Dict[int, Todo] = {todo.key: todo for todo in todos}
+        self.store = SharedTodoStore(str(path), SIZE)
+        self.store.attach(lambda: list(self.todos.values()))
+        with self.store.reading():
+            self.catch_up()
+
+    def catch_up(self) -> bool:
+        """Replays the changes other workers made, as ``repositories._catch_up`` does; returns whether it reloaded."""
+        reload, changes = self.store.read_changes()
+        if reload:
+            self.todos.clear()
+        for key, todo in changes:
+            if todo is None:
+                self.todos.pop(key, None)
+            else:
+                self.todos[key] = todo
+        return reload
+
+    def refresh(self) -> bool:
+        if not self.store.changed():
+            return False
+        with self.store.reading():
+            self.catch_up()
+        return True
+
+    def write(self, *todos: Todo, delete: Iterable[int] = ()) -> None:
+        delete = list(delete)
+        with self.store.writing(len(todos) + len(delete)):
+            self.catch_up()
+            self.store.reserve()
+            for todo in todos:
+                self.todos[todo.key] = todo
+                self.store.put(todo)
+            for key in delete:
+                del self.todos[key]
+                self.store.delete(key)
+
+    def titles(self) -> Dict[int, str]:
+        return {key: todo.title for key, todo in self.todos.items()}
+
+
+@pytest.fixture
+def workers(tmp_path: Path):
+    path = tmp_path / "todos.shm"
+    first = Worker(path, [Todo(title=f"seed {i}") for i in range(3)])
+    second = Worker(path)
+    yield first, second
+    first.store.close()
+    second.store.close()
+
+
+def test_writes_are_replayed_by_the_other_worker(workers) -> None:
+    first, second = workers
+    # The second worker starts from the todos the first one seeded the file with
+    assert second.titles() == first.titles()
+    assert not second.refresh()
+
+    todo = Todo(title="from first")
+    first.write(todo)
+    assert second.refresh()
+    assert second.titles() == first.titles()
+
+    second.write(Todo(title="renamed", id=todo.id), delete=[next(iter(second.todos))])
+    assert first.refresh()
+    assert first.titles() == second.titles()
+    assert first.todos[todo.key].title == "renamed"
+    assert len(first.todos) == 3
+
+
+def test_compaction_switches_both_workers_to_the_new_epoch(workers) -> None:
+    first, second = workers
+    todo = Todo(title="counter")
+    first.write(todo)
+    # Rewriting one todo grows the log without adding todos, until the writer compacts it
+    for writer, reader in ((first, second), (second, first)):
+        epoch, compactions = writer.store.epoch, writer.store.compactions
+        for i in range(2000):
+            writer.write(Todo(title=f"counter {i}", id=todo.id))
+            if writer.store.compactions > compactions:
+                break
+            reader.refresh()
+            assert reader.titles() == writer.titles()
+        assert writer.store.epoch == epoch + 1
+        # The other worker was behind the compaction: it reloads the whole store from the new epoch
+        assert reader.store.changed()
+        with reader.store.reading():
+            assert reader.catch_up()
+        assert reader.store.epoch == writer.store.epoch
+        assert reader.titles() == writer.titles()
+        assert len(reader.todos) == 4
+
+
+def test_full_store_fails_before_any_local_change(repository: TodoRepository, tmp_path: Path) -> None:
+    path = tmp_path / "todos.shm"
+    repositories.open_shared(SharedTodoStore(str(path), SIZE))
+    other = Worker(path)
+    added = []
+    with pytest.raises(RuntimeError, match="is full"):
+        for i in range(1000):
+            added.append(repository.add(Todo(title=f"todo {i}", description="d" * 200)))
+    # The failed todo is neither in this worker's store nor in the file
+    titles = {todo.key: todo.title for todo in repository.get_all()}
+    assert len(titles) == 3 + len(added)
+    other.refresh()
+    assert other.titles() == titles
+    other.store.close()
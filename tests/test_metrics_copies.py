@@ -0,0 +1,36 @@
+"""Every app keeps its own metrics.py, since each one runs on its own from its directory (and
+task-management-app-db is packaged separately). These tests fail as soon as the copies' code drifts
+apart; comments and docstrings are written in each app's language and may differ.
+"""
+import ast
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+COPIES = sorted(ROOT.glob("*/metrics.py"))
+APPS = {"basic-api", "fastapi-di", "request-validation-response", "task-management-app-db", "task_management"}
+
+
+def _code(path: Path) -> str:
+    """The module's syntax tree without docstrings (comments are not part of it)."""
+    tree = ast.parse(path.read_text(encoding="utf-8"))
+    for node in ast.walk(tree):
+        body = getattr(node, "body", None)
+        if isinstance(body, list) and body and isinstance(body[0], ast.Expr):
+            value = body[0].value
+            if isinstance(value, ast.Constant) and isinstance(value.value, str):
+                node.body = body[1:] or [ast.Pass()]
+    return ast.dump(tree)
+
+
+def test_every_app_has_a_copy() -> None:
+    assert {path.parent.name for path in COPIES} == APPS
+
+
+@pytest.mark.parametrize("path", COPIES[1:], ids=lambda path: path.parent.name)
+def test_copies_have_the_same_code(path: Path) -> None:
+    reference = COPIES[0]
+    assert _code(path) == _code(reference), (
+        f"{path.relative_to(ROOT)} differs from {reference.relative_to(ROOT)}: apply the change to every copy"
+    )